@@ -13,6 +13,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
 from src.config import DATABASE_URL  # noqa: E402
+from src.database.schema_catalog import invalidate_schema_catalog  # noqa: E402
 
 
 def iter_sql_files(sql_dir: Path):
@@ -47,6 +48,7 @@ def apply_sql_views(database_url: str, sql_dir: Path, strict: bool = False, repl
                     raise
                 skipped.append((sql_file.name, str(exc)))
 
+    invalidate_schema_catalog(database_url)
     return applied, skipped
 
 
@@ -0,0 +1,134 @@
+"""Recall@k and latency of IVF candidate retrieval against exact recommendation."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.ml.ann_index import ivf_candidates  # noqa: E402
+from src.ml.recommender import _seen_indices, _user_index, build_recommender_artifact, recommend_from_artifact  # noqa: E402
+from src.ml.recommender_store import artifact_to_arrays, decode_ids  # noqa: E402
+
+
+DEFAULT_PROBES = (1, 2, 4, 8, 16, 32)
+
+
+def synthetic_interactions(
+    users: int = 30_000,
+    products: int = 33_000,
+    categories: int = 70,
+    purchases_per_user: int = 4,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """Category-clustered purchases: 80% of a user's items come from one preferred category."""
+    rng = np.random.default_rng(seed)
+    product_order = rng.permutation(products)
+    category_bounds = np.linspace(0, products, categories + 1).astype(int)
+
+    purchases = users * purchases_per_user
+    user_index = np.repeat(np.arange(users), purchases_per_user)
+    preferred = rng.integers(0, categories, users)[user_index]
+    category = np.where(rng.random(purchases) < 0.8, preferred, rng.integers(0, categories, purchases))
+    low, high = category_bounds[category], category_bounds[category + 1]
+    product_index = product_order[low + (rng.random(purchases) * (high - low)).astype(int)]
+
+    frame = pd.DataFrame({
+        "customer_id": np.char.add("user-", np.char.zfill(user_index.astype(str), 7)),
+        "product_id": np.char.add("product-", np.char.zfill(product_index.astype(str), 7)),
+        "purchase_count": 1,
+    })
+    return frame.groupby(["customer_id", "product_id"], as_index=False)["purchase_count"].sum()
+
+
+def _latency_summary(samples: list[float]) -> dict[str, float]:
+    values = np.asarray(samples) * 1_000_000
+    return {
+        "p50_us": float(np.percentile(values, 50)),
+        "p99_us": float(np.percentile(values, 99)),
+    }
+
+
+def _run(artifact: dict, user_ids: list[str], top_k: int, n_probe: int) -> tuple[list[list[str]], dict]:
+    recommendations, samples = [], []
+    for user_id in user_ids:
+        start = time.perf_counter()
+        recommendations.append(recommend_from_artifact(artifact, user_id, top_k=top_k, n_probe=n_probe))
+        samples.append(time.perf_counter() - start)
+    return recommendations, _latency_summary(samples)
+
+
+def ann_report(
+    interactions: pd.DataFrame,
+    probes=DEFAULT_PROBES,
+    top_k: int = 10,
+    requests: int = 1_000,
+    seed: int = 42,
+) -> dict:
+    """Compare every ``n_probe`` setting with exact scoring on the same users."""
+    build_start = time.perf_counter()
+    artifact = artifact_to_arrays(build_recommender_artifact(interactions, ann_index=True))
+    build_seconds = time.perf_counter() - build_start
+    rng = np.random.default_rng(seed)
+    user_ids = decode_ids(artifact["user_ids"][rng.integers(0, len(artifact["user_ids"]), requests)]).tolist()
+
+    exact, exact_latency = _run(artifact, user_ids, top_k, n_probe=0)
+    indptr = artifact["ann_list_indptr"]
+    rows = []
+    for n_probe in probes:
+        approximate, latency = _run(artifact, user_ids, top_k, n_probe=n_probe)
+        recall = np.mean([
+            len(set(found) & set(expected)) / len(expected)
+            for found, expected in zip(approximate, exact)
+            if expected
+        ])
+        candidate_counts, fallbacks = [], 0
+        for user_id in user_ids:
+            user_idx = _user_index(artifact, user_id)
+            candidates = ivf_candidates(artifact, artifact["matrix_reduced"][user_idx], n_probe)
+            unseen = np.setdiff1d(candidates, _seen_indices(artifact, user_id, user_idx))
+            candidate_counts.append(len(candidates))
+            fallbacks += len(unseen) < top_k
+        rows.append({
+            "n_probe": n_probe,
+            f"recall_at_{top_k}": float(recall),
+            "mean_candidate_fraction": float(np.mean(candidate_counts) / len(artifact["product_ids"])),
+            "exact_fallback_rate": fallbacks / len(user_ids),
+            **latency,
+            "p50_speedup": exact_latency["p50_us"] / latency["p50_us"],
+        })
+    return {
+        "users": int(len(artifact["user_ids"])),
+        "products": int(len(artifact["product_ids"])),
+        "ann_lists": int(len(indptr) - 1),
+        "build_seconds_with_index": build_seconds,
+        "exact": exact_latency,
+        "ivf": rows,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report IVF recall@k and latency against exact search.")
+    parser.add_argument("--users", type=int, default=30_000)
+    parser.add_argument("--products", type=int, default=33_000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=1_000)
+    parser.add_argument("--probes", type=int, nargs="+", default=list(DEFAULT_PROBES))
+    args = parser.parse_args()
+
+    interactions = synthetic_interactions(args.users, args.products)
+    print(json.dumps(ann_report(interactions, args.probes, args.top_k, args.requests), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+"""Compare single-row DataFrame inference with the declared float32 schema path."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostClassifier, CatBoostRegressor
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.ml.feature_schema import CHURN_FEATURES, LOGISTICS_FEATURES, predict_positive_class  # noqa: E402
+
+
+def _latency_summary(samples: list[float]) -> dict[str, float]:
+    values = np.asarray(samples) * 1_000_000
+    return {
+        "p50_us": float(np.percentile(values, 50)),
+        "p99_us": float(np.percentile(values, 99)),
+        "mean_us": float(values.mean()),
+    }
+
+
+def _time_calls(func, repeats: int, warmup: int = 20) -> dict[str, float]:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return _latency_summary(samples)
+
+
+def _synthetic_models(rows: int = 2_000, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    logistics_x = pd.DataFrame(
+        rng.random((rows, len(LOGISTICS_FEATURES.columns))),
+        columns=list(LOGISTICS_FEATURES.columns),
+    )
+    logistics_y = logistics_x.sum(axis=1) * 3
+    churn_x = pd.DataFrame(rng.random((rows, 3)), columns=list(CHURN_FEATURES.columns))
+    churn_y = (churn_x["recency"] > 0.5).astype(int)
+
+    logistics = CatBoostRegressor(iterations=200, depth=8, verbose=0, random_seed=seed)
+    logistics.fit(logistics_x, logistics_y)
+    churn = CatBoostClassifier(iterations=100, depth=4, verbose=0, random_seed=seed)
+    churn.fit(churn_x, churn_y)
+    return logistics, churn
+
+
+def benchmark_single_row_inference(repeats: int = 2_000) -> dict[str, dict]:
+    """Return p50/p99 latency for the legacy DataFrame path and the schema path."""
+    logistics, churn = _synthetic_models()
+    delivery_row = SimpleNamespace(**{column: 0.5 for column in LOGISTICS_FEATURES.columns})
+    delivery_row.model_dump = lambda: {column: 0.5 for column in LOGISTICS_FEATURES.columns}
+    churn_row = SimpleNamespace(days_since_last_order=0.4, frequency=0.2, monetary=0.7)
+
+    def delivery_dataframe():
+        return logistics.predict(pd.DataFrame([delivery_row.model_dump()]))[0]
+
+    def delivery_schema():
+        return logistics.predict(LOGISTICS_FEATURES.to_row(delivery_row))[0]
+
+    def churn_dataframe():
+        df = pd.DataFrame([{
+            "recency": churn_row.days_since_last_order,
+            "frequency": churn_row.frequency,
+            "monetary": churn_row.monetary,
+        }])
+        df = df[["recency", "frequency", "monetary"]]
+        return churn.predict(df)[0], float(churn.predict_proba(df)[0][1])
+
+    def churn_schema():
+        labels, probabilities = predict_positive_class(churn, CHURN_FEATURES.to_row(churn_row))
+        return labels[0], probabilities[0]
+
+    results = {}
+    for name, legacy, schema in (
+        ("logistics", delivery_dataframe, delivery_schema),
+        ("churn", churn_dataframe, churn_schema),
+    ):
+        legacy_latency = _time_calls(legacy, repeats)
+        schema_latency = _time_calls(schema, repeats)
+        results[name] = {
+            "dataframe": legacy_latency,
+            "schema": schema_latency,
+            "p50_speedup": legacy_latency["p50_us"] / schema_latency["p50_us"],
+            "p99_speedup": legacy_latency["p99_us"] / schema_latency["p99_us"],
+        }
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark single-row model inference paths.")
+    parser.add_argument("--repeats", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark_single_row_inference(args.repeats), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
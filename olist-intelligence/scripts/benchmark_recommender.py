@@ -0,0 +1,115 @@
+"""Compare full-argsort recommendation with the top-k engine across catalog sizes."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.ml.recommender import recommend_from_artifact  # noqa: E402
+
+
+DEFAULT_CATALOG_SIZES = (1_000, 10_000, 33_000, 100_000, 300_000)
+
+
+def _latency_summary(samples: list[float]) -> dict[str, float]:
+    values = np.asarray(samples) * 1_000_000
+    return {
+        "p50_us": float(np.percentile(values, 50)),
+        "p99_us": float(np.percentile(values, 99)),
+        "mean_us": float(values.mean()),
+    }
+
+
+def _time_calls(func, user_ids: list[str], warmup: int = 20) -> dict[str, float]:
+    for user_id in user_ids[:warmup]:
+        func(user_id)
+    samples = []
+    for user_id in user_ids:
+        start = time.perf_counter()
+        func(user_id)
+        samples.append(time.perf_counter() - start)
+    return _latency_summary(samples)
+
+
+def synthetic_array_artifact(
+    products: int,
+    users: int = 2_000,
+    components: int = 20,
+    seen_per_user: int = 3,
+    seed: int = 42,
+) -> dict:
+    """Array-layout artifact with sorted IDs and a CSR seen matrix."""
+    rng = np.random.default_rng(seed)
+    seen_indices = np.sort(
+        rng.integers(0, products, size=(users, seen_per_user)), axis=1
+    ).reshape(-1).astype(np.int32)
+    return {
+        "user_ids": np.array([f"user-{index:08d}" for index in range(users)]),
+        "product_ids": np.array([f"product-{index:08d}" for index in range(products)]),
+        "matrix_reduced": rng.standard_normal((users, components)),
+        "product_components": rng.standard_normal((components, products)),
+        "seen_indptr": np.arange(0, users * seen_per_user + 1, seen_per_user, dtype=np.int64),
+        "seen_indices": seen_indices,
+    }
+
+
+def legacy_recommend(artifact: dict, customer_id: str, top_k: int = 5) -> list[str]:
+    """The previous implementation: full argsort plus a Python seen-set scan."""
+    user_ids = artifact["user_ids"]
+    user_idx = int(np.searchsorted(user_ids, customer_id))
+    scores = artifact["matrix_reduced"][user_idx] @ artifact["product_components"]
+    indptr = artifact["seen_indptr"]
+    seen = {int(index) for index in artifact["seen_indices"][indptr[user_idx]:indptr[user_idx + 1]]}
+    ranked_indices = [int(index) for index in np.argsort(scores)[::-1] if int(index) not in seen]
+    return [str(artifact["product_ids"][index]) for index in ranked_indices[:top_k]]
+
+
+def benchmark_catalog_sizes(
+    catalog_sizes=DEFAULT_CATALOG_SIZES,
+    requests: int = 500,
+    top_k: int = 10,
+) -> list[dict]:
+    """Return per-request latency for both paths at each catalog size."""
+    results = []
+    for products in catalog_sizes:
+        artifact = synthetic_array_artifact(products)
+        rng = np.random.default_rng(products)
+        user_ids = artifact["user_ids"][rng.integers(0, len(artifact["user_ids"]), requests)].tolist()
+
+        for user_id in user_ids[:20]:
+            if legacy_recommend(artifact, user_id, top_k) != recommend_from_artifact(artifact, user_id, top_k):
+                raise AssertionError(f"Top-k engine disagrees with full sort for {user_id}")
+
+        legacy = _time_calls(lambda user_id: legacy_recommend(artifact, user_id, top_k), user_ids)
+        top_k_engine = _time_calls(lambda user_id: recommend_from_artifact(artifact, user_id, top_k), user_ids)
+        results.append({
+            "catalog_size": products,
+            "full_argsort": legacy,
+            "top_k_engine": top_k_engine,
+            "p50_speedup": legacy["p50_us"] / top_k_engine["p50_us"],
+        })
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark recommendation latency against catalog size.")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=list(DEFAULT_CATALOG_SIZES))
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark_catalog_sizes(args.catalog_sizes, args.requests, args.top_k), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
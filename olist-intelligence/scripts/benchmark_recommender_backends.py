@@ -0,0 +1,66 @@
+"""Leave-one-out quality and training time of the SVD and implicit ALS recommender backends."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from scripts.benchmark_ann import synthetic_interactions  # noqa: E402
+from src.ml.recommender import (  # noqa: E402
+    DEFAULT_N_COMPONENTS,
+    RECOMMENDER_BACKENDS,
+    interaction_matrix,
+)
+from src.ml.recommender_evaluation import evaluate_rankings, leave_one_out_split  # noqa: E402
+
+
+def compare_backends(interactions, backends=tuple(RECOMMENDER_BACKENDS), n_components=DEFAULT_N_COMPONENTS, top_k=10):
+    """Fit every backend on the same leave-one-out train matrix; time the fit and score the held-out products."""
+    train, holdout = leave_one_out_split(interactions)
+    matrix, index = interaction_matrix(train)
+    rows = []
+    for backend in backends:
+        start = time.perf_counter()
+        artifact = RECOMMENDER_BACKENDS[backend](matrix, index, n_components)
+        train_seconds = time.perf_counter() - start
+        metrics = evaluate_rankings(artifact, holdout, (top_k,))
+        rows.append({
+            "backend": backend,
+            "n_components": int(artifact["product_components"].shape[0]),
+            "train_seconds": train_seconds,
+            **{name: value for name, value in metrics.items() if name.endswith(f"_at_{top_k}")},
+        })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare SVD and ALS recommender backends.")
+    parser.add_argument("--backends", nargs="+", default=list(RECOMMENDER_BACKENDS), choices=list(RECOMMENDER_BACKENDS))
+    parser.add_argument("--n-components", type=int, default=DEFAULT_N_COMPONENTS)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--synthetic-users", type=int, default=None, help="Use synthetic data instead of the database")
+    args = parser.parse_args()
+
+    if args.synthetic_users:
+        interactions = synthetic_interactions(users=args.synthetic_users)
+    else:
+        from src.ml.data import get_recommender_data
+
+        interactions = get_recommender_data(limit=None)
+        if interactions.empty:
+            print("No recommender interactions found; try --synthetic-users 30000", file=sys.stderr)
+            return 1
+
+    print(json.dumps(compare_backends(interactions, args.backends, args.n_components, args.top_k), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
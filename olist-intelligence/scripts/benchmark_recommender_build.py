@@ -0,0 +1,124 @@
+"""Time and peak memory of recommender matrix construction: dict maps vs factorized codes."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.ml.recommender import interaction_matrix  # noqa: E402
+from src.ml.recommender_store import artifact_to_arrays  # noqa: E402
+
+
+# 1x is roughly the Olist order_items volume
+BASE_USERS = 95_000
+BASE_PRODUCTS = 33_000
+BASE_INTERACTIONS = 110_000
+DEFAULT_SCALES = (1, 10)
+
+
+def synthetic_interactions(scale: int, seed: int = 42) -> pd.DataFrame:
+    """Aggregated (customer, product) pairs with 32-character hex IDs, like the Olist tables."""
+    rng = np.random.default_rng(seed)
+    users = rng.integers(0, BASE_USERS * scale, BASE_INTERACTIONS * scale)
+    products = rng.integers(0, BASE_PRODUCTS * scale, BASE_INTERACTIONS * scale)
+    frame = pd.DataFrame({
+        "customer_id": np.char.zfill(np.char.mod("%x", users * 7919), 32).astype(object),
+        "product_id": np.char.zfill(np.char.mod("%x", products * 104729), 32).astype(object),
+        "purchase_count": rng.integers(1, 3, len(users)),
+    })
+    return frame.groupby(["customer_id", "product_id"], as_index=False)["purchase_count"].sum()
+
+
+def legacy_interaction_matrix(interactions: pd.DataFrame) -> tuple[csr_matrix, dict]:
+    """The previous construction: sorted Python lists, dict maps, and a groupby-apply of seen lists."""
+    frame = interactions.copy()
+    user_ids = sorted(frame["customer_id"].unique())
+    product_ids = sorted(frame["product_id"].unique())
+    user_map = {value: index for index, value in enumerate(user_ids)}
+    product_map = {value: index for index, value in enumerate(product_ids)}
+    frame["user_idx"] = frame["customer_id"].map(user_map)
+    frame["product_idx"] = frame["product_id"].map(product_map)
+    matrix = csr_matrix(
+        (frame["purchase_count"].values, (frame["user_idx"].values, frame["product_idx"].values)),
+        shape=(len(user_ids), len(product_ids)),
+    )
+    seen = frame.groupby("customer_id")["product_idx"].apply(lambda values: values.astype(int).tolist()).to_dict()
+    arrays = artifact_to_arrays({
+        "matrix_reduced": np.empty((len(user_ids), 0)),
+        "product_components": np.empty((0, len(product_ids))),
+        "user_map": user_map,
+        "product_map": product_map,
+        "seen_product_indices": seen,
+    })
+    return matrix, {name: arrays[name] for name in ("user_ids", "product_ids", "seen_indptr", "seen_indices")}
+
+
+def _measure(build, interactions: pd.DataFrame) -> tuple[tuple, dict]:
+    """Wall time of an untraced run, then peak allocations of a ``tracemalloc`` run (it slows Python code)."""
+    start = time.perf_counter()
+    result = build(interactions)
+    seconds = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = build(interactions)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"seconds": seconds, "peak_mb": peak / 1_000_000}
+
+
+def _same_matrix(left: tuple, right: tuple) -> bool:
+    (left_matrix, left_index), (right_matrix, right_index) = left, right
+    return (left_matrix != right_matrix).nnz == 0 and all(
+        np.array_equal(left_index[name], right_index[name]) for name in left_index
+    )
+
+
+def benchmark_scales(scales=DEFAULT_SCALES, memory_budget_mb: int = 16) -> list[dict]:
+    """Legacy, factorized and memory-budgeted factorized construction at each volume multiple."""
+    results = []
+    for scale in scales:
+        interactions = synthetic_interactions(scale)
+        legacy, legacy_stats = _measure(legacy_interaction_matrix, interactions)
+        factorized, factorized_stats = _measure(interaction_matrix, interactions)
+        budgeted, budgeted_stats = _measure(
+            lambda frame: interaction_matrix(frame, memory_budget_bytes=memory_budget_mb * 1_000_000), interactions
+        )
+        if not (_same_matrix(legacy, factorized) and _same_matrix(factorized, budgeted)):
+            raise AssertionError(f"Constructions disagree at {scale}x")
+        results.append({
+            "scale": scale,
+            "interactions": len(interactions),
+            "users": factorized[0].shape[0],
+            "products": factorized[0].shape[1],
+            "legacy": legacy_stats,
+            "factorized": factorized_stats,
+            f"factorized_budget_{memory_budget_mb}mb": budgeted_stats,
+            "speedup": legacy_stats["seconds"] / factorized_stats["seconds"],
+        })
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark recommender matrix construction at several volumes.")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--memory-budget-mb", type=int, default=16)
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark_scales(args.scales, args.memory_budget_mb), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -29,6 +29,10 @@ sys.path.append(str(PROJECT_ROOT))
 from scripts.apply_sql_views import apply_sql_views  # noqa: E402
 from src.config import DATABASE_URL  # noqa: E402
 from src.data_contract import validate_database_quality, validate_generated_outputs  # noqa: E402
+from src.database.data_generation import write_data_generation  # noqa: E402
+from src.database.purchase_history import create_purchase_history_indexes  # noqa: E402
+from src.database.schema_catalog import invalidate_schema_catalog  # noqa: E402
+from src.services.table_export import create_export_indexes  # noqa: E402
 
 
 SEGMENT_NAMES = ["⚠️ At Risk", "🌱 Developing", "🏆 Loyal", "💎 Champions"]
@@ -139,6 +143,9 @@ def build_local_demo(database_url: str) -> dict[str, int]:
     engine = create_engine(database_url)
     logistics_rows = build_logistics_baseline(engine)
     segment_rows, stability_metrics = build_customer_segments(engine)
+    create_export_indexes(engine)
+    create_purchase_history_indexes(engine)
+    invalidate_schema_catalog(database_url)
     applied, skipped = apply_sql_views(
         database_url,
         PROJECT_ROOT / "sql" / "views",
@@ -160,11 +167,14 @@ def build_local_demo(database_url: str) -> dict[str, int]:
         ]
     )
     metadata.to_sql("generated_output_metadata", engine, if_exists="replace", index=False)
+    generation_id = write_data_generation(engine, source="build_local_demo")
+    invalidate_schema_catalog(database_url)
 
     return {
         "logistics_predictions": logistics_rows,
         "customer_segments": segment_rows,
         "sql_views": len(applied),
+        "data_generation": generation_id,
         **stability_metrics,
     }
 
@@ -20,6 +20,7 @@ sys.path.append(str(PROJECT_ROOT))
 
 from src.ml.data import get_churn_data, get_db_engine, get_logistics_data, get_recommender_data  # noqa: E402
 from src.ml.evaluation import has_usable_class_balance, temporal_train_test_split  # noqa: E402
+from src.ml.item_recommender import evaluate_item_leave_one_out  # noqa: E402
 from src.ml.recommender import evaluate_leave_one_out  # noqa: E402
 
 
@@ -194,6 +195,8 @@ def recommender_benchmark(top_k: int = 10) -> dict[str, Any]:
     """Return offline recommender metrics and random-catalog baseline."""
     interactions = get_recommender_data(limit=None)
     evaluation = evaluate_leave_one_out(interactions, top_k=top_k)
+    item_evaluation = evaluate_item_leave_one_out(interactions, ks=(top_k,))
+    als_evaluation = evaluate_leave_one_out(interactions, top_k=top_k, ks=(top_k,), backend="als")
     random_hit_rate = top_k / interactions["product_id"].nunique()
     hit_rate = float(evaluation["hit_rate_at_k"])
 
@@ -204,6 +207,12 @@ def recommender_benchmark(top_k: int = 10) -> dict[str, Any]:
         "users_evaluated": int(evaluation["users_evaluated"]),
         "hit_rate_at_k": hit_rate,
         "catalog_coverage_at_k": float(evaluation["catalog_coverage_at_k"]),
+        "ndcg_at_k": float(evaluation[f"ndcg_at_{top_k}"]),
+        "mrr_at_k": float(evaluation[f"mrr_at_{top_k}"]),
+        "item_item_hit_rate_at_k": float(item_evaluation[f"hit_rate_at_{top_k}"]),
+        "item_item_catalog_coverage_at_k": float(item_evaluation[f"catalog_coverage_at_{top_k}"]),
+        "als_hit_rate_at_k": float(als_evaluation["hit_rate_at_k"]),
+        "als_catalog_coverage_at_k": float(als_evaluation["catalog_coverage_at_k"]),
         "random_catalog_hit_rate_at_k": float(random_hit_rate),
         "lift_vs_random_catalog": float(hit_rate / random_hit_rate if random_hit_rate else 0.0),
     }
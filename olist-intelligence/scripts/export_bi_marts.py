@@ -12,7 +12,7 @@ from pathlib import Path
 from typing import Sequence
 
 import pandas as pd
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, text
 from sqlalchemy.engine import make_url
 
 
@@ -21,6 +21,7 @@ sys.path.append(str(PROJECT_ROOT))
 
 from scripts.apply_sql_views import apply_sql_views  # noqa: E402
 from src.config import DATABASE_URL  # noqa: E402
+from src.database.schema_catalog import get_relation_names  # noqa: E402
 
 
 @dataclass(frozen=True)
@@ -125,8 +126,7 @@ def _select_marts(names: Sequence[str] | None = None) -> list[MartExport]:
 
 
 def _available_relations(engine) -> set[str]:
-    inspector = inspect(engine)
-    return set(inspector.get_table_names()) | set(inspector.get_view_names())
+    return set(get_relation_names(engine))
 
 
 def _read_mart(conn, mart: MartExport, limit: int | None = None) -> pd.DataFrame:
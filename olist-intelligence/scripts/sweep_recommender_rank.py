@@ -0,0 +1,50 @@
+"""Leave-one-out hit rate, build time and artifact size of the SVD recommender per rank."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from scripts.benchmark_ann import synthetic_interactions  # noqa: E402
+from src.ml.recommender_evaluation import sweep_n_components  # noqa: E402
+
+
+DEFAULT_RANKS = (5, 10, 20, 40, 80)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sweep SVD n_components on one shared interaction matrix.")
+    parser.add_argument("--ranks", type=int, nargs="+", default=list(DEFAULT_RANKS))
+    parser.add_argument("--ks", type=int, nargs="+", default=[10])
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--synthetic-users", type=int, default=None, help="Use synthetic data instead of the database")
+    parser.add_argument("--json", action="store_true", help="Print JSON records instead of a table")
+    args = parser.parse_args()
+
+    if args.synthetic_users:
+        interactions = synthetic_interactions(users=args.synthetic_users)
+    else:
+        from src.ml.data import get_recommender_data
+
+        interactions = get_recommender_data(limit=None)
+        if interactions.empty:
+            print("No recommender interactions found; try --synthetic-users 30000", file=sys.stderr)
+            return 1
+
+    table = sweep_n_components(interactions, args.ranks, ks=args.ks, processes=args.processes)
+    table["artifact_mb"] = table.pop("artifact_bytes") / 1_000_000
+    if args.json:
+        print(json.dumps(table.to_dict("records"), indent=2))
+    else:
+        print(table.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,18 +1,43 @@
 import logging
 import os
 import sys
+import time
+from typing import Literal
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-import pandas as pd
-from fastapi import Depends, FastAPI, HTTPException, Security
+from fastapi import BackgroundTasks, Depends, FastAPI, Header, HTTPException, Query, Request, Response, Security
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import APIKeyHeader
-from pydantic import BaseModel, Field
-from sqlalchemy import create_engine, inspect, text
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import bindparam, create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, sessionmaker
 
 from src.config import DATABASE_URL
-from src.ml.recommender import recommend_from_artifact
+from src.database.async_db import create_async_session_factory
+from src.database.data_generation import read_data_generation
+from src.database.purchase_history import PURCHASE_HISTORY_QUERY
+from src.database.schema_catalog import get_cached_table_names, get_table_names
+from src.ml.feature_schema import CHURN_FEATURES, LOGISTICS_FEATURES, predict_positive_class, risk_level
+from src.ml.recommender import recommend_from_artifact, recommend_from_history
+from src.services.metrics import (
+    DB_QUERY_LATENCY,
+    FALLBACK_RESPONSES,
+    MODEL_INFERENCE_LATENCY,
+    MODEL_NOT_LOADED_RESPONSES,
+    PROMETHEUS_CONTENT_TYPE,
+    REQUEST_LATENCY,
+    VALIDATION_LATENCY,
+    registry as metrics_registry,
+)
+from src.services.model_manager import ModelManager
+from src.services.popularity_ranking import PopularityRanking, load_category_popularity
+from src.services.prediction_batcher import MicroBatcher
+from src.services.response_cache import CachedResponse, GenerationCache, etag_matches, response_etag
+from src.services.table_export import EXPORT_PAGE_SIZE, EXPORT_TABLES, iter_csv, iter_ndjson
 
 # Required for local debugging if running this module directly.
 project_root = Path(__file__).parent.parent
@@ -30,6 +55,19 @@ REPEAT_PURCHASE_RISK_CLAIM_BOUNDARY = (
 RECOMMENDATION_CLAIM_BOUNDARY = (
     "Offline recommendation prototype; not measured sales uplift or conversion impact."
 )
+DELIVERY_BATCH_MAX_ROWS = int(os.getenv("DELIVERY_BATCH_MAX_ROWS", "1000"))
+PREDICTION_BATCH_WINDOW_MS = float(os.getenv("PREDICTION_BATCH_WINDOW_MS", "2"))
+PREDICTION_BATCH_MAX_ROWS = int(os.getenv("PREDICTION_BATCH_MAX_ROWS", "64"))
+PREDICTION_BATCH_TIMEOUT_SECONDS = float(os.getenv("PREDICTION_BATCH_TIMEOUT_SECONDS", "5"))
+POPULARITY_REFRESH_SECONDS = float(os.getenv("POPULARITY_REFRESH_SECONDS", "3600"))
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "0"))
+LOOKUP_BATCH_MAX_IDS = int(os.getenv("LOOKUP_BATCH_MAX_IDS", "5000"))
+# Stays under SQLite's default 999 bound-parameter limit
+LOOKUP_CHUNK_SIZE = int(os.getenv("LOOKUP_CHUNK_SIZE", "500"))
+# Products folded in per unknown customer, from the request or the order tables
+RECOMMEND_HISTORY_MAX_ITEMS = int(os.getenv("RECOMMEND_HISTORY_MAX_ITEMS", "200"))
+DATA_GENERATION_CHECK_SECONDS = float(os.getenv("DATA_GENERATION_CHECK_SECONDS", "5"))
+API_ASYNC_DB = os.getenv("API_ASYNC_DB", "false").lower() in {"1", "true", "yes"}
 
 async def verify_api_key(api_key: str = Security(api_key_header)):
     """Verify API key for protected endpoints."""
@@ -50,12 +88,57 @@ def get_db():
     finally:
         db.close()
 
+
+def _async_lookup_sessions():
+    if not API_ASYNC_DB:
+        return None, None
+    if make_url(DATABASE_URL).get_backend_name() == "sqlite":
+        # aiosqlite runs each connection on its own thread; the load test measured it slower than sync
+        logger.warning("API_ASYNC_DB is meant for PostgreSQL; on SQLite it is slower than sync sessions")
+    try:
+        return create_async_session_factory(DATABASE_URL)
+    except (ImportError, ValueError) as e:
+        logger.warning("Async database path unavailable; using sync sessions: %s", e)
+        return None, None
+
+
+async_engine, AsyncSessionLocal = _async_lookup_sessions()
+
+
+async def _get_async_lookup_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Lookup endpoints take an AsyncSession when API_ASYNC_DB is enabled; otherwise
+# plain get_db, so no sync session is opened alongside an async one
+get_lookup_db = _get_async_lookup_db if AsyncSessionLocal is not None else get_db
+
+
+async def _execute(db, query, params: dict, query_name: str):
+    """Run a lookup on the event loop (async session) or in the threadpool (sync session)."""
+    with DB_QUERY_LATENCY.time(query=query_name):
+        if isinstance(db, AsyncSession):
+            return await db.execute(query, params)
+        return await run_in_threadpool(db.execute, query, params)
+
 models = {}
+model_manager = ModelManager(models)
+category_popularity = PopularityRanking(lambda: load_category_popularity(engine))
+response_cache = GenerationCache(lambda: read_data_generation(engine), DATA_GENERATION_CHECK_SECONDS)
+
+
+def _conditional_response(cached: CachedResponse, if_none_match: str | None):
+    """Return 304 when the client already holds this ETag, else the JSON body."""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(cached.payload, headers=headers)
 
 
 def table_exists(table_name: str) -> bool:
-    """Return whether a runtime table exists without querying its contents."""
-    return table_name in set(inspect(engine).get_table_names())
+    """Return whether a runtime table exists using the cached schema catalog."""
+    return table_name in get_table_names(engine)
 
 
 def require_table(table_name: str):
@@ -67,36 +150,39 @@ def require_table(table_name: str):
         )
 
 
+async def _load_schema_catalog():
+    """Refill an expired schema catalog in the threadpool so ``inspect()`` never blocks the event loop."""
+    if get_cached_table_names(engine) is None:
+        await run_in_threadpool(get_table_names, engine)
+
+
+async def require_lookup_table(table_name: str):
+    """``require_table`` for async endpoints."""
+    await _load_schema_catalog()
+    require_table(table_name)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Load Models on Startup
+    # Load and warm up models in parallel before serving the first request
     try:
-        from src.ml.registry import load_production_model
-        
-        # Load Logistics (CatBoost)
-        try:
-            models["logistics"] = load_production_model("logistics", flavor="catboost")
-        except Exception as e:
-            logger.warning("Failed to load logistics model: %s", e)
-
-        # Load Churn (CatBoost)
-        try:
-            models["churn"] = load_production_model("churn", flavor="catboost")
-        except Exception as e:
-            logger.warning("Failed to load churn model: %s", e)
-
-        # Load Recommender (Dict - Local Fallback usually)
-        try:
-            # Recommender is not fully in Registry yet, uses local fallback path in registry
-            models["recommender"] = load_production_model("recommender", flavor="sklearn")
-        except Exception as e:
-            logger.warning("Failed to load recommender model: %s", e)
-            
+        model_manager.reload()
         logger.info("Model loading completed. loaded_models=%s", sorted(models))
     except Exception as e:
         logger.exception("Failed to initialize model registry: %s", e)
+    model_manager.start_watcher(MODEL_WATCH_INTERVAL_SECONDS)
+
+    # Precompute the cold-start popularity fallback once, then refresh in the background
+    category_popularity.refresh()
+    category_popularity.start(POPULARITY_REFRESH_SECONDS)
     yield
-    models.clear()
+    category_popularity.stop()
+    model_manager.stop_watcher()
+    delivery_batcher.close()
+    repeat_purchase_batcher.close()
+    model_manager.clear()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 # FastAPI App
 app = FastAPI(
@@ -106,7 +192,42 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-class DeliveryInput(BaseModel):
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Route template, not the raw path, keeps label cardinality bounded
+        route = request.scope.get("route")
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status_code,
+        )
+
+
+class RequestBody(BaseModel):
+    """
+    Base for top-level request payloads; records body validation time per schema.
+
+    Models nested inside a body (batch rows) derive from ``BaseModel`` instead,
+    so a batch is timed once rather than once per row.
+    """
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _record_validation_time(cls, values, handler):
+        with VALIDATION_LATENCY.time(schema=cls.__name__):
+            return handler(values)
+
+
+class DeliveryRow(BaseModel):
     """Ten-feature delivery prediction input."""
     freight_value: float
     price: float
@@ -119,13 +240,38 @@ class DeliveryInput(BaseModel):
     product_volume: float = 5000.0
     freight_ratio: float = 0.2
 
-class ChurnInput(BaseModel):
+class DeliveryInput(DeliveryRow, RequestBody):
+    """Single delivery row sent as the request body."""
+
+class DeliveryBatchInput(RequestBody):
+    """Ordered delivery rows scored with one model call."""
+    rows: list[DeliveryRow] = Field(min_length=1)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _reject_oversized_batch(cls, values):
+        # Runs before any row is validated, so an oversized body is rejected without per-row work
+        rows = values.get("rows") if isinstance(values, dict) else None
+        if isinstance(rows, list) and len(rows) > DELIVERY_BATCH_MAX_ROWS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch exceeds maximum of {DELIVERY_BATCH_MAX_ROWS} rows",
+            )
+        return values
+
+class ChurnInput(RequestBody):
     days_since_last_order: float
     frequency: float
     monetary: float
 
 
+def _model_not_loaded(model_name: str):
+    MODEL_NOT_LOADED_RESPONSES.inc(model=model_name)
+    raise HTTPException(status_code=503, detail="Model not loaded")
+
+
 def _repeat_purchase_model_missing_response():
+    MODEL_NOT_LOADED_RESPONSES.inc(model="churn")
     raise HTTPException(
         status_code=503,
         detail={
@@ -137,12 +283,50 @@ def _repeat_purchase_model_missing_response():
     )
 
 
-def _risk_level(probability: float) -> str:
-    if probability > 0.7:
-        return "Critical"
-    if probability > 0.4:
-        return "Medium"
-    return "Low"
+def _submit_prediction(batcher: MicroBatcher, data):
+    try:
+        return batcher.submit(data, timeout=PREDICTION_BATCH_TIMEOUT_SECONDS)
+    except TimeoutError:
+        logger.warning("%s timed out after %ss", batcher.name, PREDICTION_BATCH_TIMEOUT_SECONDS)
+        raise HTTPException(status_code=503, detail="Prediction timed out, retry later")
+
+
+def _delivery_prediction(prediction) -> dict:
+    predicted_days = float(prediction)
+    return {
+        "predicted_days": predicted_days,
+        "risk_level": "High" if predicted_days > 10 else "Low",
+    }
+
+
+def _score_repeat_purchase_rows(rows: list[ChurnInput]) -> list[tuple[bool, float]]:
+    features = CHURN_FEATURES.to_matrix(rows)
+    with MODEL_INFERENCE_LATENCY.time(model="churn"):
+        predictions, probabilities = predict_positive_class(models["churn"], features)
+    return [
+        (bool(prediction), float(probability))
+        for prediction, probability in zip(predictions, probabilities)
+    ]
+
+
+def _score_delivery_rows(rows: list[DeliveryRow]):
+    features = LOGISTICS_FEATURES.to_matrix(rows)
+    with MODEL_INFERENCE_LATENCY.time(model="logistics"):
+        return models["logistics"].predict(features)
+
+
+delivery_batcher = MicroBatcher(
+    _score_delivery_rows,
+    max_batch_size=PREDICTION_BATCH_MAX_ROWS,
+    max_wait_ms=PREDICTION_BATCH_WINDOW_MS,
+    name="delivery-batcher",
+)
+repeat_purchase_batcher = MicroBatcher(
+    _score_repeat_purchase_rows,
+    max_batch_size=PREDICTION_BATCH_MAX_ROWS,
+    max_wait_ms=PREDICTION_BATCH_WINDOW_MS,
+    name="repeat-purchase-batcher",
+)
 
 
 def _predict_repeat_purchase_risk(data: ChurnInput, include_legacy_fields: bool = False):
@@ -150,31 +334,25 @@ def _predict_repeat_purchase_risk(data: ChurnInput, include_legacy_fields: bool
         _repeat_purchase_model_missing_response()
 
     try:
-        df = pd.DataFrame([{
-            "recency": data.days_since_last_order,
-            "frequency": data.frequency,
-            "monetary": data.monetary,
-        }])
-        df = df[["recency", "frequency", "monetary"]]
-
-        prediction = models["churn"].predict(df)[0]
-        probability = float(models["churn"].predict_proba(df)[0][1])
+        prediction, probability = _submit_prediction(repeat_purchase_batcher, data)
 
         response = {
             "prediction_type": REPEAT_PURCHASE_RISK_TYPE,
             "model_available": True,
-            "repeat_purchase_risk": bool(prediction),
+            "repeat_purchase_risk": prediction,
             "repeat_purchase_risk_probability": probability,
-            "risk_level": _risk_level(probability),
+            "risk_level": risk_level(probability),
             "claim_boundary": REPEAT_PURCHASE_RISK_CLAIM_BOUNDARY,
         }
         if include_legacy_fields:
             response.update({
-                "is_churn_risk": bool(prediction),
+                "is_churn_risk": prediction,
                 "churn_probability": probability,
                 "legacy_endpoint": True,
             })
         return response
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Repeat-purchase risk prediction failed: %s", e)
         raise HTTPException(status_code=500, detail="Prediction Error")
@@ -185,17 +363,26 @@ def predict_delivery(data: DeliveryInput, _api_key: str = Depends(verify_api_key
     Real-time delivery duration prediction using CatBoost.
     """
     if "logistics" not in models:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+        _model_not_loaded("logistics")
     
-    # Prepare DataFrame
-    df = pd.DataFrame([data.model_dump()])
-    
-    # Predict
-    prediction = models["logistics"].predict(df)[0]
+    # Concurrent single-row requests share one batched model call
+    prediction = _submit_prediction(delivery_batcher, data)
     
+    return _delivery_prediction(prediction)
+
+@app.post("/predict/delivery/batch")
+def predict_delivery_batch(data: DeliveryBatchInput, _api_key: str = Depends(verify_api_key)):
+    """
+    Score many delivery rows with a single CatBoost call, preserving input order.
+    """
+    if "logistics" not in models:
+        _model_not_loaded("logistics")
+
+    predictions = _score_delivery_rows(data.rows)
+
     return {
-        "predicted_days": float(prediction),
-        "risk_level": "High" if prediction > 10 else "Low"
+        "count": len(data.rows),
+        "predictions": [_delivery_prediction(value) for value in predictions],
     }
 
 @app.post("/predict/repeat-purchase-risk")
@@ -227,9 +414,15 @@ class CustomerSegment(BaseModel):
     cluster: int
     segment: str
 
-class RecommendationInput(BaseModel):
+class LookupBatchInput(RequestBody):
+    """IDs for a bulk lookup; duplicates are collapsed, first occurrence wins."""
+    ids: list[str] = Field(min_length=1)
+
+class RecommendationInput(RequestBody):
     customer_id: str
     top_k: int = Field(default=5, ge=1, le=20)
+    # Recent product IDs for customers the model was not trained on
+    history: list[str] | None = Field(default=None, max_length=RECOMMEND_HISTORY_MAX_ITEMS)
 
 
 def _recommendation_items(values: list[str], item_type: str) -> list[dict]:
@@ -268,33 +461,78 @@ def health_check():
         "database_configured": bool(DATABASE_URL),
         "api_key_configured": bool(API_KEY),
         "loaded_models": sorted(models),
+        "model_versions": {
+            name: model_manager.versions.get(name)
+            for name in sorted(models)
+        },
+        "model_timings": {
+            name: model_manager.timings.get(name)
+            for name in sorted(models)
+        },
+        "model_reload_in_progress": model_manager.reloading,
+    }
+
+
+class ModelReloadInput(RequestBody):
+    models: list[str] | None = None
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of in-process latency histograms and counters."""
+    return PlainTextResponse(metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.post("/admin/models/reload", status_code=202)
+def reload_models(
+    background_tasks: BackgroundTasks,
+    data: ModelReloadInput | None = None,
+    _api_key: str = Depends(verify_api_key),
+):
+    """
+    Load, warm up, and swap models in the background while the current versions keep serving.
+    """
+    model_names = (data.models if data else None) or sorted(model_manager.flavors)
+    unknown = sorted(set(model_names) - set(model_manager.flavors))
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown model(s): {', '.join(unknown)}")
+    if model_manager.reloading:
+        raise HTTPException(status_code=409, detail="Model reload already in progress")
+
+    background_tasks.add_task(model_manager.reload, model_names)
+    return {
+        "status": "reload_scheduled",
+        "models": model_names,
+        "active_versions": {name: model_manager.versions.get(name) for name in model_names},
     }
 
 
 @app.get("/ready")
-def readiness_check():
+def readiness_check(if_none_match: str | None = Header(default=None)):
     """Report optional generated outputs separately from API liveness."""
     generated_tables = {
         "logistics_predictions": table_exists("logistics_predictions"),
         "customer_segments": table_exists("customer_segments"),
     }
-    return {
+    payload = {
         "status": "ready" if all(generated_tables.values()) else "partial",
         "database_configured": bool(DATABASE_URL),
         "api_key_configured": bool(API_KEY),
         "generated_tables": generated_tables,
+        "data_generation": response_cache.generation(),
         "loaded_models": sorted(models),
     }
+    return _conditional_response(CachedResponse(payload, response_etag(payload)), if_none_match)
 
 
 @app.get("/orders/{order_id}/prediction", response_model=LogisticsPrediction)
-def get_order_prediction(order_id: str, db: Session = Depends(get_db)):
+async def get_order_prediction(order_id: str, db: Session | AsyncSession = Depends(get_lookup_db)):
     """
     Get logistics prediction for a specific order.
     """
-    require_table("logistics_predictions")
+    await require_lookup_table("logistics_predictions")
     query = text("SELECT order_id, customer_id, predicted_delivery_days, delivery_days FROM logistics_predictions WHERE order_id = :order_id")
-    result = db.execute(query, {"order_id": order_id}).fetchone()
+    result = (await _execute(db, query, {"order_id": order_id}, "order_prediction")).fetchone()
     
     if not result:
         raise HTTPException(status_code=404, detail="Order prediction not found")
@@ -307,13 +545,16 @@ def get_order_prediction(order_id: str, db: Session = Depends(get_db)):
     )
 
 @app.get("/customers/{customer_unique_id}/segment", response_model=CustomerSegment)
-def get_customer_segment(customer_unique_id: str, db: Session = Depends(get_db)):
+async def get_customer_segment(
+    customer_unique_id: str,
+    db: Session | AsyncSession = Depends(get_lookup_db),
+):
     """
     Get segment info for a specific customer.
     """
-    require_table("customer_segments")
+    await require_lookup_table("customer_segments")
     query = text("SELECT customer_unique_id, \"Recency\", \"Frequency\", \"Monetary\", \"Cluster\", \"Segment\" FROM customer_segments WHERE customer_unique_id = :id")
-    result = db.execute(query, {"id": customer_unique_id}).fetchone()
+    result = (await _execute(db, query, {"id": customer_unique_id}, "customer_segment")).fetchone()
     
     if not result:
         raise HTTPException(status_code=404, detail="Customer segment not found")
@@ -327,45 +568,265 @@ def get_customer_segment(customer_unique_id: str, db: Session = Depends(get_db))
         segment=result[5]
     )
 
-@app.get("/segments")
-def get_segment_distribution(db: Session = Depends(get_db)):
-    """Return customer counts by segment for dashboard summary cards."""
-    require_table("customer_segments")
+def _unique_lookup_ids(ids: list[str]) -> list[str]:
+    unique_ids = list(dict.fromkeys(ids))
+    if len(unique_ids) > LOOKUP_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lookup exceeds maximum of {LOOKUP_BATCH_MAX_IDS} IDs",
+        )
+    return unique_ids
+
+
+async def _lookup_rows_by_id(db, query, ids: list[str], query_name: str) -> dict:
+    """Run ``query`` (``IN :ids``) once per chunk and index the rows by their first column."""
+    rows_by_id = {}
+    for start in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+        chunk = ids[start:start + LOOKUP_CHUNK_SIZE]
+        for row in (await _execute(db, query, {"ids": chunk}, query_name)).fetchall():
+            rows_by_id.setdefault(row[0], row)
+    return rows_by_id
+
+
+def _lookup_batch_response(ids: list[str], rows_by_id: dict, to_item) -> dict:
+    return {
+        "requested": len(ids),
+        "found": [to_item(rows_by_id[value]) for value in ids if value in rows_by_id],
+        "missing": [value for value in ids if value not in rows_by_id],
+    }
+
+
+@app.post("/orders/predictions/batch")
+async def get_order_predictions_batch(
+    data: LookupBatchInput,
+    db: Session | AsyncSession = Depends(get_lookup_db),
+):
+    """
+    Bulk variant of ``/orders/{order_id}/prediction`` using chunked IN queries.
+    """
+    await require_lookup_table("logistics_predictions")
+    order_ids = _unique_lookup_ids(data.ids)
+    query = text(
+        "SELECT order_id, customer_id, predicted_delivery_days, delivery_days "
+        "FROM logistics_predictions WHERE order_id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    rows_by_id = await _lookup_rows_by_id(db, query, order_ids, "order_prediction_batch")
+
+    return _lookup_batch_response(
+        order_ids,
+        rows_by_id,
+        lambda row: LogisticsPrediction(
+            order_id=row[0],
+            customer_id=row[1],
+            predicted_delivery_days=row[2],
+            actual_delivery_days=row[3],
+        ),
+    )
+
+@app.post("/customers/segments/batch")
+async def get_customer_segments_batch(
+    data: LookupBatchInput,
+    db: Session | AsyncSession = Depends(get_lookup_db),
+):
+    """
+    Bulk variant of ``/customers/{customer_unique_id}/segment`` using chunked IN queries.
+    """
+    await require_lookup_table("customer_segments")
+    customer_ids = _unique_lookup_ids(data.ids)
+    query = text(
+        "SELECT customer_unique_id, \"Recency\", \"Frequency\", \"Monetary\", \"Cluster\", \"Segment\" "
+        "FROM customer_segments WHERE customer_unique_id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    rows_by_id = await _lookup_rows_by_id(db, query, customer_ids, "customer_segment_batch")
+
+    return _lookup_batch_response(
+        customer_ids,
+        rows_by_id,
+        lambda row: CustomerSegment(
+            customer_unique_id=row[0],
+            recency=row[1],
+            frequency=row[2],
+            monetary=row[3],
+            cluster=row[4],
+            segment=row[5],
+        ),
+    )
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", iter_ndjson),
+    "csv": ("text/csv; charset=utf-8", iter_csv),
+}
+
+
+@app.get("/exports/{table_name}")
+def export_generated_table(
+    table_name: Literal["customer_segments", "logistics_predictions"],
+    export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    page_size: int = Query(default=EXPORT_PAGE_SIZE, ge=1, le=50_000),
+    _api_key: str = Depends(verify_api_key),
+):
+    """
+    Stream a whole generated table as NDJSON or CSV in keyset-paginated chunks.
+    """
+    require_table(table_name)
+    media_type, serialize = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        serialize(engine, EXPORT_TABLES[table_name], page_size),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{table_name}.{export_format}"'},
+    )
+
+@app.get("/customers/{customer_unique_id}/repeat-purchase-risk")
+async def get_customer_repeat_purchase_risk(
+    customer_unique_id: str,
+    db: Session | AsyncSession = Depends(get_lookup_db),
+):
+    """
+    Precomputed repeat-purchase risk from the offline ``repeat_purchase_scores`` job.
+    """
+    await require_lookup_table("repeat_purchase_scores")
     query = text("""
-        SELECT "Segment", COUNT(*) AS customer_count
-        FROM customer_segments
-        GROUP BY "Segment"
-        ORDER BY customer_count DESC
+        SELECT customer_unique_id, recency, frequency, monetary,
+               repeat_purchase_risk, repeat_purchase_risk_probability, risk_level,
+               features_as_of, model_version, scored_at_utc
+        FROM repeat_purchase_scores
+        WHERE customer_unique_id = :id
     """)
-    rows = db.execute(query, {}).fetchall()
-    segments = [
-        {"segment": row[0], "customer_count": int(row[1])}
-        for row in rows
-    ]
+    result = (await _execute(db, query, {"id": customer_unique_id}, "repeat_purchase_score")).fetchone()
+
+    if not result:
+        raise HTTPException(status_code=404, detail="Customer repeat-purchase score not found")
 
     return {
-        "segments": segments,
-        "total_customers": sum(item["customer_count"] for item in segments),
+        "customer_unique_id": result[0],
+        "prediction_type": REPEAT_PURCHASE_RISK_TYPE,
+        "features": {"recency": result[1], "frequency": result[2], "monetary": result[3]},
+        "repeat_purchase_risk": bool(result[4]),
+        "repeat_purchase_risk_probability": float(result[5]),
+        "risk_level": result[6],
+        "features_as_of": result[7],
+        "model_version": result[8],
+        "scored_at_utc": result[9],
+        "claim_boundary": REPEAT_PURCHASE_RISK_CLAIM_BOUNDARY,
     }
 
+@app.get("/segments")
+async def get_segment_distribution(
+    db: Session | AsyncSession = Depends(get_lookup_db),
+    if_none_match: str | None = Header(default=None),
+):
+    """
+    Return customer counts by segment for dashboard summary cards.
+
+    The aggregate is cached per data generation and served with an ETag.
+    """
+    await require_lookup_table("customer_segments")
+    generation = await run_in_threadpool(response_cache.generation)
+    cached = response_cache.get("segments", generation)
+    if cached is None:
+        query = text("""
+            SELECT "Segment", COUNT(*) AS customer_count
+            FROM customer_segments
+            GROUP BY "Segment"
+            ORDER BY customer_count DESC
+        """)
+        rows = (await _execute(db, query, {}, "segment_distribution")).fetchall()
+        segments = [
+            {"segment": row[0], "customer_count": int(row[1])}
+            for row in rows
+        ]
+        cached = response_cache.put("segments", generation, {
+            "segments": segments,
+            "total_customers": sum(item["customer_count"] for item in segments),
+        })
+
+    return _conditional_response(cached, if_none_match)
+
+def _recommend_personalized(artifact: dict, customer_id: str, top_k: int) -> list:
+    with MODEL_INFERENCE_LATENCY.time(model="recommender"):
+        return recommend_from_artifact(artifact, customer_id, top_k=top_k)
+
+
+def _recommend_fold_in(artifact: dict, product_ids: list[str], purchase_counts, top_k: int) -> list:
+    with MODEL_INFERENCE_LATENCY.time(model="recommender"):
+        return recommend_from_history(artifact, product_ids, purchase_counts, top_k=top_k)
+
+
+async def _purchase_history(db, customer_id: str) -> tuple[list[str], list[int]]:
+    """The customer's purchased products and counts from the order tables; empty if unavailable."""
+    await _load_schema_catalog()
+    if not table_exists("order_items"):
+        return [], []
+    try:
+        rows = (await _execute(
+            db,
+            PURCHASE_HISTORY_QUERY,
+            {"customer_id": customer_id, "limit": RECOMMEND_HISTORY_MAX_ITEMS},
+            "purchase_history",
+        )).fetchall()
+    except Exception as e:
+        logger.warning("Purchase history lookup failed; skipping fold-in: %s", e)
+        return [], []
+    return [row[0] for row in rows], [row[1] for row in rows]
+
+
+async def _precomputed_recommendations(db, customer_id: str, top_k: int) -> list[str]:
+    """Return batch-job rows for the user, or [] if absent, unversioned, or built from another model version."""
+    await _load_schema_catalog()
+    if not table_exists("customer_recommendations"):
+        return []
+    query = text("""
+        SELECT product_id, artifact_version
+        FROM customer_recommendations
+        WHERE customer_id = :customer_id
+        ORDER BY rank
+        LIMIT :limit
+    """)
+    try:
+        rows = (await _execute(
+            db, query, {"customer_id": customer_id, "limit": top_k}, "customer_recommendations"
+        )).fetchall()
+    except Exception as e:
+        logger.warning("Precomputed recommendation lookup failed; scoring live: %s", e)
+        return []
+    active_version = model_manager.versions.get("recommender")
+    if not rows or active_version is None or rows[0][1] != active_version:
+        return []
+    return [row[0] for row in rows]
+
+
 @app.post("/recommend")
-def recommend_products(
+async def recommend_products(
     data: RecommendationInput,
-    db: Session = Depends(get_db),
+    db: Session | AsyncSession = Depends(get_lookup_db),
     _api_key: str = Depends(verify_api_key),
 ):
     """
     Personalized Product Recommendation using SVD (Collaborative Filtering).
-    Falls back to popularity-based recommendation if user is unknown.
+    Known users are served from the precomputed ``customer_recommendations``
+    table when it matches the active model. Customers the model was not
+    trained on are folded in from ``history`` in the request, else from their
+    orders in the database; popularity-based recommendation is the last resort.
     """
-    recommendations = []
     method = "popularity_fallback (User Unknown)"
-    
+
+    # 0. Precomputed batch recommendations: (customer_id, rank) key lookup
+    precomputed = await _precomputed_recommendations(db, data.customer_id, data.top_k)
+    if precomputed:
+        return _recommendation_response(
+            customer_id=data.customer_id,
+            recommendations=precomputed,
+            method="precomputed_svd",
+            item_type="product_id",
+            personalization_level="personalized",
+        )
+
     # 1. Try SVD Model
     if "recommender" in models:
         try:
             artifact = models["recommender"]
-            final_recommendations = recommend_from_artifact(
+            final_recommendations = await run_in_threadpool(
+                _recommend_personalized,
                 artifact,
                 data.customer_id,
                 top_k=data.top_k,
@@ -382,10 +843,40 @@ def recommend_products(
             logger.warning("SVD recommendation failed; using popularity fallback: %s", e)
             # Fallback to popularity
             pass
+
+        # 1b. Fold-in: score the customer's product history against the trained factors
+        try:
+            backend = models["recommender"].get("backend", "svd")
+            if data.history:
+                product_ids, purchase_counts, method = data.history, None, f"fold_in_{backend}_request_history"
+            else:
+                product_ids, purchase_counts = await _purchase_history(db, data.customer_id)
+                method = f"fold_in_{backend}_order_history"
+            if product_ids:
+                final_recommendations = await run_in_threadpool(
+                    _recommend_fold_in,
+                    models["recommender"],
+                    product_ids,
+                    purchase_counts,
+                    top_k=data.top_k,
+                )
+                if final_recommendations:
+                    return _recommendation_response(
+                        customer_id=data.customer_id,
+                        recommendations=final_recommendations,
+                        method=method,
+                        item_type="product_id",
+                        personalization_level="personalized",
+                    )
+        except Exception as e:
+            logger.warning("Fold-in recommendation failed; using popularity fallback: %s", e)
+        method = "popularity_fallback (User Unknown)"
             
     # 2. Popularity Fallback (if SVD failed or user unknown)
-    if not recommendations:
-        # Get top selling products from DB
+    personalization_level = "category_popularity_fallback"
+    recommendations = category_popularity.top(data.top_k)
+    if recommendations is None:
+        # Ranking not precomputed yet: get top selling products from DB
         try:
             query = text("""
                 SELECT p.product_category_name 
@@ -395,20 +886,19 @@ def recommend_products(
                 ORDER BY COUNT(*) DESC
                 LIMIT :limit
             """)
-            result = db.execute(query, {"limit": data.top_k}).fetchall()
+            result = (await _execute(db, query, {"limit": data.top_k}, "category_popularity")).fetchall()
             recommendations = [row[0] for row in result if row[0]]
-            personalization_level = "category_popularity_fallback"
-            
-            # If still empty (e.g. empty DB), use generic fallback
-            if not recommendations:
-                recommendations = ["relogios_presentes", "cama_mesa_banho", "esporte_lazer", "informatica_acessorios", "moveis_decoracao"]
-                personalization_level = "static_category_fallback"
-                
         except Exception as e:
             logger.warning("Popularity recommendation query failed; using static fallback: %s", e)
             recommendations = ["relogios_presentes", "cama_mesa_banho", "esporte_lazer"]
             personalization_level = "static_category_fallback"
-    
+
+    # If still empty (e.g. empty DB), use generic fallback
+    if not recommendations:
+        recommendations = ["relogios_presentes", "cama_mesa_banho", "esporte_lazer", "informatica_acessorios", "moveis_decoracao"]
+        personalization_level = "static_category_fallback"
+
+    FALLBACK_RESPONSES.inc(endpoint="/recommend", fallback=personalization_level)
     return _recommendation_response(
         customer_id=data.customer_id,
         recommendations=recommendations,
@@ -9,6 +9,19 @@ load_dotenv()
 # src/config.py -> src/ -> olist-intelligence/
 PROJECT_ROOT = Path(__file__).parent.parent
 MODELS_PATH = PROJECT_ROOT / "models"
+# Latent-factor backend: "svd" (TruncatedSVD) or "als" (implicit-feedback ALS)
+RECOMMENDER_BACKEND = os.getenv("RECOMMENDER_BACKEND", "svd").lower()
+# SVD rank; compare candidates with scripts/sweep_recommender_rank.py
+RECOMMENDER_N_COMPONENTS = int(os.getenv("RECOMMENDER_N_COMPONENTS", "20"))
+# Optional cap (MB) on the recommender's COO -> CSR conversion; above it the matrix is built in chunks
+RECOMMENDER_BUILD_MEMORY_BYTES = int(os.getenv("RECOMMENDER_BUILD_MEMORY_MB", "0")) * 1024 * 1024 or None
+# Build an IVF index next to the recommender factors for approximate retrieval
+RECOMMENDER_ANN_INDEX = os.getenv("RECOMMENDER_ANN_INDEX", "false").lower() in {"1", "true", "yes"}
+# Read every page of the mapped recommender arrays during warmup; startup then grows with artifact size
+RECOMMENDER_WARMUP_PREFAULT = os.getenv("RECOMMENDER_WARMUP_PREFAULT", "false").lower() in {"1", "true", "yes"}
+# Incremental recommender updates fold new data in until one of these is crossed, then refit fully
+RECOMMENDER_REFIT_MAX_AGE_DAYS = float(os.getenv("RECOMMENDER_REFIT_MAX_AGE_DAYS", "30"))
+RECOMMENDER_REFIT_MAX_DRIFT = float(os.getenv("RECOMMENDER_REFIT_MAX_DRIFT", "0.2"))
 
 configured_data_path = os.getenv("DATA_RAW_PATH")
 if configured_data_path:
@@ -0,0 +1,29 @@
+"""Optional async engine for API lookup endpoints."""
+from sqlalchemy.engine import make_url
+
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_database_url(database_url: str) -> str:
+    """Swap the sync driver for aiosqlite (SQLite) or asyncpg (Postgres)."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def create_async_session_factory(database_url: str):
+    """
+    Return ``(async_engine, async_sessionmaker)`` for the configured database.
+
+    Raises ``ImportError`` when the async driver package is not installed.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(to_async_database_url(database_url))
+    return async_engine, async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
@@ -0,0 +1,45 @@
+"""Marker row that changes whenever generated output tables are rebuilt."""
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.database.schema_catalog import invalidate_schema_catalog
+
+
+DATA_GENERATION_TABLE = "data_generation"
+
+
+def new_generation_id() -> str:
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%fZ}-{uuid4().hex[:8]}"
+
+
+def write_data_generation(engine, source: str) -> str:
+    """
+    Record a new generation after ``customer_segments`` / ``logistics_predictions`` are rewritten.
+
+    Notebooks that replace generated tables should call this too, so API
+    caches and ETags keyed on the generation are refreshed.
+    """
+    generation_id = new_generation_id()
+    pd.DataFrame(
+        [{
+            "generation_id": generation_id,
+            "source": source,
+            "created_at_utc": datetime.now(timezone.utc).isoformat(),
+        }]
+    ).to_sql(DATA_GENERATION_TABLE, engine, if_exists="replace", index=False)
+    invalidate_schema_catalog(engine.url)
+    return generation_id
+
+
+def read_data_generation(engine) -> str | None:
+    """Return the current generation ID, or ``None`` for databases built without the marker."""
+    try:
+        with engine.connect() as conn:
+            row = conn.execute(text(f"SELECT generation_id FROM {DATA_GENERATION_TABLE}")).fetchone()
+    except SQLAlchemyError:
+        return None
+    return row[0] if row else None
@@ -0,0 +1,34 @@
+"""Per-customer product history from the raw order tables, for recommender fold-in."""
+from sqlalchemy import text
+
+from src.database.schema_catalog import get_table_names
+from src.database.table_names import CUSTOMERS_TABLE, ORDER_ITEMS_TABLE, ORDERS_TABLE
+
+
+# Join keys of the history query; without them each lookup scans order_items
+PURCHASE_HISTORY_INDEXES = (
+    (CUSTOMERS_TABLE, "customer_unique_id"),
+    (ORDERS_TABLE, "customer_id"),
+    (ORDER_ITEMS_TABLE, "order_id"),
+)
+
+PURCHASE_HISTORY_QUERY = text(f"""
+    SELECT oi.product_id, COUNT(*) AS purchase_count
+    FROM {ORDER_ITEMS_TABLE} oi
+    JOIN {ORDERS_TABLE} o ON oi.order_id = o.order_id
+    JOIN {CUSTOMERS_TABLE} c ON o.customer_id = c.customer_id
+    WHERE c.customer_unique_id = :customer_id
+    GROUP BY oi.product_id
+    ORDER BY purchase_count DESC, oi.product_id
+    LIMIT :limit
+""")
+
+
+def create_purchase_history_indexes(engine, table_names=None) -> None:
+    """Index the history join path so a lookup touches only one customer's rows; absent tables are skipped."""
+    existing = set(get_table_names(engine) if table_names is None else table_names)
+    with engine.begin() as conn:
+        for table, column in PURCHASE_HISTORY_INDEXES:
+            if table not in existing:
+                continue
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} ON {table} ({column})"))
@@ -1,6 +1,7 @@
 import pandas as pd
-from sqlalchemy import inspect, text
+from sqlalchemy import text
 from src.database.db_client import get_db_connection
+from src.database.schema_catalog import get_table_names
 from src.database import (
     action_repository,
     customer_repository,
@@ -14,7 +15,7 @@ engine = get_db_connection()
 
 def get_generated_output_status():
     """Report whether notebook/model-generated dashboard tables are available."""
-    table_names = set(inspect(engine).get_table_names())
+    table_names = get_table_names(engine)
     return {
         "logistics_predictions": "logistics_predictions" in table_names,
         "customer_segments": "customer_segments" in table_names,
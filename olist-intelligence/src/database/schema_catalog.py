@@ -0,0 +1,91 @@
+"""Process-level cache of database table and view names."""
+import os
+import threading
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import make_url
+
+
+SCHEMA_CATALOG_TTL_SECONDS = float(os.getenv("SCHEMA_CATALOG_TTL_SECONDS", "30"))
+
+
+def _catalog_key(database_url) -> str:
+    return make_url(str(database_url)).render_as_string(hide_password=True)
+
+
+class SchemaCatalog:
+    """
+    Cache ``inspect(engine)`` catalog lookups per database URL.
+
+    Entries expire after ``ttl_seconds`` so schema changes made by other
+    processes are picked up; writers in the same process call ``invalidate``
+    to make their new tables visible immediately.
+    """
+
+    def __init__(self, ttl_seconds: float = SCHEMA_CATALOG_TTL_SECONDS, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: dict[tuple[str, str], tuple[float, frozenset[str]]] = {}
+        self._lock = threading.Lock()
+
+    def table_names(self, engine) -> frozenset[str]:
+        return self._lookup(engine, "tables", lambda inspector: inspector.get_table_names())
+
+    def view_names(self, engine) -> frozenset[str]:
+        return self._lookup(engine, "views", lambda inspector: inspector.get_view_names())
+
+    def cached_table_names(self, engine) -> frozenset[str] | None:
+        """Unexpired cached table names, or ``None``; never inspects the database."""
+        with self._lock:
+            cached = self._entries.get((_catalog_key(engine.url), "tables"))
+        return cached[1] if cached is not None and cached[0] > self._clock() else None
+
+    def relation_names(self, engine) -> frozenset[str]:
+        return self.table_names(engine) | self.view_names(engine)
+
+    def invalidate(self, database_url=None):
+        """Drop cached names for one database URL, or for every database."""
+        with self._lock:
+            if database_url is None:
+                self._entries.clear()
+                return
+            key = _catalog_key(database_url)
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == key]:
+                del self._entries[entry_key]
+
+    def _lookup(self, engine, kind: str, loader) -> frozenset[str]:
+        key = (_catalog_key(engine.url), kind)
+        now = self._clock()
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        names = frozenset(loader(inspect(engine)))
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, names)
+        return names
+
+
+schema_catalog = SchemaCatalog()
+
+
+def get_table_names(engine) -> frozenset[str]:
+    """Return cached table names for an engine."""
+    return schema_catalog.table_names(engine)
+
+
+def get_cached_table_names(engine) -> frozenset[str] | None:
+    """Return cached table names for an engine without touching the database, or None if stale."""
+    return schema_catalog.cached_table_names(engine)
+
+
+def get_relation_names(engine) -> frozenset[str]:
+    """Return cached table and view names for an engine."""
+    return schema_catalog.relation_names(engine)
+
+
+def invalidate_schema_catalog(database_url=None):
+    """Invalidation hook for code that creates, replaces, or drops relations."""
+    schema_catalog.invalidate(database_url)
@@ -0,0 +1,149 @@
+"""Precompute top-k recommendations for every known customer."""
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from src.database.data_generation import write_data_generation
+from src.database.schema_catalog import invalidate_schema_catalog
+from src.ml.recommender import top_k_unseen_block
+from src.ml.recommender_store import artifact_to_arrays, decode_ids
+
+
+CUSTOMER_RECOMMENDATIONS_TABLE = "customer_recommendations"
+# Matches the /recommend top_k upper bound, so every request fits in the table
+RECOMMENDATIONS_PER_CUSTOMER = 20
+# Score-block budget; 64 MB is ~250 users against a 33k-product catalog
+RECOMMENDATION_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def _score_block(arrays: dict, start: int, stop: int, top_k: int) -> pd.DataFrame:
+    scores = arrays["matrix_reduced"][start:stop] @ arrays["product_components"]
+    indices, block_scores = top_k_unseen_block(
+        scores, arrays["seen_indptr"][start:stop + 1], arrays["seen_indices"], top_k
+    )
+    valid = np.isfinite(block_scores)
+    user_rows, ranks = np.nonzero(valid)
+    return pd.DataFrame({
+        "customer_id": decode_ids(arrays["user_ids"][start + user_rows]),
+        "rank": (ranks + 1).astype(np.int16),
+        "product_id": decode_ids(arrays["product_ids"][indices[valid]]),
+        "score": block_scores[valid].astype(np.float32),
+    })
+
+
+def iter_recommendation_blocks(
+    artifact: dict,
+    top_k: int = RECOMMENDATIONS_PER_CUSTOMER,
+    block_users: int | None = None,
+    workers: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield long-format ``(customer_id, rank, product_id, score)`` frames in user order.
+
+    Each block is one ``(block_users, products)`` matmul plus a row-wise top-k;
+    NumPy releases the GIL there, so blocks run on a thread pool. Blocks are
+    sized to ``RECOMMENDATION_BLOCK_BYTES`` of scores and at most
+    ``2 * workers`` are in flight, so peak memory does not grow with users.
+    """
+    arrays = artifact_to_arrays(artifact)
+    workers = workers or os.cpu_count() or 1
+    users = len(arrays["user_ids"])
+    if block_users is None:
+        score_dtype = np.result_type(arrays["matrix_reduced"].dtype, arrays["product_components"].dtype)
+        score_bytes = len(arrays["product_ids"]) * score_dtype.itemsize
+        block_users = max(1, RECOMMENDATION_BLOCK_BYTES // score_bytes)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recommend-block") as executor:
+        pending = deque()
+        for start in range(0, users, block_users):
+            pending.append(executor.submit(_score_block, arrays, start, min(start + block_users, users), top_k))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_customer_recommendations(engine, artifact: dict, artifact_version: str | None = None, **kwargs) -> int:
+    """Write every block to a staging table, then swap it in with a ``(customer_id, rank)`` key."""
+    staging = f"{CUSTOMER_RECOMMENDATIONS_TABLE}_staging"
+    rows = 0
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+    for block in iter_recommendation_blocks(artifact, **kwargs):
+        block.assign(artifact_version=artifact_version).to_sql(staging, engine, if_exists="append", index=False)
+        rows += len(block)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {CUSTOMER_RECOMMENDATIONS_TABLE}"))
+        conn.execute(text(f"ALTER TABLE {staging} RENAME TO {CUSTOMER_RECOMMENDATIONS_TABLE}"))
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS pk_{CUSTOMER_RECOMMENDATIONS_TABLE} "
+            f"ON {CUSTOMER_RECOMMENDATIONS_TABLE} (customer_id, rank)"
+        ))
+    invalidate_schema_catalog(engine.url)
+    return rows
+
+
+def write_recommendations_parquet(path: Path, artifact: dict, artifact_version: str | None = None, **kwargs) -> int:
+    """Stream every block into one Parquet file (one row group per block)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    writer = None
+    try:
+        for block in iter_recommendation_blocks(artifact, **kwargs):
+            table = pa.Table.from_pandas(block.assign(artifact_version=artifact_version), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(block)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def run_batch_recommendations(engine=None, artifact=None, artifact_version=None, parquet_path=None, **kwargs) -> dict:
+    """Load the serving recommender artifact and publish recommendations for all users."""
+    if artifact is None:
+        from src.ml.registry import load_production_model_version
+
+        artifact, artifact_version = load_production_model_version("recommender", flavor="arrays")
+    if parquet_path is not None:
+        rows = write_recommendations_parquet(parquet_path, artifact, artifact_version, **kwargs)
+        return {"rows": rows, "parquet_path": str(parquet_path), "artifact_version": artifact_version}
+
+    if engine is None:
+        from src.ml.data import get_db_engine
+
+        engine = get_db_engine()
+    rows = write_customer_recommendations(engine, artifact, artifact_version, **kwargs)
+    generation_id = write_data_generation(engine, source="batch_recommendations")
+    return {"rows": rows, "artifact_version": artifact_version, "data_generation": generation_id}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute recommendations for every known customer.")
+    parser.add_argument("--parquet", type=Path, default=None, help="Write Parquet instead of the database table")
+    parser.add_argument("--top-k", type=int, default=RECOMMENDATIONS_PER_CUSTOMER)
+    parser.add_argument("--block-users", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    result = run_batch_recommendations(
+        parquet_path=args.parquet,
+        top_k=args.top_k,
+        block_users=args.block_users,
+        workers=args.workers,
+    )
+    print(f"✅ Toplu öneriler yazıldı: {result}")
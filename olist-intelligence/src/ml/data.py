@@ -2,6 +2,7 @@ import pandas as pd
 from sqlalchemy import text, create_engine
 from src.config import DATABASE_URL
 from src.database.query_limits import clamp_limit
+from src.ml.feature_schema import CHURN_FEATURES, LOGISTICS_FEATURES
 from src.ml.features import haversine_distance
 
 
@@ -117,19 +118,8 @@ def get_logistics_data(limit=None, include_timestamps=False, include_estimates=F
     # Derived feature: freight_ratio
     df['freight_ratio'] = df['freight_value'] / df['price'].replace(0, 1)
     
-    # 10 Features
-    feature_cols = [
-        'freight_value',           # 1
-        'price',                   # 2
-        'product_weight_g',        # 3
-        'product_description_lenght',  # 4
-        'distance_km',             # 5
-        'same_state',              # 6
-        'seller_avg_rating',       # 7
-        'product_photos_qty',      # 8
-        'product_volume',          # 9
-        'freight_ratio'            # 10
-    ]
+    # 10 Features, in the order declared for serving
+    feature_cols = list(LOGISTICS_FEATURES.columns)
 
     df = df.sort_values('order_purchase_timestamp').reset_index(drop=True)
     features = df[feature_cols]
@@ -143,14 +133,8 @@ def get_logistics_data(limit=None, include_timestamps=False, include_estimates=F
         return tuple(result)
     return features, target
 
-def get_churn_data(limit=None):
-    """
-    Build a temporal churn dataset.
-
-    Features are calculated at a cutoff 90 days before the dataset end. The
-    target indicates whether the customer made no delivered purchase during
-    the following 90-day label window.
-    """
+def _load_delivered_order_items(engine=None):
+    """Return delivered order-item rows per customer and the dataset end timestamp."""
     query_orders = """
     SELECT 
         c.customer_unique_id,
@@ -168,31 +152,45 @@ def get_churn_data(limit=None):
     WHERE order_status = 'delivered'
     """
     
-    engine = get_db_engine()
+    engine = engine or get_db_engine()
     with engine.connect() as conn:
         df = pd.read_sql(text(query_orders), conn)
         max_date_str = pd.read_sql(text(query_max_date), conn).iloc[0, 0]
         
     df['order_purchase_timestamp'] = pd.to_datetime(df['order_purchase_timestamp'])
-    dataset_end = pd.to_datetime(max_date_str)
-    feature_cutoff = dataset_end - pd.Timedelta(days=90)
+    return df, pd.to_datetime(max_date_str)
 
-    feature_orders = df[df['order_purchase_timestamp'] <= feature_cutoff]
-    label_orders = df[
-        (df['order_purchase_timestamp'] > feature_cutoff)
-        & (df['order_purchase_timestamp'] <= dataset_end)
-    ]
 
+def build_customer_rfm(orders: pd.DataFrame, as_of) -> pd.DataFrame:
+    """Recency (days before ``as_of``), frequency and monetary from orders up to ``as_of``."""
+    feature_orders = orders[orders['order_purchase_timestamp'] <= as_of]
     customer_group = feature_orders.groupby('customer_unique_id').agg(
         last_order_date=('order_purchase_timestamp', 'max'),
         frequency=('order_id', 'nunique'),
         monetary=('price', 'sum')
     ).reset_index()
+    customer_group['recency'] = (as_of - customer_group['last_order_date']).dt.days
+    return customer_group
+
+
+def get_churn_data(limit=None):
+    """
+    Build a temporal churn dataset.
+
+    Features are calculated at a cutoff 90 days before the dataset end. The
+    target indicates whether the customer made no delivered purchase during
+    the following 90-day label window.
+    """
+    df, dataset_end = _load_delivered_order_items()
+    feature_cutoff = dataset_end - pd.Timedelta(days=90)
+
+    label_orders = df[
+        (df['order_purchase_timestamp'] > feature_cutoff)
+        & (df['order_purchase_timestamp'] <= dataset_end)
+    ]
+    customer_group = build_customer_rfm(df, feature_cutoff)
 
     active_in_label_window = set(label_orders['customer_unique_id'].unique())
-    customer_group['recency'] = (
-        feature_cutoff - customer_group['last_order_date']
-    ).dt.days
     customer_group['churned'] = (
         ~customer_group['customer_unique_id'].isin(active_in_label_window)
     ).astype(int)
@@ -203,17 +201,41 @@ def get_churn_data(limit=None):
 
     customer_group = customer_group.reset_index(drop=True)
     
-    feature_cols = ['recency', 'frequency', 'monetary']
+    feature_cols = list(CHURN_FEATURES.columns)
     
     return customer_group[feature_cols], customer_group['churned']
 
-def get_recommender_data(limit=None):
+
+def get_customer_rfm(engine=None) -> tuple[pd.DataFrame, pd.Timestamp]:
+    """
+    RFM for every customer as of the dataset end, for batch scoring.
+
+    Same feature logic as ``get_churn_data``, but the cutoff is the latest
+    delivered purchase so every customer's full history is used.
+    """
+    df, dataset_end = _load_delivered_order_items(engine)
+    customer_group = build_customer_rfm(df, dataset_end)
+    return customer_group[['customer_unique_id', *CHURN_FEATURES.columns]], dataset_end
+
+def get_recommender_data(limit=None, since=None, until=None):
     """
     Fetches user-item interaction data for recommender system.
     Returns DataFrame with [customer_id, product_id, purchase_count].
+    ``since`` (exclusive) / ``until`` (inclusive) bound ``order_purchase_timestamp``
+    for incremental updates.
     """
     normalized_limit = _optional_limit(limit)
     limit_clause = "LIMIT :limit" if normalized_limit is not None else ""
+    params = {"limit": normalized_limit, "since": since, "until": until}
+    conditions = [
+        condition
+        for name, condition in (
+            ("since", "o.order_purchase_timestamp > :since"),
+            ("until", "o.order_purchase_timestamp <= :until"),
+        )
+        if params[name] is not None
+    ]
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
     
     query = f"""
     SELECT 
@@ -223,6 +245,7 @@ def get_recommender_data(limit=None):
     FROM order_items oi
     JOIN orders o ON oi.order_id = o.order_id
     JOIN customers c ON o.customer_id = c.customer_id
+    {where_clause}
     GROUP BY 1, 2
     {limit_clause}
     """
@@ -232,9 +255,21 @@ def get_recommender_data(limit=None):
         data = pd.read_sql(
             text(query),
             engine,
-            params={"limit": normalized_limit} if normalized_limit is not None else None,
+            params={name: value for name, value in params.items() if value is not None} or None,
         )
         return data
     except Exception as e:
         print(f"⚠️ Veri çekme hatası: {e}")
         return pd.DataFrame()
+
+
+def get_recommender_watermark():
+    """Latest ``order_purchase_timestamp``; recommender builds record it as ``interactions_through``."""
+    engine = get_db_engine()
+    try:
+        with engine.connect() as conn:
+            watermark = conn.execute(text("SELECT MAX(order_purchase_timestamp) FROM orders")).scalar()
+    except Exception as e:
+        print(f"⚠️ Veri çekme hatası: {e}")
+        return None
+    return None if watermark is None else str(watermark)
@@ -0,0 +1,86 @@
+"""Declared model feature order for pandas-free inference."""
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Iterable
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class FeatureSchema:
+    """Training column order plus the input attribute that feeds each column."""
+
+    name: str
+    columns: tuple[str, ...]
+    sources: tuple[str, ...] | None = None
+
+    def __post_init__(self):
+        if self.sources is not None and len(self.sources) != len(self.columns):
+            raise ValueError(f"{self.name} schema sources must match its columns")
+
+    @property
+    def source_attributes(self) -> tuple[str, ...]:
+        return self.sources or self.columns
+
+    def to_matrix(self, rows: Iterable) -> np.ndarray:
+        """Copy validated input objects into a float32 matrix in training order."""
+        rows = list(rows)
+        matrix = np.empty((len(rows), len(self.columns)), dtype=np.float32)
+        read_values = attrgetter(*self.source_attributes)
+        for index, row in enumerate(rows):
+            matrix[index] = read_values(row)
+        return matrix
+
+    def to_row(self, row) -> np.ndarray:
+        """Return a single ``(1, n_features)`` float32 row."""
+        return self.to_matrix([row])
+
+
+LOGISTICS_FEATURES = FeatureSchema(
+    name="logistics",
+    columns=(
+        "freight_value",               # 1
+        "price",                       # 2
+        "product_weight_g",            # 3
+        "product_description_lenght",  # 4
+        "distance_km",                 # 5
+        "same_state",                  # 6
+        "seller_avg_rating",           # 7
+        "product_photos_qty",          # 8
+        "product_volume",              # 9
+        "freight_ratio",               # 10
+    ),
+)
+
+CHURN_FEATURES = FeatureSchema(
+    name="churn",
+    columns=("recency", "frequency", "monetary"),
+    sources=("days_since_last_order", "frequency", "monetary"),
+)
+
+
+def predict_positive_class(model, matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return binary class labels and positive-class probability from one call."""
+    probabilities = np.asarray(model.predict_proba(matrix), dtype=float)[:, 1]
+    return probabilities > 0.5, probabilities
+
+
+# (minimum probability, label), highest first; anything lower is "Low"
+RISK_LEVEL_THRESHOLDS = ((0.7, "Critical"), (0.4, "Medium"))
+
+
+def risk_level(probability: float) -> str:
+    for threshold, label in RISK_LEVEL_THRESHOLDS:
+        if probability > threshold:
+            return label
+    return "Low"
+
+
+def risk_levels(probabilities: np.ndarray) -> np.ndarray:
+    """Vectorized ``risk_level`` for batch scoring."""
+    probabilities = np.asarray(probabilities)
+    return np.select(
+        [probabilities > threshold for threshold, _label in RISK_LEVEL_THRESHOLDS],
+        [label for _threshold, label in RISK_LEVEL_THRESHOLDS],
+        default="Low",
+    )
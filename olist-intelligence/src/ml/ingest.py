@@ -5,12 +5,16 @@ import pandas as pd
 import polars as pl
 from datetime import datetime, timezone
 from sqlalchemy import create_engine, text
-from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from sqlalchemy.engine import make_url
 from typing import List
 import logging
 from tenacity import before_log, retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 from src.config import DATABASE_URL, DATA_RAW_PATH
+from src.database.data_generation import write_data_generation
+from src.database.purchase_history import create_purchase_history_indexes
+from src.database.schema_catalog import invalidate_schema_catalog
+from src.services.table_export import create_export_indexes
 from src.data_contract import (
     EXPECTED_CSV_SCHEMAS,
     table_name_from_csv,
@@ -141,6 +145,7 @@ class OlistIngestor:
 
     def load_predictions_from_csv(self):
         """Loads pre-calculated predictions if available (Streamlit Cloud support)."""
+        loaded_tables = []
         try:
             processed_dir = self.project_root / "data" / "processed"
             
@@ -150,6 +155,7 @@ class OlistIngestor:
                 print(f"📦 Loading pre-calculated logistics predictions from {log_path}...")
                 df_log = pd.read_csv(log_path)
                 df_log.to_sql("logistics_predictions", self.engine, if_exists="replace", index=False)
+                loaded_tables.append("logistics_predictions")
                 print("✅ Service restored: Logistics Engine")
             
             # 2. Customer Segments
@@ -158,10 +164,17 @@ class OlistIngestor:
                 print(f"📊 Loading pre-calculated customer segments from {seg_path}...")
                 df_seg = pd.read_csv(seg_path)
                 df_seg.to_sql("customer_segments", self.engine, if_exists="replace", index=False)
+                loaded_tables.append("customer_segments")
                 print("✅ Service restored: Growth Engine")
                 
+            if loaded_tables:
+                create_export_indexes(self.engine, loaded_tables)
+                write_data_generation(self.engine, source=f"load_predictions_from_csv:{','.join(loaded_tables)}")
+
         except Exception as e:
             logger.warning("Optional static prediction load failed: %s", e)
+        finally:
+            invalidate_schema_catalog(self.db_url)
 
     def get_csv_files(self) -> List[str]:
         """Scans the data directory for CSV files. Downloads if empty."""
@@ -212,6 +225,7 @@ class OlistIngestor:
             if_table_exists="replace",
             engine="sqlalchemy",
         )
+        invalidate_schema_catalog(self.db_url)
         db_rows = self._table_row_count(table_name)
         expected_columns = EXPECTED_CSV_SCHEMAS.get(file_name, [])
         missing_columns = [column for column in expected_columns if column not in df.columns]
@@ -271,6 +285,10 @@ class OlistIngestor:
         if quality_issues:
             summary = "; ".join(f"{issue.name}:{issue.issue}" for issue in quality_issues[:5])
             raise RuntimeError(f"Ingested database quality validation failed: {summary}")
+        try:
+            create_purchase_history_indexes(self.engine, [table["table_name"] for table in manifest_tables])
+        except SQLAlchemyError as e:
+            logger.warning("Purchase history indexes were not created: %s", e)
 
         self.load_predictions_from_csv()
         self.write_ingestion_manifest(manifest_tables)
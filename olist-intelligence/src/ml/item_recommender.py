@@ -0,0 +1,180 @@
+"""Item-item co-purchase recommender with precomputed top-N cosine neighbours."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from src.ml.recommender import (
+    _factorize_ids,
+    _product_indices,
+    _product_ids,
+    _seen_indices,
+    _user_index,
+    top_k_sparse_rows,
+)
+from src.ml.recommender_evaluation import DEFAULT_EVALUATION_KS, evaluate_rankings, leave_one_out_split
+
+
+ITEM_NEIGHBOURS = 50
+# Budget for one block of the item x item co-occurrence product (data, indices and sort buffers)
+NEIGHBOUR_BLOCK_BYTES = 256 * 1024 * 1024
+# Per stored co-occurrence entry: float64 data + int32 index + lexsort keys and positions
+_BYTES_PER_ENTRY = 40
+
+_worker_state: dict = {}
+
+
+def _interaction_matrix(interactions: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, csr_matrix]:
+    """Sorted byte-string ID vocabularies and a binary users x products CSR."""
+    user_rows, user_ids = _factorize_ids(interactions["customer_id"])
+    product_columns, product_ids = _factorize_ids(interactions["product_id"])
+    matrix = csr_matrix(
+        (np.ones(len(interactions), dtype=np.float64), (user_rows, product_columns)),
+        shape=(len(user_ids), len(product_ids)),
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1.0
+    return user_ids, product_ids, matrix
+
+
+def _neighbour_block(state: dict, start: int, stop: int):
+    """Cosine neighbours of products ``start:stop``: co-purchases / sqrt(buyers_i * buyers_j)."""
+    block = (state["by_product"][start:stop] @ state["by_user"]).tocsr()
+    rows = np.repeat(np.arange(start, stop), np.diff(block.indptr))
+    block.data /= np.sqrt(state["buyers"][rows] * state["buyers"][block.indices])
+    block.data[block.indices == rows] = 0.0
+    block.eliminate_zeros()
+    return top_k_sparse_rows(block, state["n_neighbours"])
+
+
+def _init_worker(state: dict) -> None:
+    _worker_state.update(state)
+
+
+def _worker_block(bounds: tuple[int, int]):
+    return _neighbour_block(_worker_state, *bounds)
+
+
+def _product_blocks(by_product: csr_matrix, by_user: csr_matrix, max_entries: int) -> list[tuple[int, int]]:
+    """
+    Cut products into ranges whose co-occurrence rows fit ``max_entries``.
+
+    A product's row can hold at most the summed basket sizes of its buyers,
+    so that upper bound is accumulated per product.
+    """
+    basket_sizes = np.diff(by_user.indptr).astype(np.int64)
+    row_bounds = by_product @ basket_sizes
+    bounds, start, total = [], 0, 0
+    for product, entries in enumerate(row_bounds):
+        if product > start and total + entries > max_entries:
+            bounds.append((start, product))
+            start, total = product, 0
+        total += entries
+    if start < len(row_bounds):
+        bounds.append((start, len(row_bounds)))
+    return bounds
+
+
+def build_item_neighbours(
+    interactions: pd.DataFrame,
+    n_neighbours: int = ITEM_NEIGHBOURS,
+    memory_budget_bytes: int = NEIGHBOUR_BLOCK_BYTES,
+    processes: int | None = None,
+) -> dict:
+    """
+    Build a top-N cosine co-purchase neighbour artifact.
+
+    The item x item product is computed one product range at a time, each
+    sized so its co-occurrence rows stay under ``memory_budget_bytes``, and
+    reduced to ``n_neighbours`` per product before the next range; ranges run
+    on ``processes`` workers (default: all CPUs). The artifact reuses the
+    compact layout (sorted byte-string IDs, CSR seen items) plus the
+    neighbour CSR ``neighbour_indptr``/``neighbour_indices``/``neighbour_scores``.
+    """
+    required = {"customer_id", "product_id"}
+    missing = required.difference(interactions.columns)
+    if missing:
+        raise ValueError(f"Missing recommender columns: {sorted(missing)}")
+    if interactions.empty:
+        raise ValueError("Recommender interactions cannot be empty")
+
+    user_ids, product_ids, by_user = _interaction_matrix(interactions)
+    by_product = by_user.T.tocsr()
+    state = {
+        "by_user": by_user,
+        "by_product": by_product,
+        "buyers": np.diff(by_product.indptr).astype(np.float64),
+        "n_neighbours": n_neighbours,
+    }
+    bounds = _product_blocks(by_product, by_user, max(1, memory_budget_bytes // _BYTES_PER_ENTRY))
+    processes = processes or os.cpu_count() or 1
+    if processes > 1 and len(bounds) > 1:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(state,)) as pool:
+            blocks = list(pool.map(_worker_block, bounds))
+    else:
+        blocks = [_neighbour_block(state, start, stop) for start, stop in bounds]
+
+    neighbour_indptr = np.zeros(len(product_ids) + 1, dtype=np.int64)
+    neighbour_indptr[1:] = np.cumsum(np.concatenate([np.diff(indptr) for indptr, _, _ in blocks]))
+    return {
+        "user_ids": user_ids,
+        "product_ids": product_ids,
+        "seen_indptr": by_user.indptr.astype(np.int64),
+        "seen_indices": by_user.indices.astype(np.int32),
+        "neighbour_indptr": neighbour_indptr,
+        "neighbour_indices": np.concatenate([indices for _, indices, _ in blocks]),
+        "neighbour_scores": np.concatenate([scores for _, _, scores in blocks]),
+    }
+
+
+def _recommend_from_columns(artifact: dict, columns: np.ndarray, weights: np.ndarray, top_k: int) -> list[str]:
+    indptr = artifact["neighbour_indptr"]
+    starts, stops = indptr[columns], indptr[columns + 1]
+    counts = stops - starts
+    positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    candidates, inverse = np.unique(artifact["neighbour_indices"][positions], return_inverse=True)
+    scores = np.bincount(
+        inverse,
+        weights=artifact["neighbour_scores"][positions] * np.repeat(weights, counts),
+        minlength=len(candidates),
+    )
+    unseen = ~np.isin(candidates, columns)
+    candidates, scores = candidates[unseen], scores[unseen]
+    # Co-purchase scores tie often; a full sort of the few candidates breaks ties by column
+    ranked = np.lexsort((candidates, -scores))[:top_k]
+    return _product_ids(artifact, candidates[ranked])
+
+
+def similar_products(artifact: dict, product_ids, purchase_counts=None, top_k: int = 5) -> list[str]:
+    """Customers who bought X also bought: summed neighbour scores of ``product_ids``, excluding them."""
+    weights = np.ones(len(product_ids)) if purchase_counts is None else np.asarray(purchase_counts, dtype=float)
+    columns = _product_indices(artifact, list(product_ids))
+    known = columns >= 0
+    if not known.any():
+        return []
+    return _recommend_from_columns(artifact, columns[known], weights[known], top_k)
+
+
+def recommend_items_for_user(artifact: dict, customer_id: str, top_k: int = 5) -> list[str]:
+    """Neighbours of the products a known user bought."""
+    user_idx = _user_index(artifact, customer_id)
+    if user_idx is None:
+        return []
+    columns = np.asarray(_seen_indices(artifact, customer_id, user_idx), dtype=np.int64)
+    if len(columns) == 0:
+        return []
+    return _recommend_from_columns(artifact, columns, np.ones(len(columns)), top_k)
+
+
+def evaluate_item_leave_one_out(
+    interactions: pd.DataFrame,
+    ks=None,
+    n_neighbours: int = ITEM_NEIGHBOURS,
+    processes: int | None = None,
+) -> dict[str, float]:
+    """Leave-one-out metrics of the item-item engine, from the same harness as the SVD model."""
+    train, holdout = leave_one_out_split(interactions)
+    artifact = build_item_neighbours(train, n_neighbours=n_neighbours, processes=processes)
+    return evaluate_rankings(artifact, holdout, DEFAULT_EVALUATION_KS if ks is None else ks, processes=processes)
@@ -5,9 +5,72 @@ import pandas as pd
 from scipy.sparse import csr_matrix
 from sklearn.decomposition import TruncatedSVD
 
+from src.ml.als import ALS_ALPHA, ALS_REGULARIZATION, fit_implicit_als, fold_in_factors
+from src.ml.ann_index import ANN_DEFAULT_PROBES, build_ivf_index, has_ivf_index, ivf_candidates
+from src.ml.recommender_store import artifact_to_arrays, decode_ids, encode_ids, id_keys
 
-def build_recommender_artifact(interactions: pd.DataFrame) -> dict:
-    """Build a deterministic sparse SVD artifact from user-product interactions."""
+
+DEFAULT_N_COMPONENTS = 20
+# float64 count + CSR data/indices built from it, over the int32 row/column codes
+_COO_BYTES_PER_INTERACTION = 20
+
+
+def build_recommender_artifact(
+    interactions: pd.DataFrame,
+    ann_index: bool = False,
+    n_components: int = DEFAULT_N_COMPONENTS,
+    memory_budget_bytes: int | None = None,
+    backend: str = "svd",
+) -> dict:
+    """
+    Build a deterministic latent-factor artifact from user-product interactions.
+
+    ``backend`` is ``"svd"`` (TruncatedSVD; ``n_components`` is capped at
+    ``min(users, products) - 1``) or ``"als"`` (implicit-feedback ALS with
+    ``purchase_count`` as confidence). Both fill the compact array layout of
+    ``artifact_to_arrays``. With ``ann_index=True`` an IVF index over the
+    product factors is added for approximate candidate retrieval.
+    ``memory_budget_bytes`` bounds the matrix conversion (see ``interaction_matrix``).
+    """
+    if backend not in RECOMMENDER_BACKENDS:
+        raise ValueError(f"Unknown recommender backend {backend!r}; expected one of {sorted(RECOMMENDER_BACKENDS)}")
+    matrix_sparse, index = interaction_matrix(interactions, memory_budget_bytes)
+    artifact = RECOMMENDER_BACKENDS[backend](matrix_sparse, index, n_components)
+    if ann_index:
+        artifact.update(build_ivf_index(artifact["product_components"]))
+    return artifact
+
+
+def _factorize_ids(values) -> tuple[np.ndarray, np.ndarray]:
+    """
+    int32 codes of ``values`` into their sorted byte-string vocabulary.
+
+    ``pd.factorize`` hashes the column once; only the (much smaller) set of
+    unique IDs is sorted, and the codes are remapped to that order.
+    """
+    codes, uniques = pd.factorize(values)
+    if len(codes) and codes.min() < 0:
+        raise ValueError("Recommender IDs cannot be null")
+    ids = encode_ids(np.asarray(uniques, dtype=object))
+    order = np.argsort(ids, kind="stable")
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+    return rank[codes], ids[order]
+
+
+def interaction_matrix(
+    interactions: pd.DataFrame,
+    memory_budget_bytes: int | None = None,
+) -> tuple[csr_matrix, dict]:
+    """
+    Users x products purchase-count CSR plus the ID vocabularies and seen CSR of the artifact.
+
+    IDs become int32 codes via ``pd.factorize``; the seen items are the
+    matrix's own ``indptr``/``indices``. The one-shot COO -> CSR conversion
+    needs about ``_COO_BYTES_PER_INTERACTION`` per row; when that exceeds
+    ``memory_budget_bytes`` the rows are converted in chunks that fit the
+    budget and summed into the result instead.
+    """
     required = {"customer_id", "product_id", "purchase_count"}
     missing = required.difference(interactions.columns)
     if missing:
@@ -15,88 +78,294 @@ def build_recommender_artifact(interactions: pd.DataFrame) -> dict:
     if interactions.empty:
         raise ValueError("Recommender interactions cannot be empty")
 
-    frame = interactions.copy()
-    user_ids = sorted(frame["customer_id"].unique())
-    product_ids = sorted(frame["product_id"].unique())
-    user_map = {value: index for index, value in enumerate(user_ids)}
-    product_map = {value: index for index, value in enumerate(product_ids)}
-    reverse_product_map = {index: value for value, index in product_map.items()}
-    frame["user_idx"] = frame["customer_id"].map(user_map)
-    frame["product_idx"] = frame["product_id"].map(product_map)
-
-    matrix_sparse = csr_matrix(
-        (
-            frame["purchase_count"].values,
-            (frame["user_idx"].values, frame["product_idx"].values),
-        ),
-        shape=(len(user_ids), len(product_ids)),
-    )
+    user_rows, user_ids = _factorize_ids(interactions["customer_id"])
+    product_columns, product_ids = _factorize_ids(interactions["product_id"])
+    counts = interactions["purchase_count"].to_numpy()
+    shape = (len(user_ids), len(product_ids))
+
+    chunk_rows = len(counts)
+    if memory_budget_bytes is not None:
+        chunk_rows = max(1, memory_budget_bytes // _COO_BYTES_PER_INTERACTION)
+    matrix_sparse = None
+    for start in range(0, len(counts), chunk_rows):
+        stop = start + chunk_rows
+        chunk = csr_matrix(
+            (counts[start:stop].astype(np.float64), (user_rows[start:stop], product_columns[start:stop])),
+            shape=shape,
+        )
+        matrix_sparse = chunk if matrix_sparse is None else matrix_sparse + chunk
+    matrix_sparse.sum_duplicates()
+
+    index = {
+        "user_ids": user_ids,
+        "product_ids": product_ids,
+        "seen_indptr": matrix_sparse.indptr.astype(np.int64),
+        "seen_indices": matrix_sparse.indices.astype(np.int32),
+    }
+    return matrix_sparse, index
+
+
+def fit_svd_artifact(matrix_sparse: csr_matrix, index: dict, n_components: int = DEFAULT_N_COMPONENTS) -> dict:
+    """Fit a rank-``n_components`` randomized SVD on an ``interaction_matrix`` and pack the array artifact."""
     max_components = min(matrix_sparse.shape) - 1
     if max_components < 1:
         raise ValueError("Recommender requires at least two users and two products")
-    svd = TruncatedSVD(n_components=min(20, max_components), random_state=42)
+    svd = TruncatedSVD(n_components=min(n_components, max_components), random_state=42)
     matrix_reduced = svd.fit_transform(matrix_sparse)
-
-    return {
-        "model": svd,
+    return artifact_to_arrays({
         "matrix_reduced": matrix_reduced,
         "product_components": svd.components_,
-        "user_map": user_map,
-        "product_map": product_map,
-        "reverse_product_map": reverse_product_map,
-        "seen_product_indices": (
-            frame.groupby("customer_id")["product_idx"]
-            .apply(lambda values: values.astype(int).tolist())
-            .to_dict()
-        ),
-    }
+        "backend": "svd",
+        **index,
+    })
 
 
-def recommend_from_artifact(artifact: dict, customer_id: str, top_k: int = 5) -> list[str]:
-    """Return unseen product IDs for a known user."""
-    if customer_id not in artifact.get("user_map", {}):
-        return []
-    user_idx = artifact["user_map"][customer_id]
-    scores = artifact["matrix_reduced"][user_idx] @ artifact["product_components"]
-    seen = set(artifact.get("seen_product_indices", {}).get(customer_id, []))
-    ranked_indices = [int(index) for index in np.argsort(scores)[::-1] if int(index) not in seen]
+def fit_als_artifact(matrix_sparse: csr_matrix, index: dict, n_components: int = DEFAULT_N_COMPONENTS) -> dict:
+    """
+    Fit implicit-feedback ALS on an ``interaction_matrix`` and pack the same array artifact.
+
+    User factors take the place of ``matrix_reduced`` and the transposed item
+    factors of ``product_components``, so scoring is unchanged.
+    """
+    user_factors, item_factors = fit_implicit_als(
+        matrix_sparse, n_components, regularization=ALS_REGULARIZATION, alpha=ALS_ALPHA
+    )
+    return artifact_to_arrays({
+        "matrix_reduced": user_factors,
+        "product_components": item_factors.T,
+        "backend": "als",
+        "backend_params": {"regularization": ALS_REGULARIZATION, "alpha": ALS_ALPHA},
+        **index,
+    })
+
+
+RECOMMENDER_BACKENDS = {"svd": fit_svd_artifact, "als": fit_als_artifact}
+
+
+def _user_index(artifact: dict, customer_id: str) -> int | None:
+    if "user_ids" in artifact:
+        user_ids = artifact["user_ids"]
+        key = id_keys(user_ids, customer_id)
+        position = int(np.searchsorted(user_ids, key))
+        if position < len(user_ids) and user_ids[position] == key:
+            return position
+        return None
+    return artifact.get("user_map", {}).get(customer_id)
+
+
+def _seen_indices(artifact: dict, customer_id: str, user_idx: int) -> np.ndarray:
+    """Return the user's seen product columns (a CSR row slice for array artifacts)."""
+    if "seen_indptr" in artifact:
+        indptr = artifact["seen_indptr"]
+        return artifact["seen_indices"][indptr[user_idx]:indptr[user_idx + 1]]
+    return np.asarray(artifact.get("seen_product_indices", {}).get(customer_id, []), dtype=np.intp)
+
+
+def _product_indices(artifact: dict, product_ids) -> np.ndarray:
+    """Catalog columns of ``product_ids``, or ``-1`` for products the artifact has not seen."""
+    if "product_ids" not in artifact:
+        product_map = artifact.get("product_map", {})
+        return np.array([product_map.get(product_id, -1) for product_id in product_ids], dtype=np.intp)
+    catalog = artifact["product_ids"]
+    if len(product_ids) == 0 or len(catalog) == 0:
+        return np.full(len(product_ids), -1, dtype=np.intp)
+    keys = id_keys(catalog, product_ids)
+    positions = np.minimum(np.searchsorted(catalog, keys), len(catalog) - 1)
+    return np.where(catalog[positions] == keys, positions, -1)
+
+
+def _product_ids(artifact: dict, indices: np.ndarray) -> list[str]:
+    if "product_ids" in artifact:
+        return decode_ids(artifact["product_ids"][indices]).tolist()
+    reverse_product_map = artifact["reverse_product_map"]
     return [
-        artifact["reverse_product_map"][index]
-        for index in ranked_indices[:top_k]
-        if index in artifact["reverse_product_map"]
+        product_id
+        for product_id in (reverse_product_map.get(int(index)) for index in indices)
+        if product_id is not None
     ]
 
 
-def evaluate_leave_one_out(interactions: pd.DataFrame, top_k: int = 10) -> dict[str, float]:
-    """Measure hit rate and catalog coverage on one held-out product per repeat user."""
-    ordered = interactions.sort_values(["customer_id", "product_id"]).copy()
-    repeat_users = ordered.groupby("customer_id")["product_id"].nunique()
-    repeat_users = set(repeat_users[repeat_users >= 2].index)
-    evaluation_rows = ordered[ordered["customer_id"].isin(repeat_users)]
-    holdout = evaluation_rows.groupby("customer_id").tail(1)
-    train = ordered.drop(index=holdout.index)
-    artifact = build_recommender_artifact(train)
-
-    held_out_by_user = dict(zip(holdout["customer_id"], holdout["product_id"]))
-    eligible_users = [
-        user_id
-        for user_id, product_id in held_out_by_user.items()
-        if user_id in artifact["user_map"] and product_id in artifact["product_map"]
-    ]
-    if not eligible_users:
-        return {"users_evaluated": 0, "hit_rate_at_k": 0.0, "catalog_coverage_at_k": 0.0}
+def top_k_unseen(scores: np.ndarray, seen: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Return up to ``top_k`` column indices with the highest scores, best first.
 
-    recommendation_lists = [
-        recommend_from_artifact(artifact, user_id, top_k=top_k)
-        for user_id in eligible_users
-    ]
-    hits = sum(
-        held_out_by_user[user_id] in recommendations
-        for user_id, recommendations in zip(eligible_users, recommendation_lists)
+    Seen columns are masked to ``-inf`` in place (``scores`` must be a fresh
+    vector), then ``argpartition`` selects the candidates in O(n) and only
+    those ``top_k`` are sorted.
+    """
+    if top_k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.intp)
+    scores[seen] = -np.inf
+    if top_k < len(scores):
+        candidates = np.argpartition(scores, len(scores) - top_k)[-top_k:]
+    else:
+        candidates = np.arange(len(scores))
+    ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return ranked[np.isfinite(scores[ranked])]
+
+
+def top_k_unseen_block(
+    scores: np.ndarray,
+    seen_indptr: np.ndarray,
+    seen_indices: np.ndarray,
+    top_k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Row-wise ``top_k_unseen`` for a ``(users, products)`` score block.
+
+    ``seen_indptr`` is the block's slice of the CSR indptr (``users + 1``
+    entries, not rebased). Returns ``(indices, scores)`` of shape
+    ``(users, k)``, best first; slots beyond a user's unseen items score ``-inf``.
+    """
+    users, products = scores.shape
+    counts = np.diff(seen_indptr)
+    rows = np.repeat(np.arange(users), counts)
+    scores[rows, seen_indices[seen_indptr[0]:seen_indptr[-1]]] = -np.inf
+
+    top_k = min(top_k, products)
+    if top_k < products:
+        candidates = np.argpartition(scores, products - top_k, axis=1)[:, products - top_k:]
+    else:
+        candidates = np.broadcast_to(np.arange(products), (users, products))
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return (
+        np.take_along_axis(candidates, order, axis=1),
+        np.take_along_axis(candidate_scores, order, axis=1),
     )
-    recommended_products = {product for values in recommendation_lists for product in values}
-    return {
-        "users_evaluated": len(eligible_users),
-        "hit_rate_at_k": hits / len(eligible_users),
-        "catalog_coverage_at_k": len(recommended_products) / len(artifact["product_map"]),
-    }
+
+
+def top_k_sparse_rows(block: csr_matrix, top_k: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Keep the ``top_k`` highest-scoring stored entries of every CSR row, best first.
+
+    Returns ``(indptr, indices, scores)`` of the reduced CSR; ties go to the
+    lower column. One ``lexsort`` over the stored entries, no dense rows.
+    """
+    counts = np.diff(block.indptr)
+    rows = np.repeat(np.arange(block.shape[0]), counts)
+    order = np.lexsort((block.indices, -block.data, rows))
+    position = np.arange(len(order)) - block.indptr[rows]
+    keep = order[position < top_k]
+    indptr = np.zeros(block.shape[0] + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.minimum(counts, top_k))
+    return indptr, block.indices[keep].astype(np.int32), block.data[keep].astype(np.float32)
+
+
+def _approximate_top_k(artifact: dict, user_vector, seen: np.ndarray, top_k: int, n_probe: int):
+    """IVF candidates re-ranked with exact scores; ``None`` if too few unseen candidates."""
+    candidates = ivf_candidates(artifact, user_vector, n_probe)
+    scores = np.asarray(user_vector @ artifact["product_components"][:, candidates])
+    ranked = top_k_unseen(scores, np.flatnonzero(np.isin(candidates, seen)), top_k)
+    if len(ranked) < top_k and len(candidates) < artifact["product_components"].shape[1]:
+        return None
+    return candidates[ranked]
+
+
+def _recommend_for_vector(artifact: dict, user_vector, seen: np.ndarray, top_k: int, n_probe: int | None):
+    if n_probe != 0 and has_ivf_index(artifact):
+        ranked_indices = _approximate_top_k(
+            artifact, user_vector, seen, top_k, ANN_DEFAULT_PROBES if n_probe is None else n_probe
+        )
+        if ranked_indices is not None:
+            return _product_ids(artifact, ranked_indices)
+
+    scores = np.asarray(user_vector @ artifact["product_components"])
+    ranked_indices = top_k_unseen(scores, seen, top_k)
+    return _product_ids(artifact, ranked_indices)
+
+
+def recommend_from_artifact(
+    artifact: dict,
+    customer_id: str,
+    top_k: int = 5,
+    n_probe: int | None = None,
+) -> list[str]:
+    """
+    Return unseen product IDs for a known user.
+
+    Artifacts with an IVF index scan ``n_probe`` lists (default
+    ``ANN_DEFAULT_PROBES``) and re-rank those candidates exactly; ``n_probe=0``
+    or no index means exact scoring over the whole catalog.
+    """
+    user_idx = _user_index(artifact, customer_id)
+    if user_idx is None:
+        return []
+    user_vector = artifact["matrix_reduced"][user_idx]
+    seen = _seen_indices(artifact, customer_id, user_idx)
+    return _recommend_for_vector(artifact, user_vector, seen, top_k, n_probe)
+
+
+def fold_in_user(artifact: dict, product_ids, purchase_counts=None) -> tuple[np.ndarray | None, np.ndarray]:
+    """
+    Project a purchase history into the latent space without retraining.
+
+    SVD artifacts use the mapping ``TruncatedSVD.transform`` applies to a new
+    interaction row, ``counts @ product_components.T``. ALS item factors are
+    not orthonormal, so ALS artifacts (``backend == "als"``) solve the ALS
+    user equation for the history instead. Products outside the catalog are
+    ignored. Returns ``(user_vector, seen_columns)``; the vector is ``None``
+    when no product is known.
+    """
+    counts = np.ones(len(product_ids)) if purchase_counts is None else np.asarray(purchase_counts, dtype=float)
+    columns = _product_indices(artifact, list(product_ids))
+    known = columns >= 0
+    if not known.any():
+        return None, np.empty(0, dtype=np.intp)
+    columns, inverse = np.unique(columns[known], return_inverse=True)
+    weights = np.bincount(inverse, weights=counts[known], minlength=len(columns))
+    backend = artifact.get("backend", "svd")
+    if backend == "als":
+        params = artifact.get("backend_params") or {}
+        user_vector = fold_in_factors(
+            np.asarray(artifact["product_components"]).T,
+            columns,
+            weights,
+            regularization=params.get("regularization", ALS_REGULARIZATION),
+            alpha=params.get("alpha", ALS_ALPHA),
+        )
+        return user_vector, columns
+    if backend != "svd":
+        raise ValueError(f"No fold-in for recommender backend {backend!r}")
+    return np.asarray(artifact["product_components"])[:, columns] @ weights, columns
+
+
+def recommend_from_history(
+    artifact: dict,
+    product_ids,
+    purchase_counts=None,
+    top_k: int = 5,
+    n_probe: int | None = None,
+) -> list[str]:
+    """Return unseen product IDs for a customer outside the artifact, scored from their history."""
+    user_vector, seen = fold_in_user(artifact, product_ids, purchase_counts)
+    if user_vector is None:
+        return []
+    return _recommend_for_vector(artifact, user_vector, seen, top_k, n_probe)
+
+
+def evaluate_leave_one_out(
+    interactions: pd.DataFrame,
+    top_k: int = 10,
+    ks=None,
+    block_users: int | None = None,
+    processes: int | None = None,
+    n_components: int = DEFAULT_N_COMPONENTS,
+    backend: str = "svd",
+) -> dict[str, float]:
+    """
+    Measure ranking quality on one held-out product per repeat user.
+
+    Returns ``hit_rate``/``ndcg``/``mrr``/``catalog_coverage`` at each of
+    ``ks`` (default 5, 10, 20 plus ``top_k``), with the ``top_k`` values
+    also reported as ``hit_rate_at_k`` and ``catalog_coverage_at_k``.
+    """
+    from src.ml.recommender_evaluation import DEFAULT_EVALUATION_KS, evaluate_rankings, leave_one_out_split
+
+    ks = sorted(set(DEFAULT_EVALUATION_KS if ks is None else ks) | {top_k})
+    train, holdout = leave_one_out_split(interactions)
+    artifact = build_recommender_artifact(train, n_components=n_components, backend=backend)
+    metrics = evaluate_rankings(artifact, holdout, ks, block_users=block_users, processes=processes)
+    metrics["hit_rate_at_k"] = metrics[f"hit_rate_at_{top_k}"]
+    metrics["catalog_coverage_at_k"] = metrics[f"catalog_coverage_at_{top_k}"]
+    return metrics
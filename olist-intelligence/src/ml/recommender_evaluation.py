@@ -0,0 +1,210 @@
+"""Blocked leave-one-out evaluation of recommender artifacts."""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from src.ml.recommender import fit_svd_artifact, interaction_matrix, top_k_sparse_rows, top_k_unseen_block
+from src.ml.recommender_store import artifact_to_arrays, id_keys
+
+
+DEFAULT_EVALUATION_KS = (5, 10, 20)
+# float32 score-block budget; 64 MB is ~500 users against a 33k-product catalog
+EVALUATION_BLOCK_BYTES = 64 * 1024 * 1024
+
+_worker_state: dict = {}
+
+
+def leave_one_out_split(interactions: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Hold out the last product (by ``product_id``) of every user with two or more products."""
+    ordered = interactions.sort_values(["customer_id", "product_id"])
+    product_counts = ordered.groupby("customer_id")["product_id"].transform("nunique")
+    holdout = ordered[product_counts >= 2].groupby("customer_id").tail(1)
+    return ordered.drop(index=holdout.index), holdout
+
+
+def _rows_csr(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Gather CSR rows ``rows`` into a new, contiguous CSR pair."""
+    starts = indptr[rows]
+    counts = indptr[rows + 1] - starts
+    row_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    row_indptr[1:] = np.cumsum(counts)
+    positions = np.repeat(starts - row_indptr[:-1], counts) + np.arange(row_indptr[-1])
+    return row_indptr, indices[positions]
+
+
+def _block_top_k(state: dict, start: int, stop: int) -> np.ndarray:
+    """
+    Top-``max_k`` unseen product columns for users ``start:stop``; empty slots are ``-1``.
+
+    SVD artifacts score densely (factor matmul + row-wise top-k). Item
+    neighbour scores stay sparse (seen items x neighbour CSR), so only
+    products with co-purchase evidence are ranked, as in serving.
+    """
+    max_k = state["max_k"]
+    indptr = state["seen_indptr"][start:stop + 1]
+    if "neighbours" not in state:
+        scores = state["user_factors"][start:stop] @ state["product_components"]
+        indices, block_scores = top_k_unseen_block(scores, indptr, state["seen_indices"], max_k)
+        indices[~np.isfinite(block_scores)] = -1
+        return indices
+
+    neighbours = state["neighbours"]
+    seen = csr_matrix(
+        (np.ones(indptr[-1] - indptr[0]), state["seen_indices"][indptr[0]:indptr[-1]], indptr - indptr[0]),
+        shape=(stop - start, neighbours.shape[0]),
+    )
+    scores = (seen @ neighbours).tocsr()
+    scores = (scores - scores.multiply(seen)).tocsr()
+    scores.eliminate_zeros()
+    top_indptr, top_indices, _ = top_k_sparse_rows(scores, max_k)
+    counts = np.diff(top_indptr)
+    rows = np.repeat(np.arange(stop - start), counts)
+    indices = np.full((stop - start, max_k), -1, dtype=np.int64)
+    indices[rows, np.arange(len(rows)) - top_indptr[rows]] = top_indices
+    return indices
+
+
+def _held_out_ranks(state: dict, start: int, stop: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score users ``start:stop`` and return ``(ranks, top_indices)``.
+
+    ``ranks`` is the 0-based position of each held-out product in the user's
+    top-``max_k`` list (``max_k`` when absent); empty slots in
+    ``top_indices`` are ``-1``.
+    """
+    indices = _block_top_k(state, start, stop)
+    matches = indices == state["held_out"][start:stop, None]
+    ranks = np.where(matches.any(axis=1), matches.argmax(axis=1), state["max_k"])
+    return ranks, indices
+
+
+def _init_worker(state: dict) -> None:
+    _worker_state.update(state)
+
+
+def _worker_block(bounds: tuple[int, int]):
+    return _held_out_ranks(_worker_state, *bounds)
+
+
+def evaluate_rankings(
+    artifact: dict,
+    holdout: pd.DataFrame,
+    ks=DEFAULT_EVALUATION_KS,
+    block_users: int | None = None,
+    processes: int | None = None,
+) -> dict[str, float]:
+    """
+    Hit rate, NDCG, MRR and catalog coverage at every ``k`` in one scoring pass.
+
+    ``artifact`` is an SVD artifact or an item-neighbour artifact from
+    ``src.ml.item_recommender``. Users whose held-out product or user row is
+    missing from it are skipped. Scores are computed in float32, ``block_users`` rows at a time
+    (one matmul plus a row-wise top-``max(ks)``); ``processes > 1`` spreads
+    blocks over a process pool.
+    """
+    ks = sorted(set(ks))
+    arrays = artifact if "neighbour_indptr" in artifact else artifact_to_arrays(artifact)
+    user_ids, product_ids = arrays["user_ids"], arrays["product_ids"]
+
+    customers = id_keys(user_ids, holdout["customer_id"].to_numpy(dtype=str))
+    products = id_keys(product_ids, holdout["product_id"].to_numpy(dtype=str))
+    user_rows = np.minimum(np.searchsorted(user_ids, customers), len(user_ids) - 1)
+    held_out = np.minimum(np.searchsorted(product_ids, products), len(product_ids) - 1)
+    known = (user_ids[user_rows] == customers) & (product_ids[held_out] == products)
+    users = int(known.sum())
+    metrics = {"users_evaluated": users}
+    if users == 0:
+        for k in ks:
+            for name in ("hit_rate", "ndcg", "mrr", "catalog_coverage"):
+                metrics[f"{name}_at_{k}"] = 0.0
+        return metrics
+
+    seen_indptr, seen_indices = _rows_csr(arrays["seen_indptr"], arrays["seen_indices"], user_rows[known])
+    state = {
+        "seen_indptr": seen_indptr,
+        "seen_indices": seen_indices,
+        "held_out": held_out[known],
+        "max_k": ks[-1],
+    }
+    if "neighbour_indptr" in arrays:
+        products = len(product_ids)
+        # float64 sums, matching the serving-time accumulation in similar_products
+        state["neighbours"] = csr_matrix(
+            (arrays["neighbour_scores"].astype(np.float64), arrays["neighbour_indices"], arrays["neighbour_indptr"]),
+            shape=(products, products),
+        )
+    else:
+        state["user_factors"] = arrays["matrix_reduced"][user_rows[known]]
+        state["product_components"] = arrays["product_components"]
+    if block_users is None:
+        block_users = max(1, EVALUATION_BLOCK_BYTES // (len(product_ids) * np.dtype(np.float32).itemsize))
+    bounds = [(start, min(start + block_users, users)) for start in range(0, users, block_users)]
+
+    if processes and processes > 1 and len(bounds) > 1:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(state,)) as pool:
+            results = list(pool.map(_worker_block, bounds))
+    else:
+        results = [_held_out_ranks(state, start, stop) for start, stop in bounds]
+    ranks = np.concatenate([block_ranks for block_ranks, _ in results])
+    recommended = np.concatenate([indices for _, indices in results])
+
+    for k in ks:
+        hit = ranks < k
+        top = recommended[:, :k]
+        metrics.update({
+            f"hit_rate_at_{k}": float(hit.mean()),
+            f"ndcg_at_{k}": float(np.where(hit, 1.0 / np.log2(ranks + 2.0), 0.0).mean()),
+            f"mrr_at_{k}": float(np.where(hit, 1.0 / (ranks + 1.0), 0.0).mean()),
+            f"catalog_coverage_at_{k}": len(np.unique(top[top >= 0])) / len(product_ids),
+        })
+    return metrics
+
+
+def _evaluate_rank(state: dict, n_components: int) -> dict:
+    start = time.perf_counter()
+    artifact = fit_svd_artifact(state["matrix"], state["index"], n_components)
+    build_seconds = time.perf_counter() - start
+    metrics = evaluate_rankings(artifact, state["holdout"], state["ks"])
+    return {
+        "n_components": int(artifact["product_components"].shape[0]),
+        **{f"hit_rate_at_{k}": metrics[f"hit_rate_at_{k}"] for k in state["ks"]},
+        "build_seconds": build_seconds,
+        "artifact_bytes": int(sum(values.nbytes for values in artifact.values() if isinstance(values, np.ndarray))),
+    }
+
+
+def _worker_rank(n_components: int) -> dict:
+    return _evaluate_rank(_worker_state, n_components)
+
+
+def sweep_n_components(
+    interactions: pd.DataFrame,
+    ranks,
+    ks=DEFAULT_EVALUATION_KS,
+    processes: int | None = None,
+) -> pd.DataFrame:
+    """
+    Leave-one-out hit rate, SVD build time and artifact size for every rank in ``ranks``.
+
+    The train split's interaction matrix is built once and handed to
+    ``processes`` workers (default: one per rank, up to the CPU count)
+    through the pool initializer, so forked workers share it instead of each
+    rebuilding it. Ranks above ``min(users, products) - 1`` are capped, as
+    in ``build_recommender_artifact``. One row per rank, in ``ranks`` order.
+    """
+    ranks = list(ranks)
+    train, holdout = leave_one_out_split(interactions)
+    matrix, index = interaction_matrix(train)
+    state = {"matrix": matrix, "index": index, "holdout": holdout, "ks": sorted(set(ks))}
+    processes = min(len(ranks), processes or os.cpu_count() or 1)
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(state,)) as pool:
+            rows = list(pool.map(_worker_rank, ranks))
+    else:
+        rows = [_evaluate_rank(state, n_components) for n_components in ranks]
+    return pd.DataFrame(rows)
+
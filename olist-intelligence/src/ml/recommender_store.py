@@ -0,0 +1,221 @@
+"""On-disk ``.npy`` recommender artifact that API workers open memory-mapped."""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from src.ml.ann_index import ANN_FILES, has_ivf_index
+
+
+ARRAY_ARTIFACT_FORMAT = "olist-recommender-npy"
+# v2: byte-string IDs and float32 factors; v1 (unicode IDs, float64) still loads
+ARRAY_ARTIFACT_VERSION = 2
+SUPPORTED_ARRAY_VERSIONS = (1, 2)
+MANIFEST_FILE = "manifest.json"
+# Names the active version subdirectory; replaced atomically on every save
+CURRENT_FILE = "CURRENT"
+ARRAY_FILES = (
+    "user_ids",
+    "product_ids",
+    "matrix_reduced",
+    "product_components",
+    "seen_indptr",
+    "seen_indices",
+)
+# Non-array entries: which model built the factors ("svd"/"als") and its fold-in parameters
+METADATA_KEYS = ("backend", "backend_params")
+
+
+def encode_ids(values) -> np.ndarray:
+    """Fixed-width UTF-8 byte strings (``S32`` for Olist hex IDs, a quarter of ``<U32``)."""
+    values = np.asarray(values)
+    if values.dtype.kind == "O":
+        # ASCII objects (pandas string columns) encode directly, without a <U copy
+        try:
+            return values.astype(np.bytes_)
+        except UnicodeEncodeError:
+            pass
+    values = values.astype(str)
+    try:
+        return values.astype(np.bytes_)
+    except UnicodeEncodeError:
+        return np.char.encode(values, "utf-8")
+
+
+def decode_ids(values) -> np.ndarray:
+    """Inverse of ``encode_ids``; unicode arrays (v1 artifacts) pass through."""
+    values = np.asarray(values)
+    if values.dtype.kind != "S":
+        return values.astype(str)
+    try:
+        return values.astype(str)
+    except UnicodeDecodeError:
+        return np.char.decode(values, "utf-8")
+
+
+def id_keys(ids: np.ndarray, values) -> np.ndarray:
+    """``values`` in the same string kind as the ``ids`` vocabulary, for ``searchsorted``."""
+    return encode_ids(values) if ids.dtype.kind == "S" else np.asarray(values, dtype=str)
+
+
+def _ids_by_index(index_map: dict) -> np.ndarray:
+    ids = np.empty(len(index_map), dtype=object)
+    for value, index in index_map.items():
+        ids[index] = value
+    return encode_ids(ids.astype(str))
+
+
+def _compact(arrays: dict) -> dict[str, np.ndarray]:
+    """Bring v1 arrays to the v2 dtypes; arrays already in v2 (including memmaps) are not copied."""
+    for name in ("user_ids", "product_ids"):
+        if arrays[name].dtype.kind != "S":
+            arrays[name] = encode_ids(arrays[name])
+    for name in ("matrix_reduced", "product_components"):
+        arrays[name] = np.asarray(arrays[name], dtype=np.float32)
+    return arrays
+
+
+def artifact_to_arrays(artifact: dict) -> dict[str, np.ndarray]:
+    """
+    Convert any recommender artifact into the compact array layout.
+
+    Sorted byte-string ID vocabularies (binary-search lookup), float32
+    factors, and a CSR ``seen_indptr``/``seen_indices`` pair. Accepts the
+    legacy pickled dict (``user_map``/``product_map``/``seen_product_indices``)
+    and v1 arrays.
+    """
+    metadata = {name: artifact[name] for name in METADATA_KEYS if name in artifact}
+    if "user_ids" in artifact:
+        names = ARRAY_FILES + (ANN_FILES if has_ivf_index(artifact) else ())
+        return {**_compact({name: np.asarray(artifact[name]) for name in names}), **metadata}
+
+    user_ids = _ids_by_index(artifact["user_map"])
+    product_ids = _ids_by_index(artifact["product_map"])
+    user_order = np.argsort(user_ids, kind="stable")
+    product_order = np.argsort(product_ids, kind="stable")
+    new_product_index = np.empty_like(product_order)
+    new_product_index[product_order] = np.arange(len(product_order))
+
+    seen = artifact.get("seen_product_indices", {})
+    seen_lists = [seen.get(user_id, []) for user_id in decode_ids(user_ids[user_order])]
+    seen_indptr = np.zeros(len(seen_lists) + 1, dtype=np.int64)
+    seen_indptr[1:] = np.cumsum([len(values) for values in seen_lists])
+    seen_indices = (
+        new_product_index[np.concatenate([np.asarray(values, dtype=np.int64) for values in seen_lists])]
+        if seen_indptr[-1]
+        else np.empty(0, dtype=np.int64)
+    ).astype(np.int32)
+
+    arrays = {
+        "user_ids": user_ids[user_order],
+        "product_ids": product_ids[product_order],
+        "matrix_reduced": np.asarray(artifact["matrix_reduced"], dtype=np.float32)[user_order],
+        "product_components": np.asarray(artifact["product_components"], dtype=np.float32)[:, product_order],
+        "seen_indptr": seen_indptr,
+        "seen_indices": seen_indices,
+    }
+    if has_ivf_index(artifact):
+        arrays.update(
+            ann_centroids=np.asarray(artifact["ann_centroids"]),
+            ann_list_indptr=np.asarray(artifact["ann_list_indptr"]),
+            ann_list_items=new_product_index[np.asarray(artifact["ann_list_items"])].astype(np.int32),
+        )
+    return {**arrays, **metadata}
+
+
+def array_artifact_dir(directory: Path) -> Path | None:
+    """
+    Directory holding the active manifest and ``.npy`` files, or ``None`` if nothing is saved.
+
+    Follows the ``CURRENT`` pointer; a directory with a manifest of its own
+    (the layout before versioned saves) is returned as is.
+    """
+    directory = Path(directory)
+    try:
+        name = (directory / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return directory if (directory / MANIFEST_FILE).exists() else None
+    return directory / name
+
+
+def _prune_array_versions(directory: Path, keep: set) -> None:
+    for path in directory.iterdir():
+        if path in keep or path.name == CURRENT_FILE:
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        elif directory not in keep:
+            # Flat files of the pre-pointer layout once it is no longer the previous version
+            path.unlink(missing_ok=True)
+
+
+def save_recommender_arrays(artifact: dict, directory: Path, build_info: dict | None = None) -> Path:
+    """
+    Write the artifact as one ``.npy`` file per array plus a manifest.
+
+    ``build_info`` (refit time, data watermark, ...) is stored as the
+    manifest's ``build`` entry for incremental updates.
+
+    Each save writes a new version subdirectory and then points ``CURRENT``
+    at it with ``os.replace``, so a loader always finds a complete manifest.
+    The previous version is kept for workers that read the old pointer and
+    are still opening its files; older ones are removed. Returns the
+    version directory.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    arrays = artifact_to_arrays(artifact)
+    previous = array_artifact_dir(directory)
+    version_dir = directory / f"v{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    version_dir.mkdir()
+
+    metadata = {name: arrays.pop(name) for name in METADATA_KEYS if name in arrays}
+    for name, values in arrays.items():
+        np.save(version_dir / f"{name}.npy", values, allow_pickle=False)
+    manifest = {
+        "format": ARRAY_ARTIFACT_FORMAT,
+        "version": ARRAY_ARTIFACT_VERSION,
+        "created_at_utc": datetime.now(timezone.utc).isoformat(),
+        "users": int(len(arrays["user_ids"])),
+        "products": int(len(arrays["product_ids"])),
+        "components": int(arrays["product_components"].shape[0]),
+        "ann_lists": int(len(arrays["ann_centroids"])) if has_ivf_index(arrays) else None,
+        "files": [f"{name}.npy" for name in arrays],
+        "backend": metadata.get("backend", "svd"),
+        "backend_params": metadata.get("backend_params"),
+        "build": build_info,
+    }
+    (version_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    pointer = directory / f"{CURRENT_FILE}.tmp-{os.getpid()}"
+    pointer.write_text(version_dir.name, encoding="utf-8")
+    os.replace(pointer, directory / CURRENT_FILE)
+    _prune_array_versions(directory, {version_dir, previous})
+    return version_dir
+
+
+def load_recommender_arrays(directory: Path, mmap_mode: str | None = "r") -> dict:
+    """Open the active saved array artifact; with ``mmap_mode="r"`` workers share the page cache."""
+    active = array_artifact_dir(directory)
+    if active is None:
+        raise FileNotFoundError(f"No recommender array artifact saved in {directory}")
+    directory = active
+    manifest = json.loads((directory / MANIFEST_FILE).read_text(encoding="utf-8"))
+    if manifest.get("format") != ARRAY_ARTIFACT_FORMAT:
+        raise ValueError(f"Unsupported recommender artifact format: {manifest.get('format')}")
+    if manifest.get("version", 1) not in SUPPORTED_ARRAY_VERSIONS:
+        raise ValueError(f"Unsupported recommender artifact version: {manifest.get('version')}")
+
+    names = ARRAY_FILES + (ANN_FILES if manifest.get("ann_lists") else ())
+    artifact = {
+        name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+        for name in names
+    }
+    artifact["backend"] = manifest.get("backend", "svd")
+    if manifest.get("backend_params") is not None:
+        artifact["backend_params"] = manifest["backend_params"]
+    artifact["manifest"] = manifest
+    return artifact
@@ -0,0 +1,197 @@
+"""Incremental recommender updates: fold new interactions into the saved SVD artifact."""
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from src.config import RECOMMENDER_REFIT_MAX_AGE_DAYS, RECOMMENDER_REFIT_MAX_DRIFT
+from src.ml.ann_index import assign_ivf_lists, has_ivf_index
+from src.ml.recommender_store import (
+    artifact_to_arrays,
+    encode_ids,
+    load_recommender_arrays,
+    save_recommender_arrays,
+)
+
+
+def recommender_build_info(
+    interactions: pd.DataFrame,
+    interactions_through,
+    now=None,
+    backend: str = "svd",
+) -> dict:
+    """Manifest ``build`` entry of a full refit; updates carry it forward."""
+    now = now or datetime.now(timezone.utc)
+    return {
+        "backend": backend,
+        "full_refit_at_utc": now.isoformat(),
+        "interactions_at_refit": int(len(interactions)),
+        "products_at_refit": int(interactions["product_id"].nunique()),
+        "interactions_since_refit": 0,
+        "products_since_refit": 0,
+        "interactions_through": interactions_through,
+    }
+
+
+def full_refit_reason(
+    build_info: dict | None,
+    now=None,
+    max_age_days: float = RECOMMENDER_REFIT_MAX_AGE_DAYS,
+    max_drift: float = RECOMMENDER_REFIT_MAX_DRIFT,
+) -> str | None:
+    """
+    Why the next build must refit from scratch, or ``None`` if an update suffices.
+
+    Drift is the interactions (or products) added since the last refit
+    relative to the refit's own size: folded-in rows never move the
+    components, so past ``max_drift`` the factors no longer describe the data.
+    """
+    if not build_info or not build_info.get("full_refit_at_utc") or not build_info.get("interactions_through"):
+        return "no build info"
+    if build_info.get("backend", "svd") != "svd":
+        # The fold-in below is the SVD projection; other backends are refit
+        return f"{build_info['backend']} artifacts are not folded in"
+    now = now or datetime.now(timezone.utc)
+    age_days = (now - datetime.fromisoformat(build_info["full_refit_at_utc"])).total_seconds() / 86400
+    if age_days > max_age_days:
+        return f"refit is {age_days:.1f} days old (max {max_age_days:g})"
+    for name in ("interactions", "products"):
+        drift = build_info.get(f"{name}_since_refit", 0) / max(build_info.get(f"{name}_at_refit", 0), 1)
+        if drift > max_drift:
+            return f"{name} drift {drift:.2f} (max {max_drift:g})"
+    return None
+
+
+def _remap(old_ids: np.ndarray, new_ids: np.ndarray) -> np.ndarray:
+    return np.searchsorted(new_ids, old_ids)
+
+
+def update_recommender_artifact(artifact: dict, interactions: pd.DataFrame) -> tuple[dict, dict]:
+    """
+    Add ``interactions`` (purchases since the last build) to an SVD artifact without refitting.
+
+    New users and products are merged into the sorted vocabularies. A new
+    product's factor column is folded in from its existing buyers,
+    ``matrix_reduced[buyers].T @ counts / sigma**2``; user vectors then get
+    ``counts @ product_components.T`` added, the same projection
+    ``TruncatedSVD.transform`` applies, so an existing user's vector equals
+    a transform of their full history and a new user is folded in from zero.
+    The seen CSR gains the new pairs and an IVF index re-files every product
+    under its nearest existing centroid. Returns ``(artifact, stats)``.
+    """
+    required = {"customer_id", "product_id", "purchase_count"}
+    missing = required.difference(interactions.columns)
+    if missing:
+        raise ValueError(f"Missing recommender columns: {sorted(missing)}")
+    arrays = artifact_to_arrays(artifact)
+    old_users, old_products = arrays["user_ids"], arrays["product_ids"]
+    new_customers = encode_ids(interactions["customer_id"].to_numpy(dtype=str))
+    new_products = encode_ids(interactions["product_id"].to_numpy(dtype=str))
+    counts = interactions["purchase_count"].to_numpy(dtype=np.float64)
+
+    user_ids = np.union1d(old_users, new_customers)
+    product_ids = np.union1d(old_products, new_products)
+    old_rows, old_columns = _remap(old_users, user_ids), _remap(old_products, product_ids)
+    rows, columns = np.searchsorted(user_ids, new_customers), np.searchsorted(product_ids, new_products)
+
+    old_factors = np.asarray(arrays["matrix_reduced"], dtype=np.float32)
+    matrix_reduced = np.zeros((len(user_ids), old_factors.shape[1]), dtype=np.float32)
+    matrix_reduced[old_rows] = old_factors
+    product_components = np.zeros((old_factors.shape[1], len(product_ids)), dtype=np.float32)
+    product_components[:, old_columns] = arrays["product_components"]
+
+    is_new_product = np.ones(len(product_ids), dtype=bool)
+    is_new_product[old_columns] = False
+    is_existing_user = np.zeros(len(user_ids), dtype=bool)
+    is_existing_user[old_rows] = True
+    # sigma_i**2 is the squared norm of column i of U * Sigma
+    singular_values_sq = np.maximum((old_factors.astype(np.float64) ** 2).sum(axis=0), np.finfo(np.float64).tiny)
+    fold = is_new_product[columns] & is_existing_user[rows]
+    folded = np.zeros((len(product_ids), old_factors.shape[1]))
+    np.add.at(folded, columns[fold], matrix_reduced[rows[fold]] * counts[fold, None])
+    product_components[:, is_new_product] = (folded[is_new_product] / singular_values_sq).T
+
+    np.add.at(matrix_reduced, rows, (product_components[:, columns] * counts).T)
+
+    old_indptr = np.asarray(arrays["seen_indptr"])
+    seen = csr_matrix(
+        (
+            np.ones(old_indptr[-1] + len(rows)),
+            (
+                np.concatenate([np.repeat(old_rows, np.diff(old_indptr)), rows]),
+                np.concatenate([old_columns[np.asarray(arrays["seen_indices"])], columns]),
+            ),
+        ),
+        shape=(len(user_ids), len(product_ids)),
+    )
+    seen.sum_duplicates()
+
+    updated = {
+        "user_ids": user_ids,
+        "product_ids": product_ids,
+        "matrix_reduced": matrix_reduced,
+        "product_components": product_components,
+        "seen_indptr": seen.indptr.astype(np.int64),
+        "seen_indices": seen.indices.astype(np.int32),
+        "backend": "svd",
+    }
+    if has_ivf_index(arrays):
+        updated["ann_centroids"] = np.asarray(arrays["ann_centroids"])
+        updated.update(assign_ivf_lists(updated["ann_centroids"], product_components))
+    stats = {
+        "interactions": int(len(interactions)),
+        "new_users": int(len(user_ids) - len(old_users)),
+        "new_products": int(len(product_ids) - len(old_products)),
+    }
+    return updated, stats
+
+
+def run_recommender_update(
+    now=None,
+    max_age_days: float = RECOMMENDER_REFIT_MAX_AGE_DAYS,
+    max_drift: float = RECOMMENDER_REFIT_MAX_DRIFT,
+) -> dict:
+    """
+    Bring the saved recommender up to the latest orders.
+
+    Reads only interactions after the artifact's ``interactions_through``
+    watermark and folds them in; runs the full training pipeline instead when
+    there is no saved artifact or ``full_refit_reason`` reports staleness or drift.
+    """
+    from src.ml.data import get_recommender_data, get_recommender_watermark
+    from src.ml.registry import array_artifact_path, save_model_locally
+
+    path = array_artifact_path("recommender")
+    try:
+        artifact = load_recommender_arrays(path, mmap_mode=None)
+    except FileNotFoundError:
+        artifact = None
+    build_info = artifact["manifest"].get("build") if artifact is not None else None
+    reason = "no saved artifact" if artifact is None else full_refit_reason(build_info, now, max_age_days, max_drift)
+    if reason:
+        from src.ml.train import train_recommender_model
+
+        train_recommender_model()
+        return {"mode": "full_refit", "reason": reason}
+
+    until = get_recommender_watermark()
+    interactions = get_recommender_data(since=build_info["interactions_through"], until=until)
+    if interactions.empty:
+        return {"mode": "up_to_date", "interactions_through": build_info["interactions_through"]}
+
+    updated, stats = update_recommender_artifact(artifact, interactions)
+    build_info = {
+        **build_info,
+        "interactions_since_refit": build_info.get("interactions_since_refit", 0) + stats["interactions"],
+        "products_since_refit": build_info.get("products_since_refit", 0) + stats["new_products"],
+        "interactions_through": until,
+    }
+    save_model_locally(updated, "recommender")
+    save_recommender_arrays(updated, path, build_info=build_info)
+    return {"mode": "incremental", **stats, "interactions_through": until}
+
+
+if __name__ == "__main__":
+    result = run_recommender_update()
+    print(f"✅ Öneri modeli güncellendi: {result}")
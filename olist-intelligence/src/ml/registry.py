@@ -132,22 +132,83 @@ def save_model_locally(model, model_name: str):
     print(f"Model saved locally: {path}")
 
 
-def load_production_model(model_name: str, flavor: str = "sklearn"):
+def array_artifact_path(model_name: str) -> Path:
+    """Directory holding a model's memory-mappable ``.npy`` artifact."""
+    return MODELS_PATH / f"{model_name}_arrays"
+
+
+def _array_manifest_path(model_name: str) -> Path | None:
+    from src.ml.recommender_store import MANIFEST_FILE, array_artifact_dir
+
+    directory = array_artifact_dir(array_artifact_path(model_name))
+    return directory / MANIFEST_FILE if directory is not None else None
+
+
+def local_model_version(model_name: str) -> str | None:
+    """Return a cheap fingerprint of the local artifact, or None if it is missing."""
+    path = _array_manifest_path(model_name)
+    if path is None or not path.exists():
+        path = MODELS_PATH / f"{model_name}_model.pkl"
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return f"local:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _production_mlflow_version(client, model_name: str) -> str:
+    versions = client.get_latest_versions(f"olist-{model_name}", stages=["Production"])
+    if not versions:
+        raise LookupError(f"No Production version for olist-{model_name}")
+    return str(max(int(version.version) for version in versions))
+
+
+def production_model_version(model_name: str, flavor: str = "sklearn") -> str | None:
     """
-    Load production model from MLflow or local fallback.
+    Return the version a fresh ``load_production_model`` call would load.
+
+    Follows the loader's order: for the ``arrays`` flavor a local array
+    manifest wins without asking MLflow; otherwise the MLflow Production
+    stage when reachable, else the local pickle.
+    """
+    if flavor == "arrays" and _array_manifest_path(model_name) is not None:
+        return local_model_version(model_name)
+    try:
+        if mlflow is None:
+            raise RuntimeError("MLflow is not installed")
+        client = get_mlflow_client()
+        return f"mlflow:{_production_mlflow_version(client, model_name)}"
+    except Exception:
+        return local_model_version(model_name)
+
+
+def load_production_model_version(model_name: str, flavor: str = "sklearn"):
+    """
+    Load production model from MLflow or local fallback, with its version.
     
     Args:
         model_name: Name of model ('logistics', 'churn', 'recommender')
-        flavor: 'sklearn', 'catboost'
+        flavor: 'sklearn', 'catboost', or 'arrays' for a local memory-mapped
+            ``.npy`` artifact (falls back to the local pickle, converted to
+            the compact array layout)
     
     Returns:
-        Loaded model object
+        Tuple of (loaded model object, version string)
     """
+    if flavor == "arrays":
+        array_path = array_artifact_path(model_name)
+        if _array_manifest_path(model_name) is not None:
+            from src.ml.recommender_store import load_recommender_arrays
+
+            model = load_recommender_arrays(array_path, mmap_mode="r")
+            print(f"Loaded memory-mapped arrays: {array_path}")
+            return model, local_model_version(model_name)
+
     try:
         if mlflow is None:
             raise RuntimeError("MLflow is not installed")
         client = get_mlflow_client()
-        model_uri = f"models:/olist-{model_name}/Production"
+        version = _production_mlflow_version(client, model_name)
+        model_uri = f"models:/olist-{model_name}/{version}"
         
         if flavor == "catboost":
             if catboost is None:
@@ -156,21 +217,47 @@ def load_production_model(model_name: str, flavor: str = "sklearn"):
             model = mlflow.catboost.load_model(model_uri)
         else:
             model = mlflow.sklearn.load_model(model_uri)
-            
-        print(f"Loaded from MLflow: olist-{model_name} (Production)")
-        return model
+        if flavor == "arrays":
+            from src.ml.recommender_store import artifact_to_arrays
+
+            # A registered recommender is the pickled dict; serve it in the compact layout
+            model = artifact_to_arrays(model)
+
+        print(f"Loaded from MLflow: olist-{model_name} v{version} (Production)")
+        return model, f"mlflow:{version}"
     except Exception as e:
         print(f"MLflow load failed ({e}), checking local...")
         # Fallback: load from local
         path = MODELS_PATH / f"{model_name}_model.pkl"
         if path.exists():
+            version = local_model_version(model_name)
             with open(path, 'rb') as f:
                 model = pickle.load(f)
+            if flavor == "arrays":
+                from src.ml.recommender_store import artifact_to_arrays
+
+                # Pickles written before the compact layout hold Python dict maps
+                model = artifact_to_arrays(model)
             print(f"Loaded from local: {path}")
-            return model
+            return model, version
         raise FileNotFoundError(f"Model not found: {model_name}")
 
 
+def load_production_model(model_name: str, flavor: str = "sklearn"):
+    """
+    Load production model from MLflow or local fallback.
+    
+    Args:
+        model_name: Name of model ('logistics', 'churn', 'recommender')
+        flavor: 'sklearn', 'catboost'
+    
+    Returns:
+        Loaded model object
+    """
+    model, _version = load_production_model_version(model_name, flavor=flavor)
+    return model
+
+
 def promote_to_production(model_name: str, version: int):
     """Promote a model version to Production stage."""
     try:
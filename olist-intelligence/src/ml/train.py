@@ -2,11 +2,20 @@ import numpy as np
 from catboost import CatBoostRegressor, CatBoostClassifier
 from sklearn.metrics import balanced_accuracy_score, mean_squared_error, roc_auc_score
 from sklearn.model_selection import train_test_split
-from src.config import MODELS_PATH
-from src.ml.data import get_logistics_data, get_churn_data, get_recommender_data
+from src.config import (
+    MODELS_PATH,
+    RECOMMENDER_ANN_INDEX,
+    RECOMMENDER_BACKEND,
+    RECOMMENDER_BUILD_MEMORY_BYTES,
+    RECOMMENDER_N_COMPONENTS,
+)
+from src.ml.data import get_logistics_data, get_churn_data, get_recommender_data, get_recommender_watermark
 from src.ml.evaluation import has_usable_class_balance, temporal_train_test_split
-from src.ml.registry import register_model, save_model_locally
+from src.ml.registry import array_artifact_path, register_model, save_model_locally
+from src.ml.item_recommender import build_item_neighbours, evaluate_item_leave_one_out
 from src.ml.recommender import build_recommender_artifact, evaluate_leave_one_out
+from src.ml.recommender_store import save_recommender_arrays
+from src.ml.recommender_update import recommender_build_info
 
 MODELS_PATH.mkdir(parents=True, exist_ok=True)
 
@@ -86,19 +95,39 @@ def train_churn_model():
 def train_recommender_model():
     print("🛍️ Eğitim Verisi Hazırlanıyor: Ürün Öneri Sistemi...")
     
-    df = get_recommender_data(limit=None)
+    # Bounded by the watermark so `make update-recommender` resumes exactly after this build
+    watermark = get_recommender_watermark()
+    df = get_recommender_data(limit=None, until=watermark)
     if df.empty:
         print("⚠️ Veri bulunamadı.")
         return
 
     print(f"🛍️ Matris Oluşturuluyor ({len(df)} etkileşim)...")
     
-    evaluation = evaluate_leave_one_out(df, top_k=10)
+    evaluation = evaluate_leave_one_out(
+        df, top_k=10, n_components=RECOMMENDER_N_COMPONENTS, backend=RECOMMENDER_BACKEND
+    )
     print(f"🛍️ Offline evaluation: {evaluation}")
-    artifact = build_recommender_artifact(df)
+    artifact = build_recommender_artifact(
+        df,
+        ann_index=RECOMMENDER_ANN_INDEX,
+        n_components=RECOMMENDER_N_COMPONENTS,
+        memory_budget_bytes=RECOMMENDER_BUILD_MEMORY_BYTES,
+        backend=RECOMMENDER_BACKEND,
+    )
     
     # Currently Registry doesn't support Dict artifacts easily, so we save locally
     save_model_locally(artifact, "recommender")
+    # Memory-mapped copy shared by all API workers on the host
+    save_recommender_arrays(
+        artifact,
+        array_artifact_path("recommender"),
+        build_info=recommender_build_info(df, watermark, backend=RECOMMENDER_BACKEND),
+    )
+
+    item_evaluation = evaluate_item_leave_one_out(df, ks=(10,))
+    print(f"🛍️ Item-item offline evaluation: {item_evaluation}")
+    save_model_locally(build_item_neighbours(df), "item_recommender")
     # Optional: We could log artifact to MLflow run without registering as "Model"
     # But for simplicity we keep it local for now
         
@@ -0,0 +1,197 @@
+"""Load, warm up, and atomically swap serving models without an API restart."""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+
+from src.config import RECOMMENDER_WARMUP_PREFAULT
+from src.ml.feature_schema import CHURN_FEATURES, LOGISTICS_FEATURES
+from src.ml.recommender import top_k_unseen
+
+
+logger = logging.getLogger(__name__)
+
+MODEL_FLAVORS = {
+    "logistics": "catboost",
+    "churn": "catboost",
+    # Recommender is not fully in Registry yet; memory-mapped local arrays, else pickle
+    "recommender": "arrays",
+}
+
+
+def _warm_up_logistics(model):
+    model.predict(np.zeros((1, len(LOGISTICS_FEATURES.columns)), dtype=np.float32))
+
+
+def _warm_up_churn(model):
+    model.predict_proba(np.zeros((1, len(CHURN_FEATURES.columns)), dtype=np.float32))
+
+
+def _warm_up_recommender(artifact, prefault: bool | None = None):
+    # One top-k plus a few seen slices; the cost stays flat as the artifact grows
+    indptr = artifact["seen_indptr"]
+    users = len(indptr) - 1
+    seen = np.empty(0, dtype=np.int64)
+    for row in sorted({0, users // 2, users - 1}) if users else ():
+        seen = np.asarray(artifact["seen_indices"][indptr[row]:indptr[row + 1]])
+    scores = np.asarray(artifact["matrix_reduced"][:1] @ artifact["product_components"], dtype=np.float64)[0]
+    top_k_unseen(scores, seen, 10)
+    if RECOMMENDER_WARMUP_PREFAULT if prefault is None else prefault:
+        for name in ("matrix_reduced", "product_components", "seen_indptr", "seen_indices"):
+            np.asarray(artifact[name]).sum()
+
+
+WARMUPS = {
+    "logistics": _warm_up_logistics,
+    "churn": _warm_up_churn,
+    "recommender": _warm_up_recommender,
+}
+
+
+def _default_loader(model_name: str, flavor: str):
+    from src.ml.registry import load_production_model_version
+
+    return load_production_model_version(model_name, flavor=flavor)
+
+
+def _default_version_probe(model_name: str, flavor: str):
+    from src.ml.registry import production_model_version
+
+    return production_model_version(model_name, flavor=flavor)
+
+
+class ModelManager:
+    """
+    Own the serving ``models`` dict and replace entries one at a time.
+
+    A new artifact is loaded and warmed up next to the active one; only then
+    is ``models[name]`` rebound, which is a single atomic assignment, so
+    in-flight requests keep using the object they already looked up.
+    Several models are loaded on parallel threads, so MLflow connection
+    timeouts and pickle reads overlap instead of adding up.
+    """
+
+    def __init__(
+        self,
+        models: dict,
+        loader: Callable = _default_loader,
+        version_probe: Callable = _default_version_probe,
+        flavors: dict[str, str] | None = None,
+        warmups: dict[str, Callable] | None = None,
+        max_workers: int | None = None,
+    ):
+        self.models = models
+        self.loader = loader
+        self.version_probe = version_probe
+        self.flavors = dict(MODEL_FLAVORS if flavors is None else flavors)
+        self.warmups = dict(WARMUPS if warmups is None else warmups)
+        self.max_workers = max_workers
+        self.versions: dict[str, str | None] = {}
+        self.timings: dict[str, dict[str, float]] = {}
+        self._reload_lock = threading.Lock()
+        self._stop_event: threading.Event | None = None
+        self._watcher: threading.Thread | None = None
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_lock.locked()
+
+    def load(self, model_name: str) -> dict:
+        """Load, warm up, and swap in one model; the old one stays active on failure."""
+        start = time.perf_counter()
+        try:
+            model, version = self.loader(model_name, self.flavors[model_name])
+            loaded_at = time.perf_counter()
+            warmup = self.warmups.get(model_name)
+            if warmup is not None:
+                warmup(model)
+        except Exception as e:
+            logger.warning("Failed to load %s model: %s", model_name, e)
+            return {"model": model_name, "status": "failed", "error": str(e)}
+
+        timings = {
+            "load_seconds": round(loaded_at - start, 4),
+            "warmup_seconds": round(time.perf_counter() - loaded_at, 4),
+        }
+        previous = self.versions.get(model_name)
+        self.models[model_name] = model
+        self.versions[model_name] = version
+        self.timings[model_name] = timings
+        logger.info(
+            "Activated %s model version=%s previous=%s load=%.3fs warmup=%.3fs",
+            model_name, version, previous, timings["load_seconds"], timings["warmup_seconds"],
+        )
+        return {
+            "model": model_name,
+            "status": "loaded",
+            "version": version,
+            "previous_version": previous,
+            **timings,
+        }
+
+    def reload(self, model_names=None) -> list[dict]:
+        """Reload the given models (default: all) unless a reload is already running."""
+        if not self._reload_lock.acquire(blocking=False):
+            return [{"status": "skipped", "reason": "reload_in_progress"}]
+        try:
+            model_names = list(model_names or self.flavors)
+            if len(model_names) < 2 or self.max_workers == 1:
+                return [self.load(model_name) for model_name in model_names]
+            workers = min(len(model_names), self.max_workers or len(model_names))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-load") as executor:
+                return list(executor.map(self.load, model_names))
+        finally:
+            self._reload_lock.release()
+
+    def changed_models(self) -> list[str]:
+        """Return models whose published version differs from the active one."""
+        changed = []
+        for model_name in self.flavors:
+            try:
+                version = self.version_probe(model_name, self.flavors[model_name])
+            except Exception as e:
+                logger.warning("Version check failed for %s model: %s", model_name, e)
+                continue
+            if version is not None and version != self.versions.get(model_name):
+                changed.append(model_name)
+        return changed
+
+    def reload_changed(self) -> list[dict]:
+        changed = self.changed_models()
+        return self.reload(changed) if changed else []
+
+    def start_watcher(self, interval_seconds: float):
+        """Poll local pickles and the MLflow Production stage; non-positive disables it."""
+        if interval_seconds <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop_event = threading.Event()
+        self._watcher = threading.Thread(
+            target=self._watch_loop,
+            args=(interval_seconds, self._stop_event),
+            name="model-watcher",
+            daemon=True,
+        )
+        self._watcher.start()
+
+    def stop_watcher(self, timeout: float = 1.0):
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=timeout)
+        self._watcher = None
+        self._stop_event = None
+
+    def clear(self):
+        self.models.clear()
+        self.versions.clear()
+        self.timings.clear()
+
+    def _watch_loop(self, interval_seconds: float, stop_event: threading.Event):
+        while not stop_event.wait(interval_seconds):
+            try:
+                self.reload_changed()
+            except Exception as e:
+                logger.warning("Model watcher iteration failed: %s", e)
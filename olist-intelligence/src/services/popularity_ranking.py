@@ -0,0 +1,87 @@
+"""In-memory popularity ranking used by the recommendation fallback."""
+import logging
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import text
+
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_POPULARITY_QUERY = text("""
+    SELECT p.product_category_name
+    FROM order_items oi
+    JOIN products p ON oi.product_id = p.product_id
+    WHERE p.product_category_name IS NOT NULL
+    GROUP BY p.product_category_name
+    ORDER BY COUNT(*) DESC, p.product_category_name
+""")
+
+
+def load_category_popularity(engine) -> list[str]:
+    """Return every product category ordered by sold items, most popular first."""
+    with engine.connect() as conn:
+        rows = conn.execute(CATEGORY_POPULARITY_QUERY).fetchall()
+    return [row[0] for row in rows if row[0]]
+
+
+class PopularityRanking:
+    """
+    Hold a precomputed ranking so request-time fallbacks are an O(top_k) slice.
+
+    ``refresh`` recomputes the ranking and keeps the last good copy if the
+    loader fails; ``start`` repeats it on a background thread.
+    """
+
+    def __init__(self, loader: Callable[[], list[str]]):
+        self.loader = loader
+        self.refreshed_at: float | None = None
+        self._ranking: tuple[str, ...] = ()
+        self._stop_event: threading.Event | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.refreshed_at is not None
+
+    def top(self, top_k: int) -> list[str] | None:
+        """Return the first ``top_k`` items, or ``None`` before the first load."""
+        if not self.loaded:
+            return None
+        return list(self._ranking[:top_k])
+
+    def refresh(self) -> bool:
+        try:
+            ranking = tuple(self.loader())
+        except Exception as e:
+            logger.warning("Popularity ranking refresh failed; keeping previous ranking: %s", e)
+            return False
+        self._ranking = ranking
+        self.refreshed_at = time.time()
+        return True
+
+    def start(self, interval_seconds: float):
+        """Refresh every ``interval_seconds`` until ``stop``; non-positive disables it."""
+        if interval_seconds <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._refresh_loop,
+            args=(interval_seconds, self._stop_event),
+            name="popularity-refresh",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        self._stop_event = None
+
+    def _refresh_loop(self, interval_seconds: float, stop_event: threading.Event):
+        while not stop_event.wait(interval_seconds):
+            self.refresh()
@@ -0,0 +1,149 @@
+"""Coalesce concurrent single-row predictions into batched model calls."""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Gather rows submitted from concurrent request threads and score them together.
+
+    A background worker waits up to ``max_wait_ms`` after the first queued row
+    (or until ``max_batch_size`` rows are queued), calls ``score_batch`` once
+    with every gathered row, and hands each caller the result at its own
+    position. With ``max_wait_ms <= 0`` rows are scored inline, one per call.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[list], Sequence[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        name: str = "prediction-batcher",
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_wait_ms > 0 and self.max_batch_size > 1
+
+    def submit(self, row, timeout: float | None = None):
+        """
+        Queue one row and block until its batched result is available.
+
+        Raises ``TimeoutError`` after ``timeout`` seconds; the row is then
+        dropped from its batch if it has not started scoring.
+        """
+        if not self.enabled:
+            return self.score_batch([row])[0]
+
+        future: Future = Future()
+        # Enqueue under the lock so close() cannot put _STOP ahead of this row
+        with self._lock:
+            self._ensure_worker()
+            self._queue.put((row, future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"{self.name} did not score the row within {timeout}s") from None
+
+    def close(self, timeout: float = 1.0):
+        """Stop the worker after it drains queued rows; a later submit restarts it."""
+        with self._lock:
+            worker, stopped_queue = self._worker, self._queue
+            self._worker = None
+            # Rows submitted from now on go to a fresh queue and a fresh worker
+            self._queue = queue.Queue()
+            stopped_queue.put(_STOP)
+        if worker is not None:
+            worker.join(timeout=timeout)
+
+    def _ensure_worker(self):
+        """Start a worker for the current queue; callers hold ``_lock``."""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, args=(self._queue,), name=self.name, daemon=True)
+            self._worker.start()
+
+    def _collect(self, work_queue: queue.Queue, first) -> tuple[list, bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = work_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self, work_queue: queue.Queue):
+        try:
+            while True:
+                first = work_queue.get()
+                if first is _STOP:
+                    return
+                batch, stop = self._collect(work_queue, first)
+                self._dispatch(batch)
+                if stop:
+                    return
+        finally:
+            self._abandon(work_queue)
+
+    def _abandon(self, work_queue: queue.Queue):
+        """Fail whatever is left on a queue whose worker has exited, so no caller waits forever."""
+        with self._lock:
+            if self._queue is work_queue:
+                # The worker died without close(); later submits get a fresh queue
+                self._queue = queue.Queue()
+                self._worker = None
+        error = RuntimeError(f"{self.name} worker stopped before scoring the row")
+        while True:
+            try:
+                item = work_queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(error)
+
+    def _dispatch(self, batch: list):
+        # Skip rows whose caller timed out and cancelled
+        batch = [(row, future) for row, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        futures = [future for _, future in batch]
+        try:
+            results = list(self.score_batch([row for row, _ in batch]))
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"{self.name} returned {len(results)} results for {len(batch)} rows"
+                )
+        except Exception as exc:
+            logger.warning("%s batch of %s rows failed: %s", self.name, len(batch), exc)
+            for future in futures:
+                future.set_exception(exc)
+            return
+
+        for future, result in zip(futures, results):
+            future.set_result(result)
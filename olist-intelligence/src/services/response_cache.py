@@ -0,0 +1,82 @@
+"""Per-generation response cache and ETag helpers for read-mostly API endpoints."""
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, NamedTuple
+
+
+def response_etag(payload) -> str:
+    """Strong ETag over the JSON body, so equal payloads always share a tag."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return f'"{hashlib.sha256(body.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header (weak comparison, lists and ``*``)."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+class CachedResponse(NamedTuple):
+    payload: dict
+    etag: str
+
+
+class GenerationCache:
+    """
+    Cache response payloads until the data generation changes.
+
+    ``generation()`` re-reads the marker at most every ``check_interval_seconds``,
+    so rebuilds by another process are picked up within that window. Without a
+    generation (``None``) nothing is cached and every call recomputes.
+    """
+
+    def __init__(
+        self,
+        read_generation: Callable[[], str | None],
+        check_interval_seconds: float = 5.0,
+        clock=time.monotonic,
+    ):
+        self.read_generation = read_generation
+        self.check_interval_seconds = check_interval_seconds
+        self._clock = clock
+        self._generation: str | None = None
+        self._checked_at: float | None = None
+        self._entries: dict[str, tuple[str, CachedResponse]] = {}
+        self._lock = threading.Lock()
+
+    def generation(self) -> str | None:
+        now = self._clock()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval_seconds:
+            return self._generation
+        generation = self.read_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+            self._generation = generation
+            self._checked_at = now
+        return generation
+
+    def get(self, key: str, generation: str | None) -> CachedResponse | None:
+        if generation is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != generation:
+            return None
+        return entry[1]
+
+    def put(self, key: str, generation: str | None, payload: dict) -> CachedResponse:
+        cached = CachedResponse(payload, response_etag(payload))
+        if generation is not None:
+            with self._lock:
+                self._entries[key] = (generation, cached)
+        return cached
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = None
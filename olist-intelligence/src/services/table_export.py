@@ -0,0 +1,147 @@
+"""Keyset-paginated streaming export of generated output tables."""
+import csv
+import io
+import json
+from dataclasses import dataclass
+from typing import Iterator
+
+from sqlalchemy import text
+
+
+EXPORT_PAGE_SIZE = 5000
+# Physical row identifier (column, bound-parameter expression) that orders rows sharing a key
+ROW_ID_COLUMNS = {
+    "sqlite": ("rowid", ":last_row"),
+    "postgresql": ("ctid", "CAST(:last_row AS tid)"),
+}
+_ROW_ID = "export_row_id"
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    """
+    Generated table exported in ``(key, row id)`` order, then NULL-key rows in row id order.
+
+    ``columns`` are (SQL expression, output name).
+    """
+
+    name: str
+    key: str
+    columns: tuple[tuple[str, str], ...]
+
+    @property
+    def field_names(self) -> list[str]:
+        return [output for _expression, output in self.columns]
+
+    def page_query(self, dialect: str, after_key: bool, null_keys: bool = False):
+        """
+        Next page after ``(:last, :last_row)``; the row id keeps rows with a repeated key from being skipped.
+
+        With ``null_keys`` the page holds NULL-key rows after ``:last_row``,
+        which no key comparison can reach.
+        """
+        if dialect not in ROW_ID_COLUMNS:
+            raise ValueError(f"Keyset export has no row identifier for the {dialect} dialect")
+        row_id, last_row = ROW_ID_COLUMNS[dialect]
+        select_list = ", ".join(f"{expression} AS {output}" for expression, output in self.columns)
+        if null_keys:
+            where = f"WHERE {self.key} IS NULL " + (f"AND {row_id} > {last_row} " if after_key else "")
+            order = row_id
+        else:
+            where = (
+                f"WHERE ({self.key}, {row_id}) > (:last, {last_row}) " if after_key
+                else f"WHERE {self.key} IS NOT NULL "
+            )
+            order = f"{self.key}, {row_id}"
+        return text(
+            f"SELECT {select_list}, {row_id} AS {_ROW_ID} FROM {self.name} {where}ORDER BY {order} LIMIT :limit"
+        )
+
+    @property
+    def index_name(self) -> str:
+        return f"ix_{self.name}_{self.key}"
+
+
+EXPORT_TABLES = {
+    "customer_segments": ExportTable(
+        name="customer_segments",
+        key="customer_unique_id",
+        columns=(
+            ("customer_unique_id", "customer_unique_id"),
+            ('"Recency"', "recency"),
+            ('"Frequency"', "frequency"),
+            ('"Monetary"', "monetary"),
+            ('"Cluster"', "cluster"),
+            ('"Segment"', "segment"),
+        ),
+    ),
+    "logistics_predictions": ExportTable(
+        name="logistics_predictions",
+        key="order_id",
+        columns=(
+            ("order_id", "order_id"),
+            ("customer_id", "customer_id"),
+            ("predicted_delivery_days", "predicted_delivery_days"),
+            ("delivery_days", "actual_delivery_days"),
+        ),
+    ),
+}
+
+
+def create_export_indexes(engine, table_names=None):
+    """Index the keyset columns so each page is a range scan instead of a full sort."""
+    with engine.begin() as conn:
+        for table_name in table_names or EXPORT_TABLES:
+            table = EXPORT_TABLES[table_name]
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {table.index_name} ON {table.name} ({table.key})"))
+
+
+def _iter_pages(engine, table: ExportTable, page_size: int, null_keys: bool) -> Iterator[list[dict]]:
+    dialect = engine.dialect.name
+    last = None
+    while True:
+        params = {"limit": page_size}
+        if last is not None:
+            params["last"], params["last_row"] = last
+        query = table.page_query(dialect, last is not None, null_keys=null_keys)
+        with engine.connect() as conn:
+            rows = conn.execute(query, params).mappings().fetchall()
+        if not rows:
+            return
+        page = [dict(row) for row in rows]
+        last = (page[-1][table.key], page[-1][_ROW_ID])
+        for row in page:
+            del row[_ROW_ID]
+        yield page
+        if len(rows) < page_size:
+            return
+
+
+def iter_export_pages(engine, table: ExportTable, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[list[dict]]:
+    """
+    Yield pages of row dicts with ``WHERE (key, row id) > (:last, :last_row) ORDER BY key, row id LIMIT n``.
+
+    Rows with a NULL key follow in a final pass ordered by row id. Only one
+    page is held at a time and each page uses its own short-lived
+    connection, so memory is bounded by ``page_size`` and writers are not
+    blocked for the whole export.
+    """
+    yield from _iter_pages(engine, table, page_size, null_keys=False)
+    yield from _iter_pages(engine, table, page_size, null_keys=True)
+
+
+def iter_ndjson(engine, table: ExportTable, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[bytes]:
+    for page in iter_export_pages(engine, table, page_size):
+        yield "".join(json.dumps(row, default=str) + "\n" for row in page).encode("utf-8")
+
+
+def iter_csv(engine, table: ExportTable, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=table.field_names, lineterminator="\n")
+    writer.writeheader()
+    yield buffer.getvalue().encode("utf-8")
+    for page in iter_export_pages(engine, table, page_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(page)
+        yield buffer.getvalue().encode("utf-8")
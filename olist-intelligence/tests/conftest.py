@@ -0,0 +1,29 @@
+"""Shared test data."""
+
+import numpy as np
+import pandas as pd
+
+
+def clustered_interactions(
+    users: int,
+    products: int,
+    clusters: int = 1,
+    items_per_user: int | tuple[int, int] = 3,
+    max_count: int = 1,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Synthetic ``(customer_id, product_id, purchase_count)`` rows with planted taste clusters.
+
+    User ``u`` buys distinct products from cluster ``u % clusters`` (products
+    ``p`` with ``p % clusters`` equal); ``items_per_user`` is a fixed count or a
+    ``[low, high)`` range and counts are drawn from ``1..max_count``.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for user in range(users):
+        size = int(rng.integers(*items_per_user)) if isinstance(items_per_user, tuple) else items_per_user
+        for product in rng.choice(np.arange(user % clusters, products, clusters), size=size, replace=False):
+            count = int(rng.integers(1, max_count + 1)) if max_count > 1 else 1
+            rows.append((f"u{user:03d}", f"p{product:03d}", count))
+    return pd.DataFrame(rows, columns=["customer_id", "product_id", "purchase_count"])
@@ -0,0 +1,108 @@
+"""Implicit-feedback ALS backend tests."""
+
+from functools import partial
+
+import numpy as np
+import pytest
+from scipy.sparse import random as sparse_random
+
+from src.ml.als import _update_factors, fit_implicit_als
+from src.ml.recommender import (
+    _user_index,
+    build_recommender_artifact,
+    evaluate_leave_one_out,
+    fold_in_user,
+    recommend_from_artifact,
+)
+from src.ml.recommender_store import load_recommender_arrays, save_recommender_arrays
+from tests.conftest import clustered_interactions
+
+
+_clustered_interactions = partial(
+    clustered_interactions, users=240, products=160, clusters=4, items_per_user=6, max_count=2, seed=4
+)
+
+
+def test_conjugate_gradient_half_step_matches_exact_least_squares():
+    rng = np.random.default_rng(0)
+    confidence = sparse_random(30, 50, density=0.1, format="csr", random_state=1)
+    confidence.data = 1.0 + 5.0 * confidence.data
+    fixed = rng.normal(size=(50, 6))
+    factors = np.zeros((30, 6))
+
+    _update_factors(confidence, factors, fixed, regularization=0.5, cg_steps=6)
+
+    for user in range(30):
+        weights = confidence[user].toarray().ravel()
+        observed = weights > 0
+        confidence_weights = np.where(observed, weights, 1.0)
+        lhs = fixed.T @ (confidence_weights[:, None] * fixed) + 0.5 * np.eye(6)
+        rhs = fixed[observed].T @ weights[observed]
+        np.testing.assert_allclose(factors[user], np.linalg.solve(lhs, rhs), atol=1e-6)
+
+
+def test_als_artifact_has_the_svd_layout_and_recommends_within_cluster():
+    interactions = _clustered_interactions()
+
+    artifact = build_recommender_artifact(interactions, n_components=8, backend="als")
+
+    assert artifact["matrix_reduced"].shape == (240, 8)
+    assert artifact["product_components"].shape == (8, 160)
+    assert artifact["matrix_reduced"].dtype == np.float32
+    for user in range(0, 240, 17):
+        user_id = f"u{user:03d}"
+        seen = set(interactions.loc[interactions["customer_id"] == user_id, "product_id"])
+        recommendations = recommend_from_artifact(artifact, user_id, top_k=5)
+        assert len(recommendations) == 5
+        assert not seen.intersection(recommendations)
+        assert all(int(product_id[1:]) % 4 == user % 4 for product_id in recommendations)
+
+
+def test_als_is_deterministic_and_evaluates_through_the_shared_harness():
+    interactions = _clustered_interactions()
+    matrix = build_recommender_artifact(interactions, n_components=4, backend="als")
+    again = build_recommender_artifact(interactions, n_components=4, backend="als")
+
+    metrics = evaluate_leave_one_out(interactions, top_k=10, n_components=8, backend="als")
+
+    np.testing.assert_array_equal(matrix["matrix_reduced"], again["matrix_reduced"])
+    assert metrics["users_evaluated"] > 0
+    # random top-10 out of 160 products
+    assert metrics["hit_rate_at_10"] > 10 / 160
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="backend"):
+        build_recommender_artifact(_clustered_interactions(), backend="nmf")
+
+
+def test_fit_returns_user_and_item_factors():
+    matrix = sparse_random(20, 12, density=0.2, format="csr", random_state=2)
+
+    user_factors, item_factors = fit_implicit_als(matrix, n_factors=3, iterations=2)
+
+    assert user_factors.shape == (20, 3)
+    assert item_factors.shape == (12, 3)
+
+
+def test_fold_in_of_a_training_history_reproduces_the_als_user_factor():
+    interactions = _clustered_interactions()
+    artifact = build_recommender_artifact(interactions, n_components=8, backend="als")
+
+    assert artifact["backend"] == "als"
+    for user_id in ["u000", "u017", "u123"]:
+        history = interactions[interactions["customer_id"] == user_id]
+        vector, _ = fold_in_user(artifact, history["product_id"].tolist(), history["purchase_count"].tolist())
+        expected = artifact["matrix_reduced"][_user_index(artifact, user_id)]
+        np.testing.assert_allclose(vector, expected, rtol=1e-2, atol=1e-3)
+
+
+def test_backend_survives_the_array_store(tmp_path):
+    artifact = build_recommender_artifact(_clustered_interactions(), n_components=4, backend="als")
+
+    loaded = load_recommender_arrays(save_recommender_arrays(artifact, tmp_path / "arrays"))
+
+    assert loaded["backend"] == "als"
+    assert loaded["backend_params"] == artifact["backend_params"]
+    history = ["p000", "p004", "p008"]
+    np.testing.assert_allclose(fold_in_user(loaded, history)[0], fold_in_user(artifact, history)[0], rtol=1e-6)
@@ -144,6 +144,102 @@ def test_predict_delivery_real(monkeypatch):
         assert data["predicted_days"] == 7.5
         assert data["risk_level"] == "Low"
 
+def test_predict_delivery_timeout_returns_503(monkeypatch):
+    import src.app as api_app
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+    monkeypatch.setattr(api_app, "models", {"logistics": MagicMock()})
+    timeouts = []
+
+    def timed_out(_data, timeout=None):
+        timeouts.append(timeout)
+        raise TimeoutError("delivery-batcher did not score the row")
+
+    monkeypatch.setattr(api_app.delivery_batcher, "submit", timed_out)
+    payload = {"freight_value": 15.5, "price": 100.0, "product_weight_g": 500.0, "product_description_lenght": 100.0}
+
+    response = client.post("/predict/delivery", json=payload, headers=API_HEADERS)
+
+    assert response.status_code == 503
+    assert timeouts == [api_app.PREDICTION_BATCH_TIMEOUT_SECONDS]
+
+def test_delivery_batch_body_is_timed_once_not_per_row(monkeypatch):
+    import src.app as api_app
+    from src.services.metrics import VALIDATION_LATENCY
+
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+    mock_logistics = MagicMock()
+    mock_logistics.predict.return_value = np.full(50, 7.5)
+    monkeypatch.setattr(api_app, "models", {"logistics": mock_logistics})
+    rows = [
+        {"freight_value": 15.5, "price": 100.0, "product_weight_g": 500.0, "product_description_lenght": 100.0}
+    ] * 50
+    batch_before = VALIDATION_LATENCY.count(schema="DeliveryBatchInput")
+    row_before = VALIDATION_LATENCY.count(schema="DeliveryInput")
+
+    response = client.post("/predict/delivery/batch", json={"rows": rows}, headers=API_HEADERS)
+
+    assert response.status_code == 200
+    assert VALIDATION_LATENCY.count(schema="DeliveryBatchInput") == batch_before + 1
+    assert VALIDATION_LATENCY.count(schema="DeliveryInput") == row_before
+
+
+def test_predict_delivery_batch_scores_rows_in_one_call(monkeypatch):
+    import src.app as api_app
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+    mock_logistics = MagicMock()
+    mock_logistics.predict.return_value = np.array([7.5, 12.0, 3.0])
+    monkeypatch.setattr(api_app, "models", {"logistics": mock_logistics})
+    rows = [
+        {"freight_value": 15.5, "price": 100.0, "product_weight_g": weight, "product_description_lenght": 100.0}
+        for weight in (500.0, 9000.0, 100.0)
+    ]
+
+    response = client.post("/predict/delivery/batch", json={"rows": rows}, headers=API_HEADERS)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert data["predictions"] == [
+        {"predicted_days": 7.5, "risk_level": "Low"},
+        {"predicted_days": 12.0, "risk_level": "High"},
+        {"predicted_days": 3.0, "risk_level": "Low"},
+    ]
+    mock_logistics.predict.assert_called_once()
+    features = mock_logistics.predict.call_args.args[0]
+    assert features.dtype == np.float32
+    assert features[:, 2].tolist() == [500.0, 9000.0, 100.0]
+
+
+def test_predict_delivery_batch_rejects_oversized_batch(monkeypatch):
+    import src.app as api_app
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+    monkeypatch.setattr(api_app, "DELIVERY_BATCH_MAX_ROWS", 2)
+    mock_logistics = MagicMock()
+    monkeypatch.setattr(api_app, "models", {"logistics": mock_logistics})
+    row = {"freight_value": 15.5, "price": 100.0, "product_weight_g": 500.0, "product_description_lenght": 100.0}
+
+    response = client.post("/predict/delivery/batch", json={"rows": [row] * 3}, headers=API_HEADERS)
+
+    assert response.status_code == 413
+    mock_logistics.predict.assert_not_called()
+
+
+def test_oversized_delivery_batch_is_rejected_before_rows_are_validated(monkeypatch):
+    import src.app as api_app
+    from src.services.metrics import VALIDATION_LATENCY
+
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+    monkeypatch.setattr(api_app, "DELIVERY_BATCH_MAX_ROWS", 2)
+    monkeypatch.setattr(api_app, "models", {"logistics": MagicMock()})
+    before = VALIDATION_LATENCY.count(schema="DeliveryBatchInput")
+
+    # Invalid rows would be a 422 if they were validated
+    response = client.post("/predict/delivery/batch", json={"rows": [{"price": "bad"}] * 3}, headers=API_HEADERS)
+
+    assert response.status_code == 413
+    assert VALIDATION_LATENCY.count(schema="DeliveryBatchInput") == before + 1
+
+
 def test_predict_churn_real(monkeypatch):
     import src.app as api_app
     monkeypatch.setattr(api_app, "API_KEY", "test-key")
@@ -195,6 +291,7 @@ def test_predict_repeat_purchase_risk_real(monkeypatch):
         assert data["repeat_purchase_risk"] is True
         assert data["repeat_purchase_risk_probability"] == 0.8
         assert "churn_probability" not in data
+        mock_churn.predict.assert_not_called()
         assert "claim_boundary" in data
 
 
@@ -257,3 +354,470 @@ def test_recommend_products(monkeypatch):
         }
         assert data["items"][0]["item_type"] == "product_category"
         assert "recommendations" in data
+
+
+def test_recommend_cold_start_uses_precomputed_popularity(monkeypatch):
+    import src.app as api_app
+    from src.services.popularity_ranking import PopularityRanking
+
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+    monkeypatch.setattr(api_app, "models", {})
+    ranking = PopularityRanking(lambda: ["cama_mesa_banho", "beleza_saude", "esporte_lazer"])
+    ranking.refresh()
+    monkeypatch.setattr(api_app, "category_popularity", ranking)
+
+    response = client.post(
+        "/recommend",
+        json={"customer_id": "NEW_USER", "top_k": 2},
+        headers=API_HEADERS,
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["recommendations"] == ["cama_mesa_banho", "beleza_saude"]
+    assert data["personalization_level"] == "category_popularity_fallback"
+
+
+def test_admin_reload_schedules_background_swap(monkeypatch):
+    import src.app as api_app
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+    manager = MagicMock()
+    manager.flavors = {"logistics": "catboost", "churn": "catboost", "recommender": "sklearn"}
+    manager.reloading = False
+    manager.versions = {"logistics": "local:1"}
+    monkeypatch.setattr(api_app, "model_manager", manager)
+
+    response = client.post("/admin/models/reload", json={"models": ["logistics"]}, headers=API_HEADERS)
+
+    assert response.status_code == 202
+    assert response.json()["active_versions"] == {"logistics": "local:1"}
+    manager.reload.assert_called_once_with(["logistics"])
+
+
+def test_admin_reload_rejects_unknown_models(monkeypatch):
+    import src.app as api_app
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+
+    response = client.post("/admin/models/reload", json={"models": ["forecast"]}, headers=API_HEADERS)
+
+    assert response.status_code == 422
+
+
+def test_health_reports_active_model_versions(monkeypatch):
+    import src.app as api_app
+    monkeypatch.setattr(api_app, "models", {"logistics": object()})
+    monkeypatch.setattr(api_app.model_manager, "versions", {"logistics": "mlflow:4"})
+    monkeypatch.setattr(
+        api_app.model_manager,
+        "timings",
+        {"logistics": {"load_seconds": 0.8, "warmup_seconds": 0.05}},
+    )
+
+    response = client.get("/health")
+
+    assert response.json()["model_versions"] == {"logistics": "mlflow:4"}
+    assert response.json()["model_timings"] == {
+        "logistics": {"load_seconds": 0.8, "warmup_seconds": 0.05}
+    }
+
+
+def test_lookup_endpoint_uses_async_session_when_enabled(tmp_path, monkeypatch):
+    import src.app as api_app
+    from sqlalchemy import create_engine, text
+    from src.database.async_db import create_async_session_factory
+
+    database_url = f"sqlite:///{tmp_path / 'lookup.db'}"
+    with create_engine(database_url).begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE logistics_predictions "
+            "(order_id TEXT, customer_id TEXT, predicted_delivery_days REAL, delivery_days REAL)"
+        ))
+        conn.execute(text("INSERT INTO logistics_predictions VALUES ('ORD-ASYNC', 'CUST-1', 8.5, 9.0)"))
+    async_engine, session_factory = create_async_session_factory(database_url)
+    monkeypatch.setattr(api_app, "AsyncSessionLocal", session_factory)
+    # get_lookup_db is chosen at import time from API_ASYNC_DB
+    app.dependency_overrides[api_app.get_lookup_db] = api_app._get_async_lookup_db
+    try:
+        response = client.get("/orders/ORD-ASYNC/prediction")
+    finally:
+        del app.dependency_overrides[api_app.get_lookup_db]
+        asyncio.run(async_engine.dispose())
+
+    assert response.status_code == 200
+    assert response.json()["customer_id"] == "CUST-1"
+    assert response.json()["predicted_delivery_days"] == 8.5
+
+
+def test_sync_lookup_path_is_plain_get_db_without_async_sessions():
+    import src.app as api_app
+
+    assert api_app.AsyncSessionLocal is None
+    assert api_app.get_lookup_db is get_db
+
+
+def test_schema_catalog_miss_is_inspected_off_the_event_loop(monkeypatch):
+    import threading
+
+    import src.app as api_app
+
+    catalog = {}
+    inspected_on = []
+
+    def get_table_names(_engine):
+        if "names" not in catalog:
+            inspected_on.append(threading.get_ident())
+            catalog["names"] = frozenset({"customer_segments"})
+        return catalog["names"]
+
+    monkeypatch.setattr(api_app, "get_cached_table_names", lambda _engine: catalog.get("names"))
+    monkeypatch.setattr(api_app, "get_table_names", get_table_names)
+    monkeypatch.setattr(api_app, "table_exists", lambda table_name: table_name in get_table_names(None))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(api_app.require_lookup_table("logistics_predictions"))
+
+    assert error.value.status_code == 503
+    assert len(inspected_on) == 1 and inspected_on[0] != threading.get_ident()
+
+
+@pytest.fixture
+def sqlite_lookup_db(tmp_path):
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+
+    lookup_engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    with lookup_engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE logistics_predictions "
+            "(order_id TEXT, customer_id TEXT, predicted_delivery_days REAL, delivery_days REAL)"
+        ))
+        conn.execute(text(
+            'CREATE TABLE customer_segments (customer_unique_id TEXT, "Recency" REAL, '
+            '"Frequency" REAL, "Monetary" REAL, "Cluster" INTEGER, "Segment" TEXT)'
+        ))
+        for index in range(5):
+            conn.execute(text(
+                f"INSERT INTO logistics_predictions VALUES ('ORD-{index}', 'CUST-{index}', {index + 5}, NULL)"
+            ))
+            conn.execute(text(
+                f"INSERT INTO customer_segments VALUES ('USER-{index}', 30, 2, 150.0, {index % 2}, 'Loyal')"
+            ))
+    session_factory = sessionmaker(bind=lookup_engine)
+
+    def override():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override
+    yield
+    app.dependency_overrides[get_db] = override_get_db
+    lookup_engine.dispose()
+
+
+def test_order_predictions_batch_splits_found_and_missing(sqlite_lookup_db, monkeypatch):
+    monkeypatch.setattr("src.app.LOOKUP_CHUNK_SIZE", 2)
+
+    response = client.post(
+        "/orders/predictions/batch",
+        json={"ids": ["ORD-3", "ORD-404", "ORD-0", "ORD-3", "ORD-4", "ORD-1"]},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["requested"] == 5
+    assert [item["order_id"] for item in data["found"]] == ["ORD-3", "ORD-0", "ORD-4", "ORD-1"]
+    assert data["found"][0]["predicted_delivery_days"] == 8
+    assert data["missing"] == ["ORD-404"]
+
+
+def test_customer_segments_batch_splits_found_and_missing(sqlite_lookup_db):
+    response = client.post("/customers/segments/batch", json={"ids": ["USER-1", "USER-X"]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["found"] == [{
+        "customer_unique_id": "USER-1",
+        "recency": 30,
+        "frequency": 2,
+        "monetary": 150.0,
+        "cluster": 1,
+        "segment": "Loyal",
+    }]
+    assert data["missing"] == ["USER-X"]
+
+
+def test_lookup_batch_rejects_too_many_ids(monkeypatch):
+    monkeypatch.setattr("src.app.LOOKUP_BATCH_MAX_IDS", 2)
+
+    response = client.post("/customers/segments/batch", json={"ids": ["A", "B", "C"]})
+
+    assert response.status_code == 413
+
+
+def test_segments_cached_per_generation_and_served_with_etag(monkeypatch):
+    import src.app as api_app
+    from src.services.response_cache import GenerationCache
+
+    generation = {"id": "gen-1"}
+    monkeypatch.setattr(
+        api_app,
+        "response_cache",
+        GenerationCache(lambda: generation["id"], check_interval_seconds=0),
+    )
+    executed = []
+
+    def counting_db():
+        for db in override_get_db():
+            original = db.execute.side_effect
+            db.execute.side_effect = lambda query, params=None: executed.append(1) or original(query, params)
+            yield db
+
+    app.dependency_overrides[get_db] = counting_db
+    try:
+        first = client.get("/segments")
+        etag = first.headers["ETag"]
+        not_modified = client.get("/segments", headers={"If-None-Match": etag})
+        assert len(executed) == 1
+
+        generation["id"] = "gen-2"
+        rebuilt = client.get("/segments", headers={"If-None-Match": etag})
+    finally:
+        app.dependency_overrides[get_db] = override_get_db
+
+    assert first.status_code == 200
+    assert first.json()["total_customers"] == 5
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert len(executed) == 2
+    # Same rows after the rebuild, so the content-derived ETag still matches
+    assert rebuilt.status_code == 304
+
+
+def test_ready_returns_304_for_matching_etag(monkeypatch):
+    import src.app as api_app
+    from src.services.response_cache import GenerationCache
+
+    monkeypatch.setattr(api_app, "response_cache", GenerationCache(lambda: "gen-1"))
+
+    first = client.get("/ready")
+    second = client.get("/ready", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.json()["data_generation"] == "gen-1"
+    assert second.status_code == 304
+
+
+def test_metrics_exposes_route_validation_fallback_and_503_series(monkeypatch):
+    import src.app as api_app
+    from src.services.metrics import FALLBACK_RESPONSES, MODEL_NOT_LOADED_RESPONSES
+
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+    monkeypatch.setattr(api_app, "models", {})
+    monkeypatch.setattr(api_app.category_popularity, "top", lambda top_k: ["cama_mesa_banho"])
+    not_loaded_before = MODEL_NOT_LOADED_RESPONSES.value(model="logistics")
+    fallback_before = FALLBACK_RESPONSES.value(endpoint="/recommend", fallback="category_popularity_fallback")
+
+    client.post(
+        "/predict/delivery",
+        headers=API_HEADERS,
+        json={"freight_value": 10, "price": 100, "product_weight_g": 500, "product_description_lenght": 100},
+    )
+    client.post("/recommend", json={"customer_id": "UNKNOWN", "top_k": 1}, headers=API_HEADERS)
+    client.get("/orders/ORD-123/prediction")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'olist_api_request_duration_seconds_count{method="GET",route="/orders/{order_id}/prediction",status="200"}' in body
+    assert 'olist_api_payload_validation_duration_seconds_count{schema="DeliveryInput"}' in body
+    assert 'olist_api_db_query_duration_seconds_count{query="order_prediction"}' in body
+    assert MODEL_NOT_LOADED_RESPONSES.value(model="logistics") == not_loaded_before + 1
+    assert FALLBACK_RESPONSES.value(
+        endpoint="/recommend", fallback="category_popularity_fallback"
+    ) == fallback_before + 1
+
+
+def test_export_streams_generated_table_as_ndjson(tmp_path, monkeypatch):
+    import json
+    import pandas as pd
+    import src.app as api_app
+    from sqlalchemy import create_engine
+
+    export_engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    pd.DataFrame(
+        {
+            "order_id": ["ORD-2", "ORD-1", "ORD-3"],
+            "customer_id": ["C2", "C1", "C3"],
+            "predicted_delivery_days": [5.0, 6.0, 7.0],
+            "delivery_days": [4.0, None, 8.0],
+        }
+    ).to_sql("logistics_predictions", export_engine, index=False)
+    monkeypatch.setattr(api_app, "engine", export_engine)
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+
+    response = client.get("/exports/logistics_predictions?page_size=2", headers=API_HEADERS)
+    csv_response = client.get("/exports/logistics_predictions?format=csv", headers=API_HEADERS)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["order_id"] for row in rows] == ["ORD-1", "ORD-2", "ORD-3"]
+    assert rows[0]["actual_delivery_days"] is None
+    assert csv_response.text.splitlines()[0] == "order_id,customer_id,predicted_delivery_days,actual_delivery_days"
+
+
+def test_export_rejects_unknown_table(monkeypatch):
+    import src.app as api_app
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+
+    response = client.get("/exports/orders", headers=API_HEADERS)
+
+    assert response.status_code == 422
+
+
+def test_customer_repeat_purchase_risk_reads_precomputed_score(tmp_path):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    import pandas as pd
+
+    score_engine = create_engine(f"sqlite:///{tmp_path / 'scores.db'}")
+    pd.DataFrame([{
+        "customer_unique_id": "USER-1",
+        "recency": 40,
+        "frequency": 2,
+        "monetary": 99.5,
+        "repeat_purchase_risk": 1,
+        "repeat_purchase_risk_probability": 0.82,
+        "risk_level": "Critical",
+        "features_as_of": "2018-08-29T00:00:00",
+        "model_version": "local:1:2",
+        "scored_at_utc": "2026-01-01T00:00:00+00:00",
+    }]).to_sql("repeat_purchase_scores", score_engine, index=False)
+    session_factory = sessionmaker(bind=score_engine)
+
+    def override():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override
+    try:
+        found = client.get("/customers/USER-1/repeat-purchase-risk")
+        missing = client.get("/customers/USER-404/repeat-purchase-risk")
+    finally:
+        app.dependency_overrides[get_db] = override_get_db
+
+    assert found.status_code == 200
+    data = found.json()
+    assert data["repeat_purchase_risk"] is True
+    assert data["risk_level"] == "Critical"
+    assert data["features"] == {"recency": 40, "frequency": 2, "monetary": 99.5}
+    assert data["model_version"] == "local:1:2"
+    assert missing.status_code == 404
+
+
+def test_recommend_serves_precomputed_rows_for_active_model_version(tmp_path, monkeypatch):
+    import pandas as pd
+    import src.app as api_app
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    recs_engine = create_engine(f"sqlite:///{tmp_path / 'recs.db'}")
+    pd.DataFrame({
+        "customer_id": ["USER-1"] * 3,
+        "rank": [1, 2, 3],
+        "product_id": ["p9", "p4", "p7"],
+        "score": [0.9, 0.5, 0.1],
+        "artifact_version": ["local:1"] * 3,
+    }).to_sql("customer_recommendations", recs_engine, index=False)
+    session_factory = sessionmaker(bind=recs_engine)
+
+    def override():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+    monkeypatch.setattr(api_app, "models", {})
+    app.dependency_overrides[get_db] = override
+    try:
+        monkeypatch.setattr(api_app.model_manager, "versions", {"recommender": "local:1"})
+        current = client.post("/recommend", json={"customer_id": "USER-1", "top_k": 2}, headers=API_HEADERS)
+        monkeypatch.setattr(api_app.model_manager, "versions", {"recommender": "local:2"})
+        stale = client.post("/recommend", json={"customer_id": "USER-1", "top_k": 2}, headers=API_HEADERS)
+        monkeypatch.setattr(api_app.model_manager, "versions", {})
+        unversioned = client.post("/recommend", json={"customer_id": "USER-1", "top_k": 2}, headers=API_HEADERS)
+    finally:
+        app.dependency_overrides[get_db] = override_get_db
+
+    assert current.json()["method"] == "precomputed_svd"
+    assert current.json()["recommendations"] == ["p9", "p4"]
+    assert stale.json()["method"] != "precomputed_svd"
+    assert unversioned.json()["method"] != "precomputed_svd"
+
+
+def test_recommend_folds_in_unknown_customer_history(tmp_path, monkeypatch):
+    import pandas as pd
+    import src.app as api_app
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.ml.recommender import build_recommender_artifact, recommend_from_artifact
+
+    artifact = build_recommender_artifact(pd.DataFrame({
+        "customer_id": ["u1", "u1", "u2", "u2", "u3", "u3", "u4"],
+        "product_id": ["p1", "p2", "p1", "p3", "p2", "p3", "p4"],
+        "purchase_count": [1, 2, 1, 1, 1, 1, 3],
+    }))
+    history_engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    pd.DataFrame({"customer_id": ["c-new"], "customer_unique_id": ["NEW-USER"]}).to_sql(
+        "customers", history_engine, index=False
+    )
+    pd.DataFrame({"order_id": ["o1", "o2"], "customer_id": ["c-new", "c-new"]}).to_sql(
+        "orders", history_engine, index=False
+    )
+    pd.DataFrame({"order_id": ["o1", "o1", "o2"], "product_id": ["p1", "p2", "p2"]}).to_sql(
+        "order_items", history_engine, index=False
+    )
+    session_factory = sessionmaker(bind=history_engine)
+
+    def override():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(api_app, "API_KEY", "test-key")
+    monkeypatch.setattr(api_app, "models", {"recommender": artifact})
+    monkeypatch.setattr(api_app, "table_exists", lambda table_name: table_name == "order_items")
+    app.dependency_overrides[get_db] = override
+    try:
+        from_request = client.post(
+            "/recommend",
+            json={"customer_id": "ANOTHER-USER", "top_k": 4, "history": ["p1", "p2", "p2"]},
+            headers=API_HEADERS,
+        )
+        from_orders = client.post("/recommend", json={"customer_id": "NEW-USER", "top_k": 4}, headers=API_HEADERS)
+        nothing_known = client.post(
+            "/recommend",
+            json={"customer_id": "ANOTHER-USER", "top_k": 4, "history": ["not-in-catalog"]},
+            headers=API_HEADERS,
+        )
+    finally:
+        app.dependency_overrides[get_db] = override_get_db
+
+    # u1 bought p1 once and p2 twice, so folding in that history matches u1's ranking
+    expected = recommend_from_artifact(artifact, "u1", top_k=4)
+    assert from_request.json()["method"] == "fold_in_svd_request_history"
+    assert from_request.json()["recommendations"] == expected
+    assert from_orders.json()["method"] == "fold_in_svd_order_history"
+    assert from_orders.json()["recommendations"] == expected
+    assert from_orders.json()["personalization_level"] == "personalized"
+    assert nothing_known.json()["item_type"] == "product_category"
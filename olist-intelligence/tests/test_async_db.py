@@ -0,0 +1,22 @@
+"""Async lookup database configuration tests."""
+
+import pytest
+
+from src.database.async_db import to_async_database_url
+
+
+def test_sqlite_url_uses_aiosqlite():
+    assert to_async_database_url("sqlite:////tmp/olist.db") == "sqlite+aiosqlite:////tmp/olist.db"
+
+
+def test_postgres_urls_use_asyncpg():
+    assert (
+        to_async_database_url("postgresql://user:secret@db:5432/olist")
+        == "postgresql+asyncpg://user:secret@db:5432/olist"
+    )
+    assert to_async_database_url("postgresql+psycopg2://db/olist") == "postgresql+asyncpg://db/olist"
+
+
+def test_unknown_backend_is_explicit():
+    with pytest.raises(ValueError, match="No async driver"):
+        to_async_database_url("mysql://db/olist")
@@ -0,0 +1,77 @@
+"""Batch recommend-all-users job tests."""
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, inspect
+
+from src.ml.batch_recommendations import (
+    iter_recommendation_blocks,
+    run_batch_recommendations,
+    write_recommendations_parquet,
+)
+from src.ml.recommender import build_recommender_artifact, recommend_from_artifact, top_k_unseen_block
+from tests.conftest import clustered_interactions
+
+
+_interactions = partial(clustered_interactions, users=40, products=25, items_per_user=3, seed=3)
+
+
+def test_blocks_match_single_user_recommendations():
+    artifact = build_recommender_artifact(_interactions())
+
+    frame = pd.concat(iter_recommendation_blocks(artifact, top_k=5, block_users=7, workers=2))
+
+    assert frame["customer_id"].is_monotonic_increasing
+    for customer_id, group in frame.groupby("customer_id"):
+        assert group["rank"].tolist() == list(range(1, len(group) + 1))
+        assert group["product_id"].tolist() == recommend_from_artifact(artifact, customer_id, top_k=5)
+
+
+def test_default_block_size_uses_the_float32_score_itemsize(monkeypatch):
+    from src.ml import batch_recommendations
+
+    artifact = build_recommender_artifact(_interactions())
+    products = len(artifact["product_ids"])
+    monkeypatch.setattr(batch_recommendations, "RECOMMENDATION_BLOCK_BYTES", 10 * products * 4)
+
+    blocks = list(iter_recommendation_blocks(artifact, top_k=1, workers=1))
+
+    assert artifact["matrix_reduced"].dtype == np.float32
+    assert [block["customer_id"].nunique() for block in blocks] == [10, 10, 10, 10]
+
+
+def test_block_top_k_masks_seen_and_pads_with_minus_inf():
+    scores = np.array([[0.9, 0.1, 0.5], [0.2, 0.8, 0.4]])
+    indptr = np.array([0, 2, 3])
+    seen = np.array([0, 2, 1])
+
+    indices, block_scores = top_k_unseen_block(scores, indptr, seen, top_k=2)
+
+    assert indices[0, 0] == 1 and np.isneginf(block_scores[0, 1])
+    assert indices[1].tolist() == [2, 0]
+
+
+def test_job_writes_keyed_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'recs.db'}")
+    artifact = build_recommender_artifact(_interactions())
+
+    result = run_batch_recommendations(engine, artifact=artifact, artifact_version="local:1", top_k=3, block_users=16)
+
+    stored = pd.read_sql("SELECT * FROM customer_recommendations", engine)
+    assert result["rows"] == len(stored) == 40 * 3
+    assert set(stored["artifact_version"]) == {"local:1"}
+    indexes = inspect(engine).get_indexes("customer_recommendations")
+    assert [(index["column_names"], index["unique"]) for index in indexes] == [(["customer_id", "rank"], 1)]
+
+
+def test_parquet_output_round_trips(tmp_path):
+    artifact = build_recommender_artifact(_interactions())
+    path = tmp_path / "recs" / "customer_recommendations.parquet"
+
+    rows = write_recommendations_parquet(path, artifact, "local:1", top_k=4, block_users=9, workers=2)
+
+    stored = pd.read_parquet(path)
+    assert rows == len(stored) == 40 * 4
+    assert list(stored.columns) == ["customer_id", "rank", "product_id", "score", "artifact_version"]
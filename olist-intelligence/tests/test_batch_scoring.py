@@ -0,0 +1,87 @@
+"""Offline repeat-purchase scoring job tests."""
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+
+from src.database.data_generation import read_data_generation
+from src.ml.batch_scoring import run_repeat_purchase_scoring, score_customers
+
+
+class RecencyModel:
+    """Positive-class probability grows with recency; records each batch size."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict_proba(self, matrix):
+        assert matrix.dtype == np.float32
+        self.batch_sizes.append(len(matrix))
+        positive = np.clip(matrix[:, 0] / 100.0, 0, 1)
+        return np.column_stack([1 - positive, positive])
+
+
+def _orders_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'scoring.db'}")
+    pd.DataFrame(
+        {"customer_id": ["c1", "c2", "c3", "c4"], "customer_unique_id": ["u1", "u1", "u2", "u3"]}
+    ).to_sql("customers", engine, index=False)
+    pd.DataFrame(
+        {
+            "order_id": ["o1", "o2", "o3", "o4"],
+            "customer_id": ["c1", "c2", "c3", "c4"],
+            "order_status": ["delivered"] * 4,
+            "order_purchase_timestamp": ["2018-05-01", "2018-06-01", "2018-03-23", "2018-05-22"],
+        }
+    ).to_sql("orders", engine, index=False)
+    pd.DataFrame(
+        {"order_id": ["o1", "o2", "o3", "o4"], "price": [10.0, 20.0, 30.0, 40.0]}
+    ).to_sql("order_items", engine, index=False)
+    return engine
+
+
+def test_scoring_job_writes_indexed_table_for_every_customer(tmp_path):
+    engine = _orders_engine(tmp_path)
+    model = RecencyModel()
+
+    result = run_repeat_purchase_scoring(engine, model=model, chunk_size=2)
+
+    assert result["rows"] == 3
+    assert model.batch_sizes == [2, 1]
+    scores = pd.read_sql(
+        "SELECT * FROM repeat_purchase_scores ORDER BY customer_unique_id", engine
+    ).set_index("customer_unique_id")
+    assert scores.loc["u1", ["recency", "frequency", "monetary"]].tolist() == [0, 2, 30.0]
+    assert scores.loc["u2", "recency"] == 70
+    assert scores.loc["u2", "risk_level"] == "Medium"
+    assert scores.loc["u1", "risk_level"] == "Low"
+    indexes = inspect(engine).get_indexes("repeat_purchase_scores")
+    assert [(index["column_names"], index["unique"]) for index in indexes] == [(["customer_unique_id"], 1)]
+    assert read_data_generation(engine) == result["data_generation"]
+
+
+def test_rerun_replaces_previous_scores(tmp_path):
+    engine = _orders_engine(tmp_path)
+    run_repeat_purchase_scoring(engine, model=RecencyModel())
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM orders WHERE order_id = 'o4'"))
+
+    run_repeat_purchase_scoring(engine, model=RecencyModel())
+
+    with engine.connect() as conn:
+        count = conn.execute(text("SELECT COUNT(*) FROM repeat_purchase_scores")).scalar_one()
+    assert count == 2
+    assert "repeat_purchase_scores_staging" not in inspect(engine).get_table_names()
+
+
+def test_score_customers_chunks_preserve_rows():
+    rfm = pd.DataFrame(
+        {"customer_unique_id": ["a", "b", "c"], "recency": [90, 10, 50], "frequency": [1, 2, 1], "monetary": [5, 6, 7]}
+    )
+
+    chunks = list(score_customers(RecencyModel(), rfm, chunk_size=2))
+
+    scored = pd.concat(chunks)
+    assert scored["customer_unique_id"].tolist() == ["a", "b", "c"]
+    assert scored["repeat_purchase_risk"].tolist() == [1, 0, 0]
+    assert scored["risk_level"].tolist() == ["Critical", "Low", "Medium"]
@@ -0,0 +1,62 @@
+"""Declared serving feature schema tests."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.ml.feature_schema import (
+    CHURN_FEATURES,
+    LOGISTICS_FEATURES,
+    FeatureSchema,
+    predict_positive_class,
+    risk_level,
+    risk_levels,
+)
+
+
+def test_churn_schema_maps_api_fields_to_training_order():
+    row = SimpleNamespace(days_since_last_order=10, frequency=2, monetary=150.5)
+
+    features = CHURN_FEATURES.to_row(row)
+
+    assert features.dtype == np.float32
+    assert features.shape == (1, 3)
+    assert features.tolist() == [[10.0, 2.0, 150.5]]
+
+
+def test_logistics_schema_declares_ten_training_features():
+    rows = [
+        SimpleNamespace(**{column: float(index + offset) for index, column in enumerate(LOGISTICS_FEATURES.columns)})
+        for offset in (0, 100)
+    ]
+
+    features = LOGISTICS_FEATURES.to_matrix(rows)
+
+    assert len(LOGISTICS_FEATURES.columns) == 10
+    assert features.shape == (2, 10)
+    assert features[1].tolist() == [float(value) for value in range(100, 110)]
+
+
+def test_schema_rejects_mismatched_sources():
+    with pytest.raises(ValueError, match="sources must match"):
+        FeatureSchema(name="broken", columns=("a", "b"), sources=("a",))
+
+
+def test_positive_class_comes_from_single_probability_call():
+    model = MagicMock()
+    model.predict_proba.return_value = [[0.2, 0.8], [0.9, 0.1]]
+
+    labels, probabilities = predict_positive_class(model, np.zeros((2, 3), dtype=np.float32))
+
+    assert labels.tolist() == [True, False]
+    assert probabilities.tolist() == [0.8, 0.1]
+    model.predict.assert_not_called()
+
+
+def test_vectorized_risk_levels_match_scalar_thresholds():
+    probabilities = np.array([0.05, 0.4, 0.41, 0.7, 0.71])
+
+    assert risk_levels(probabilities).tolist() == [risk_level(value) for value in probabilities]
+    assert risk_levels(probabilities).tolist() == ["Low", "Low", "Medium", "Medium", "Critical"]
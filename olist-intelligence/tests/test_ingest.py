@@ -8,6 +8,7 @@ import pandas as pd
 import pytest
 from sqlalchemy import create_engine, text
 
+from src.database.data_generation import read_data_generation
 from src.ml.ingest import OlistIngestor, reconcile_ingestion_manifest
 
 
@@ -232,3 +233,4 @@ def test_static_generated_outputs_are_loaded_when_present(tmp_path):
 
     assert logistics_count == 1
     assert segments_count == 1
+    assert read_data_generation(engine) is not None
@@ -0,0 +1,79 @@
+"""Item-item co-purchase recommender tests."""
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from src.ml.item_recommender import (
+    build_item_neighbours,
+    evaluate_item_leave_one_out,
+    recommend_items_for_user,
+    similar_products,
+)
+from src.ml.recommender_evaluation import leave_one_out_split
+from src.ml.recommender_store import decode_ids
+from tests.conftest import clustered_interactions
+
+
+def _interactions():
+    return pd.DataFrame(
+        {
+            "customer_id": ["u1", "u1", "u2", "u2", "u2", "u3", "u3", "u4"],
+            "product_id": ["p1", "p2", "p1", "p2", "p3", "p2", "p3", "p4"],
+            "purchase_count": [1, 1, 1, 1, 1, 1, 1, 2],
+        }
+    )
+
+
+_clustered_interactions = partial(
+    clustered_interactions, users=240, products=90, clusters=5, items_per_user=(1, 5), seed=11
+)
+
+
+def test_neighbours_are_top_n_cosine_co_purchases_without_self():
+    artifact = build_item_neighbours(_interactions(), n_neighbours=1)
+
+    indptr = artifact["neighbour_indptr"]
+    # p1 and p2 share two buyers: 2 / sqrt(2 * 3)
+    assert artifact["neighbour_indices"][indptr[0]:indptr[1]].tolist() == [1]
+    assert np.isclose(artifact["neighbour_scores"][indptr[0]], 2 / np.sqrt(6))
+    # p4 was never bought with anything else
+    assert indptr[4] - indptr[3] == 0
+
+
+def test_memory_budget_and_processes_do_not_change_neighbours():
+    interactions = _clustered_interactions()
+    reference = build_item_neighbours(interactions, n_neighbours=5, processes=1)
+
+    for kwargs in ({"memory_budget_bytes": 2_000, "processes": 1}, {"memory_budget_bytes": 2_000, "processes": 2}):
+        blocked = build_item_neighbours(interactions, n_neighbours=5, **kwargs)
+        for name in ("neighbour_indptr", "neighbour_indices", "neighbour_scores"):
+            assert np.array_equal(blocked[name], reference[name])
+
+
+def test_similar_products_exclude_inputs_and_ignore_unknown_products():
+    artifact = build_item_neighbours(_interactions())
+
+    assert similar_products(artifact, ["p1"], top_k=5) == ["p2", "p3"]
+    assert similar_products(artifact, ["p1", "p2", "unknown"], top_k=5) == ["p3"]
+    assert similar_products(artifact, ["unknown"]) == []
+    assert recommend_items_for_user(artifact, "u1") == ["p3"]
+    assert recommend_items_for_user(artifact, "u4") == []
+    assert recommend_items_for_user(artifact, "missing") == []
+
+
+def test_evaluation_harness_matches_serving_rankings():
+    interactions = _clustered_interactions()
+    train, holdout = leave_one_out_split(interactions)
+    artifact = build_item_neighbours(train, processes=1)
+    eligible = holdout[holdout["product_id"].isin(decode_ids(artifact["product_ids"]))]
+    hits = [
+        product_id in recommend_items_for_user(artifact, user_id, top_k=10)
+        for user_id, product_id in zip(eligible["customer_id"], eligible["product_id"])
+    ]
+
+    result = evaluate_item_leave_one_out(interactions, ks=(10,), processes=1)
+
+    assert result["users_evaluated"] == len(eligible)
+    assert result["hit_rate_at_10"] == float(np.mean(hits))
@@ -0,0 +1,45 @@
+"""Prometheus text-format metric tests."""
+
+import pytest
+
+from src.services.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(3.0, route="/a")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 3.55' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_counter_tracks_labels_and_rejects_unknown_ones():
+    registry = MetricsRegistry()
+    counter = registry.counter("fallback_total", "Fallbacks.", ("fallback",))
+
+    counter.inc(fallback='static "list"')
+    counter.inc(fallback='static "list"')
+
+    assert counter.value(fallback='static "list"') == 2
+    assert 'fallback_total{fallback="static \\"list\\""} 2' in registry.render()
+    with pytest.raises(ValueError):
+        counter.inc(route="/x")
+
+
+def test_histogram_timer_records_block_duration():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("block_seconds", "Block.", ("model",))
+
+    with histogram.time(model="logistics"):
+        pass
+
+    assert histogram.count(model="logistics") == 1
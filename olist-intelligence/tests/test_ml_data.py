@@ -2,7 +2,9 @@ from unittest.mock import MagicMock, patch
 
 import pandas as pd
 
-from src.ml.data import get_churn_data, get_logistics_data
+from sqlalchemy import create_engine
+
+from src.ml.data import get_churn_data, get_logistics_data, get_recommender_data, get_recommender_watermark
 
 
 def test_logistics_data_binds_limit_and_returns_sorted_timestamps():
@@ -120,3 +122,21 @@ def test_churn_features_precede_future_label_window():
     assert "churned" not in features.columns
     assert result["recency"].tolist() == [30, 61]
     assert result["churned"].tolist() == [1, 0]
+
+
+def test_recommender_data_reads_only_the_requested_window(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'olist.db'}")
+    pd.DataFrame({"customer_id": ["c1", "c2"], "customer_unique_id": ["u1", "u2"]}).to_sql("customers", engine)
+    pd.DataFrame({
+        "order_id": ["o1", "o2", "o3"],
+        "customer_id": ["c1", "c1", "c2"],
+        "order_purchase_timestamp": ["2018-01-01 10:00:00", "2018-02-01 10:00:00", "2018-03-01 10:00:00"],
+    }).to_sql("orders", engine)
+    pd.DataFrame({"order_id": ["o1", "o2", "o3"], "product_id": ["p1", "p2", "p3"]}).to_sql("order_items", engine)
+
+    with patch("src.ml.data.get_db_engine", return_value=engine):
+        window = get_recommender_data(since="2018-01-01 10:00:00", until="2018-02-01 10:00:00")
+        watermark = get_recommender_watermark()
+
+    assert window.to_dict("records") == [{"customer_id": "u1", "product_id": "p2", "purchase_count": 1}]
+    assert watermark == "2018-03-01 10:00:00"
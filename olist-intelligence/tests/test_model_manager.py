@@ -0,0 +1,177 @@
+"""Model hot-reload and atomic swap tests."""
+
+import threading
+
+from src.ml import registry
+from src.ml.recommender import build_recommender_artifact
+from src.ml.recommender_store import save_recommender_arrays
+from src.services.model_manager import ModelManager
+from tests.conftest import clustered_interactions
+
+
+def _manager(models, published, warmups=None):
+    def loader(model_name, _flavor):
+        version = published[model_name]
+        if isinstance(version, Exception):
+            raise version
+        return {"name": model_name, "version": version}, version
+
+    return ModelManager(
+        models,
+        loader=loader,
+        version_probe=lambda model_name, _flavor: published.get(model_name),
+        flavors={"logistics": "catboost", "churn": "catboost"},
+        warmups=warmups or {},
+    )
+
+
+def test_reload_swaps_in_new_versions_after_warmup():
+    models = {}
+    warmed = []
+    published = {"logistics": "local:1", "churn": "local:1"}
+    manager = _manager(models, published, warmups={"logistics": warmed.append})
+
+    results = manager.reload()
+
+    assert [result["status"] for result in results] == ["loaded", "loaded"]
+    assert manager.versions == {"logistics": "local:1", "churn": "local:1"}
+    assert warmed == [models["logistics"]]
+
+
+def test_failed_load_keeps_previous_model_serving():
+    models = {}
+    published = {"logistics": "local:1", "churn": "local:1"}
+    manager = _manager(models, published)
+    manager.reload()
+    active = models["logistics"]
+
+    published["logistics"] = RuntimeError("corrupt pickle")
+    result = manager.load("logistics")
+
+    assert result["status"] == "failed"
+    assert models["logistics"] is active
+    assert manager.versions["logistics"] == "local:1"
+
+
+def test_failed_warmup_does_not_swap():
+    models = {"logistics": "old"}
+
+    def broken_warmup(_model):
+        raise ValueError("bad model")
+
+    manager = _manager(models, {"logistics": "local:2"}, warmups={"logistics": broken_warmup})
+
+    assert manager.load("logistics")["status"] == "failed"
+    assert models["logistics"] == "old"
+
+
+def test_reload_changed_only_touches_new_versions():
+    models = {}
+    published = {"logistics": "local:1", "churn": "local:1"}
+    manager = _manager(models, published)
+    manager.reload()
+    churn = models["churn"]
+
+    published["logistics"] = "mlflow:3"
+    results = manager.reload_changed()
+
+    assert [result["model"] for result in results] == ["logistics"]
+    assert results[0]["previous_version"] == "local:1"
+    assert manager.versions["logistics"] == "mlflow:3"
+    assert models["churn"] is churn
+
+
+def test_concurrent_reload_is_skipped():
+    manager = _manager({}, {"logistics": "local:1", "churn": "local:1"})
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_loader(model_name, _flavor):
+        started.set()
+        release.wait(5)
+        return object(), "local:1"
+
+    manager.loader = slow_loader
+    worker = threading.Thread(target=manager.reload)
+    worker.start()
+    started.wait(5)
+
+    assert manager.reloading
+    assert manager.reload() == [{"status": "skipped", "reason": "reload_in_progress"}]
+    release.set()
+    worker.join(5)
+
+
+def test_reload_loads_models_in_parallel_and_records_timings():
+    models = {}
+    barrier = threading.Barrier(2, timeout=5)
+
+    def loader(model_name, _flavor):
+        # Both loads must be in flight at once to pass the barrier
+        barrier.wait()
+        return object(), "local:1"
+
+    manager = ModelManager(
+        models,
+        loader=loader,
+        flavors={"logistics": "catboost", "churn": "catboost"},
+        warmups={},
+    )
+
+    results = manager.reload()
+
+    assert [result["model"] for result in results] == ["logistics", "churn"]
+    assert [result["status"] for result in results] == ["loaded", "loaded"]
+    assert set(manager.timings) == {"logistics", "churn"}
+    assert set(manager.timings["logistics"]) == {"load_seconds", "warmup_seconds"}
+
+
+def test_watcher_poll_after_loading_local_arrays_finds_nothing_changed(tmp_path, monkeypatch):
+    interactions = clustered_interactions(users=4, products=3, items_per_user=2)
+    monkeypatch.setattr(registry, "MODELS_PATH", tmp_path)
+    save_recommender_arrays(build_recommender_artifact(interactions), registry.array_artifact_path("recommender"))
+    mlflow_calls = []
+
+    class ProductionClient:
+        def get_latest_versions(self, name, stages):
+            mlflow_calls.append(name)
+            return [type("Version", (), {"version": "7"})()]
+
+    monkeypatch.setattr(registry, "get_mlflow_client", ProductionClient)
+    manager = ModelManager({}, flavors={"recommender": "arrays"}, warmups={})
+
+    assert manager.reload()[0]["status"] == "loaded"
+
+    assert manager.changed_models() == []
+    assert manager.reload_changed() == []
+    assert mlflow_calls == []
+
+
+class _TrackedArray:
+    """Array stand-in that counts whole-array reads; slicing stays cheap."""
+
+    def __init__(self, values):
+        self.values = values
+        self.full_reads = 0
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def __array__(self, dtype=None, copy=None):
+        self.full_reads += 1
+        return self.values if dtype is None else self.values.astype(dtype)
+
+
+def test_recommender_warmup_touches_one_row_unless_prefault_is_enabled():
+    from src.services.model_manager import _warm_up_recommender
+
+    interactions = clustered_interactions(users=4, products=3, items_per_user=2)
+    artifact = dict(build_recommender_artifact(interactions))
+    for name in ("matrix_reduced", "seen_indices"):
+        artifact[name] = _TrackedArray(artifact[name])
+
+    _warm_up_recommender(artifact, prefault=False)
+    assert [artifact[name].full_reads for name in ("matrix_reduced", "seen_indices")] == [0, 0]
+
+    _warm_up_recommender(artifact, prefault=True)
+    assert [artifact[name].full_reads for name in ("matrix_reduced", "seen_indices")] == [1, 1]
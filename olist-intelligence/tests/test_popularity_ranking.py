@@ -0,0 +1,55 @@
+"""Precomputed popularity fallback tests."""
+
+from sqlalchemy import create_engine, text
+
+from src.services.popularity_ranking import PopularityRanking, load_category_popularity
+
+
+def test_ranking_is_unavailable_until_first_refresh():
+    ranking = PopularityRanking(lambda: ["cama_mesa_banho", "esporte_lazer"])
+
+    assert ranking.top(5) is None
+    assert ranking.refresh()
+    assert ranking.top(1) == ["cama_mesa_banho"]
+
+
+def test_failed_refresh_keeps_last_good_ranking():
+    values = iter([["a", "b"], RuntimeError("db down")])
+
+    def loader():
+        value = next(values)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    ranking = PopularityRanking(loader)
+    ranking.refresh()
+
+    assert not ranking.refresh()
+    assert ranking.top(5) == ["a", "b"]
+
+
+def test_load_category_popularity_orders_by_items_sold(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'popularity.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE products (product_id TEXT, product_category_name TEXT)"))
+        conn.execute(text("CREATE TABLE order_items (order_id TEXT, product_id TEXT)"))
+        conn.execute(text("""
+            INSERT INTO products VALUES
+                ('p1', 'esporte_lazer'), ('p2', 'cama_mesa_banho'), ('p3', NULL)
+        """))
+        conn.execute(text("""
+            INSERT INTO order_items VALUES
+                ('o1', 'p1'), ('o2', 'p2'), ('o3', 'p2'), ('o4', 'p3'), ('o5', 'p3'), ('o6', 'p3')
+        """))
+
+    assert load_category_popularity(engine) == ["cama_mesa_banho", "esporte_lazer"]
+
+
+def test_background_refresh_can_be_stopped():
+    ranking = PopularityRanking(lambda: ["a"])
+
+    ranking.start(0.01)
+    ranking.stop()
+
+    assert ranking._thread is None
@@ -0,0 +1,119 @@
+"""Micro-batching coalescer tests."""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from src.services.prediction_batcher import MicroBatcher
+
+
+def test_concurrent_submits_share_one_batched_call():
+    calls = []
+    release = threading.Barrier(4)
+
+    def score_batch(rows):
+        calls.append(list(rows))
+        return [row * 10 for row in rows]
+
+    batcher = MicroBatcher(score_batch, max_batch_size=4, max_wait_ms=1000)
+
+    def submit(value):
+        release.wait()
+        return batcher.submit(value, timeout=5)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(submit, [1, 2, 3, 4]))
+    batcher.close()
+
+    assert results == [10, 20, 30, 40]
+    assert len(calls) == 1
+    assert sorted(calls[0]) == [1, 2, 3, 4]
+
+
+def test_batch_failure_is_raised_to_every_caller():
+    def score_batch(_rows):
+        raise ValueError("model failed")
+
+    batcher = MicroBatcher(score_batch, max_batch_size=8, max_wait_ms=1)
+
+    with pytest.raises(ValueError, match="model failed"):
+        batcher.submit(1, timeout=5)
+    batcher.close()
+
+
+def test_result_count_mismatch_is_explicit():
+    batcher = MicroBatcher(lambda rows: [], max_batch_size=8, max_wait_ms=1)
+
+    with pytest.raises(RuntimeError, match="returned 0 results"):
+        batcher.submit(1, timeout=5)
+    batcher.close()
+
+
+def test_zero_window_scores_inline_without_worker():
+    calls = []
+    batcher = MicroBatcher(lambda rows: calls.append(rows) or rows, max_wait_ms=0)
+
+    assert batcher.submit("row") == "row"
+    assert calls == [["row"]]
+    assert batcher._worker is None
+
+
+def test_closed_batcher_restarts_on_next_submit():
+    batcher = MicroBatcher(lambda rows: rows, max_batch_size=8, max_wait_ms=1)
+
+    assert batcher.submit("a", timeout=5) == "a"
+    batcher.close()
+    assert batcher.submit("b", timeout=5) == "b"
+    batcher.close()
+
+
+def test_submit_racing_close_is_still_scored():
+    batcher = MicroBatcher(lambda rows: rows, max_batch_size=8, max_wait_ms=1)
+    batcher.submit("warm", timeout=5)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(batcher.submit, index, 5) for index in range(200)]
+        for _ in range(20):
+            batcher.close()
+        results = [future.result() for future in futures]
+    batcher.close()
+
+    assert results == list(range(200))
+
+
+def test_rows_left_behind_by_a_dead_worker_fail_instead_of_hanging():
+    batcher = MicroBatcher(lambda rows: rows, max_batch_size=8, max_wait_ms=1)
+    stuck = Future()
+    batcher._queue.put(("orphan", stuck))
+
+    batcher._abandon(batcher._queue)
+
+    with pytest.raises(RuntimeError, match="worker stopped"):
+        stuck.result(timeout=1)
+    assert batcher.submit("next", timeout=5) == "next"
+    batcher.close()
+
+
+def test_submit_timeout_is_raised_and_the_row_is_skipped():
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def score_batch(rows):
+        calls.append(list(rows))
+        started.set()
+        release.wait(5)
+        return rows
+
+    batcher = MicroBatcher(score_batch, max_batch_size=2, max_wait_ms=1)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        first = pool.submit(batcher.submit, "slow", 5)
+        started.wait(5)
+        with pytest.raises(TimeoutError):
+            batcher.submit("late", timeout=0.05)
+        release.set()
+        assert first.result() == "slow"
+    batcher.close()
+
+    assert calls == [["slow"]]
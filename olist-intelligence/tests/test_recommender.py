@@ -1,12 +1,19 @@
 """Recommender artifact and offline evaluation tests."""
 
+from functools import partial
+
+import numpy as np
 import pandas as pd
+import pytest
 
 from src.ml.recommender import (
     build_recommender_artifact,
     evaluate_leave_one_out,
+    interaction_matrix,
     recommend_from_artifact,
+    top_k_unseen,
 )
+from tests.conftest import clustered_interactions
 
 
 def _interactions():
@@ -39,3 +46,113 @@ def test_leave_one_out_evaluation_returns_bounded_metrics():
     assert result["users_evaluated"] > 0
     assert 0 <= result["hit_rate_at_k"] <= 1
     assert 0 <= result["catalog_coverage_at_k"] <= 1
+
+
+def test_top_k_unseen_matches_full_sort_and_skips_seen():
+    rng = np.random.default_rng(7)
+    scores = rng.random(1_000)
+    seen = np.array([int(np.argmax(scores)), 3, 17])
+    expected = [index for index in np.argsort(-scores) if index not in set(seen)][:10]
+
+    ranked = top_k_unseen(scores.copy(), seen, 10)
+
+    assert ranked.tolist() == expected
+
+
+def test_top_k_unseen_returns_only_unseen_when_catalog_is_small():
+    ranked = top_k_unseen(np.array([0.1, 0.9, 0.5]), np.array([1]), 10)
+
+    assert ranked.tolist() == [2, 0]
+
+
+def test_artifact_uses_compact_array_layout():
+    artifact = build_recommender_artifact(_interactions())
+
+    assert "user_map" not in artifact
+    assert artifact["user_ids"].tolist() == [b"u1", b"u2", b"u3"]
+    assert artifact["product_ids"].dtype.kind == "S"
+    assert artifact["matrix_reduced"].dtype == np.float32
+    assert artifact["product_components"].dtype == np.float32
+    assert artifact["seen_indptr"].tolist() == [0, 2, 4, 6]
+
+
+def test_chunked_matrix_build_matches_one_shot_build():
+    rng = np.random.default_rng(11)
+    interactions = pd.DataFrame({
+        "customer_id": rng.choice([f"u{index}" for index in range(40)], 500),
+        "product_id": rng.choice([f"p{index}" for index in range(30)], 500),
+        "purchase_count": rng.integers(1, 4, 500),
+    })
+
+    matrix, index = interaction_matrix(interactions)
+    chunked, chunked_index = interaction_matrix(interactions, memory_budget_bytes=20 * 37)
+
+    assert matrix.dtype == np.float64
+    assert (matrix != chunked).nnz == 0
+    for name in index:
+        np.testing.assert_array_equal(index[name], chunked_index[name])
+    assert matrix.sum() == interactions["purchase_count"].sum()
+    assert index["user_ids"].tolist() == sorted(index["user_ids"].tolist())
+    np.testing.assert_array_equal(index["seen_indices"], matrix.indices)
+
+
+def test_numeric_ids_use_their_string_order():
+    interactions = pd.DataFrame({
+        "customer_id": [10, 9, 10, 9, 100],
+        "product_id": [2, 2, 11, 3, 11],
+        "purchase_count": [1, 1, 1, 1, 1],
+    })
+
+    artifact = build_recommender_artifact(interactions)
+
+    assert artifact["user_ids"].tolist() == [b"10", b"100", b"9"]
+    assert recommend_from_artifact(artifact, "9", top_k=3) == ["11"]
+
+
+def test_null_ids_are_rejected():
+    interactions = _interactions().astype({"customer_id": object})
+    interactions.loc[0, "customer_id"] = None
+
+    with pytest.raises(ValueError, match="null"):
+        build_recommender_artifact(interactions)
+
+
+_clustered_interactions = partial(
+    clustered_interactions, users=300, products=400, clusters=8, items_per_user=5, seed=3
+)
+
+
+def test_ivf_index_partitions_catalog_and_all_probes_match_exact():
+    artifact = build_recommender_artifact(_clustered_interactions(), ann_index=True)
+    n_lists = len(artifact["ann_centroids"])
+
+    assert sorted(artifact["ann_list_items"].tolist()) == list(range(artifact["product_components"].shape[1]))
+    for user_id in ["u000", "u001", "u042", "u299"]:
+        exact = recommend_from_artifact(artifact, user_id, top_k=10, n_probe=0)
+        assert recommend_from_artifact(artifact, user_id, top_k=10, n_probe=n_lists) == exact
+
+
+def test_ivf_recall_is_high_with_default_probes():
+    artifact = build_recommender_artifact(_clustered_interactions(), ann_index=True)
+    user_ids = [f"u{user:03d}" for user in range(0, 300, 7)]
+
+    recall = np.mean([
+        len(set(recommend_from_artifact(artifact, user_id, top_k=10))
+            & set(recommend_from_artifact(artifact, user_id, top_k=10, n_probe=0))) / 10
+        for user_id in user_ids
+    ])
+
+    assert recall >= 0.9
+
+
+def test_fold_in_of_training_history_reproduces_user_vector():
+    from src.ml.recommender import fold_in_user, recommend_from_history
+
+    artifact = build_recommender_artifact(_interactions())
+
+    user_vector, seen = fold_in_user(artifact, ["p2", "p1", "unknown-product"])
+
+    assert np.allclose(user_vector, artifact["matrix_reduced"][0], atol=1e-5)
+    assert seen.tolist() == [0, 1]
+    assert recommend_from_history(artifact, ["p1", "p2"], top_k=3) == recommend_from_artifact(artifact, "u1", top_k=3)
+    assert recommend_from_history(artifact, ["unknown-product"]) == []
@@ -0,0 +1,85 @@
+"""Blocked leave-one-out recommender evaluation tests."""
+
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from src.ml.recommender import build_recommender_artifact, evaluate_leave_one_out, recommend_from_artifact
+from src.ml.recommender_evaluation import evaluate_rankings, leave_one_out_split, sweep_n_components
+from src.ml.recommender_store import decode_ids
+from tests.conftest import clustered_interactions
+
+
+_interactions = partial(
+    clustered_interactions, users=200, products=120, clusters=6, items_per_user=(1, 6), max_count=2, seed=5
+)
+
+
+def _per_user_reference(interactions, top_k):
+    train, holdout = leave_one_out_split(interactions)
+    artifact = build_recommender_artifact(train)
+    catalog = decode_ids(artifact["product_ids"])
+    eligible = holdout[holdout["product_id"].isin(catalog)]
+    lists = [recommend_from_artifact(artifact, user_id, top_k=top_k) for user_id in eligible["customer_id"]]
+    hits = [product_id in values for product_id, values in zip(eligible["product_id"], lists)]
+    covered = {product for values in lists for product in values}
+    return len(eligible), float(np.mean(hits)), len(covered) / len(catalog)
+
+
+def test_blocked_evaluation_matches_per_user_recommendations():
+    interactions = _interactions()
+    users, hit_rate, coverage = _per_user_reference(interactions, top_k=10)
+
+    result = evaluate_leave_one_out(interactions, top_k=10, block_users=7)
+
+    assert result["users_evaluated"] == users
+    assert result["hit_rate_at_k"] == result["hit_rate_at_10"] == hit_rate
+    assert result["catalog_coverage_at_k"] == coverage
+
+
+def test_ranking_metrics_are_consistent_across_k_and_processes():
+    train, holdout = leave_one_out_split(_interactions())
+    artifact = build_recommender_artifact(train)
+
+    serial = evaluate_rankings(artifact, holdout, ks=(1, 5, 20), block_users=16)
+    parallel = evaluate_rankings(artifact, holdout, ks=(1, 5, 20), block_users=16, processes=2)
+
+    assert parallel == serial
+    assert serial["hit_rate_at_1"] == serial["ndcg_at_1"] == serial["mrr_at_1"]
+    for metric in ("hit_rate", "ndcg", "mrr", "catalog_coverage"):
+        assert serial[f"{metric}_at_1"] <= serial[f"{metric}_at_5"] <= serial[f"{metric}_at_20"]
+    assert serial["mrr_at_20"] <= serial["ndcg_at_20"] <= serial["hit_rate_at_20"]
+
+
+def test_unknown_holdout_rows_are_skipped():
+    artifact = build_recommender_artifact(_interactions())
+    holdout = pd.DataFrame({"customer_id": ["missing"], "product_id": ["p001"]})
+
+    result = evaluate_rankings(artifact, holdout, ks=(5,))
+
+    assert result == {
+        "users_evaluated": 0,
+        "hit_rate_at_5": 0.0,
+        "ndcg_at_5": 0.0,
+        "mrr_at_5": 0.0,
+        "catalog_coverage_at_5": 0.0,
+    }
+
+
+def test_rank_sweep_matches_separate_evaluations_in_and_out_of_process():
+    interactions = _interactions()
+
+    serial = sweep_n_components(interactions, [3, 8, 500], ks=(5, 10), processes=1)
+    parallel = sweep_n_components(interactions, [3, 8, 500], ks=(5, 10), processes=2)
+
+    train, _ = leave_one_out_split(interactions)
+    max_rank = min(train["customer_id"].nunique(), train["product_id"].nunique()) - 1
+    assert serial["n_components"].tolist() == [3, 8, max_rank]
+    assert list(serial.columns) == ["n_components", "hit_rate_at_5", "hit_rate_at_10", "build_seconds", "artifact_bytes"]
+    for row in serial.itertuples():
+        expected = evaluate_leave_one_out(interactions, top_k=10, ks=(5, 10), n_components=row.n_components)
+        assert row.hit_rate_at_10 == expected["hit_rate_at_10"]
+    assert serial["artifact_bytes"].is_monotonic_increasing
+    columns = ["n_components", "hit_rate_at_5", "hit_rate_at_10", "artifact_bytes"]
+    pd.testing.assert_frame_equal(parallel[columns], serial[columns])
@@ -0,0 +1,197 @@
+"""Memory-mapped recommender artifact tests."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml import registry
+from src.ml.recommender import build_recommender_artifact, recommend_from_artifact
+from src.ml.recommender_store import decode_ids, load_recommender_arrays, save_recommender_arrays
+
+
+def _interactions():
+    return pd.DataFrame(
+        {
+            "customer_id": ["u3", "u1", "u1", "u2", "u2", "u3", "u4"],
+            "product_id": ["p2", "p1", "p2", "p1", "p3", "p3", "p4"],
+            "purchase_count": [1, 1, 2, 1, 1, 1, 3],
+        }
+    )
+
+
+def test_mapped_artifact_matches_in_memory_recommendations(tmp_path):
+    artifact = build_recommender_artifact(_interactions())
+
+    save_recommender_arrays(artifact, tmp_path / "recommender_arrays")
+    mapped = load_recommender_arrays(tmp_path / "recommender_arrays")
+
+    assert isinstance(mapped["matrix_reduced"], np.memmap)
+    assert mapped["manifest"]["users"] == 4
+    for user_id in ["u1", "u2", "u3", "u4"]:
+        assert recommend_from_artifact(mapped, user_id, top_k=4) == recommend_from_artifact(
+            artifact, user_id, top_k=4
+        )
+    assert recommend_from_artifact(mapped, "unknown") == []
+    assert recommend_from_artifact(mapped, "u0") == []
+
+
+def test_ivf_index_round_trips_through_array_store(tmp_path):
+    artifact = build_recommender_artifact(_interactions(), ann_index=True)
+
+    mapped = load_recommender_arrays(save_recommender_arrays(artifact, tmp_path / "arrays"))
+
+    assert mapped["manifest"]["ann_lists"] == len(artifact["ann_centroids"])
+    assert sorted(decode_ids(mapped["product_ids"][mapped["ann_list_items"]]).tolist()) == ["p1", "p2", "p3", "p4"]
+    for user_id in ["u1", "u2", "u3", "u4"]:
+        assert recommend_from_artifact(mapped, user_id, top_k=4) == recommend_from_artifact(
+            artifact, user_id, top_k=4, n_probe=0
+        )
+
+
+def test_saving_replaces_previous_artifact_directory(tmp_path):
+    target = tmp_path / "recommender_arrays"
+    save_recommender_arrays(build_recommender_artifact(_interactions()), target)
+    smaller = _interactions().iloc[:5]
+
+    save_recommender_arrays(build_recommender_artifact(smaller), target)
+
+    assert load_recommender_arrays(target)["manifest"]["users"] == 3
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["recommender_arrays"]
+
+
+def test_saves_switch_a_pointer_and_keep_the_previous_version(tmp_path):
+    target = tmp_path / "recommender_arrays"
+    first = save_recommender_arrays(build_recommender_artifact(_interactions()), target)
+    second = save_recommender_arrays(build_recommender_artifact(_interactions().iloc[:5]), target)
+
+    # A worker that read the pointer before the second save still finds complete files
+    assert load_recommender_arrays(first)["manifest"]["users"] == 4
+    assert (target / "CURRENT").read_text(encoding="utf-8") == second.name
+
+    third = save_recommender_arrays(build_recommender_artifact(_interactions()), target)
+
+    assert sorted(path.name for path in target.iterdir()) == sorted(["CURRENT", second.name, third.name])
+    assert load_recommender_arrays(target)["manifest"]["users"] == 4
+
+
+def test_flat_directory_from_before_versioned_saves_is_upgraded(tmp_path):
+    target = tmp_path / "recommender_arrays"
+    flat = save_recommender_arrays(build_recommender_artifact(_interactions()), target)
+    (target / "CURRENT").unlink()
+    for path in flat.iterdir():
+        path.rename(target / path.name)
+    flat.rmdir()
+    assert load_recommender_arrays(target)["manifest"]["users"] == 4
+
+    save_recommender_arrays(build_recommender_artifact(_interactions().iloc[:5]), target)
+    latest = save_recommender_arrays(build_recommender_artifact(_interactions().iloc[:5]), target)
+
+    assert not (target / "manifest.json").exists()
+    assert load_recommender_arrays(target)["manifest"]["users"] == 3
+    assert latest.parent == target
+
+
+def test_loading_an_empty_directory_is_explicit(tmp_path):
+    with pytest.raises(FileNotFoundError, match="No recommender array artifact"):
+        load_recommender_arrays(tmp_path)
+
+
+def test_loader_rejects_unknown_format(tmp_path):
+    target = save_recommender_arrays(build_recommender_artifact(_interactions()), tmp_path / "arrays")
+    (target / "manifest.json").write_text('{"format": "other"}', encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Unsupported recommender artifact format"):
+        load_recommender_arrays(target)
+
+
+def _legacy_dict_artifact(artifact):
+    """The pre-compact pickle layout, with IDs deliberately out of sorted order."""
+    user_ids = decode_ids(artifact["user_ids"]).tolist()[::-1]
+    product_ids = decode_ids(artifact["product_ids"]).tolist()[::-1]
+    sorted_products = decode_ids(artifact["product_ids"])
+    indptr, indices = artifact["seen_indptr"], artifact["seen_indices"]
+    seen = {
+        user_id: [product_ids.index(sorted_products[index]) for index in indices[indptr[row]:indptr[row + 1]]]
+        for row, user_id in enumerate(decode_ids(artifact["user_ids"]))
+    }
+    return {
+        "matrix_reduced": np.asarray(artifact["matrix_reduced"], dtype=np.float64)[::-1],
+        "product_components": np.asarray(artifact["product_components"], dtype=np.float64)[:, ::-1],
+        "user_map": {user_id: index for index, user_id in enumerate(user_ids)},
+        "product_map": {product_id: index for index, product_id in enumerate(product_ids)},
+        "reverse_product_map": dict(enumerate(product_ids)),
+        "seen_product_indices": seen,
+    }
+
+
+def test_registry_upgrades_legacy_pickled_dict(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "MODELS_PATH", tmp_path)
+    monkeypatch.setattr(registry, "mlflow", None)
+    artifact = build_recommender_artifact(_interactions())
+    legacy = _legacy_dict_artifact(artifact)
+    registry.save_model_locally(legacy, "recommender")
+
+    loaded, _version = registry.load_production_model_version("recommender", flavor="arrays")
+
+    assert "user_map" not in loaded
+    assert loaded["user_ids"].dtype.kind == "S"
+    assert loaded["matrix_reduced"].dtype == np.float32
+    for user_id in ["u1", "u2", "u3", "u4"]:
+        assert recommend_from_artifact(loaded, user_id, top_k=4) == recommend_from_artifact(
+            legacy, user_id, top_k=4
+        ) == recommend_from_artifact(artifact, user_id, top_k=4)
+
+
+def test_version_1_unicode_float64_directory_still_loads(tmp_path):
+    artifact = build_recommender_artifact(_interactions())
+    target = save_recommender_arrays(artifact, tmp_path / "arrays")
+    for name in ("user_ids", "product_ids"):
+        np.save(target / f"{name}.npy", decode_ids(artifact[name]))
+    for name in ("matrix_reduced", "product_components"):
+        np.save(target / f"{name}.npy", np.asarray(artifact[name], dtype=np.float64))
+    manifest = json.loads((target / "manifest.json").read_text(encoding="utf-8"))
+    (target / "manifest.json").write_text(json.dumps({**manifest, "version": 1}), encoding="utf-8")
+
+    mapped = load_recommender_arrays(target)
+
+    assert mapped["user_ids"].dtype.kind == "U"
+    for user_id in ["u1", "u2", "u3", "u4"]:
+        assert recommend_from_artifact(mapped, user_id, top_k=4) == recommend_from_artifact(
+            artifact, user_id, top_k=4
+        )
+
+
+def test_registry_prefers_mapped_arrays_for_array_flavor(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "MODELS_PATH", tmp_path)
+    monkeypatch.setattr(registry, "mlflow", None)
+    artifact = build_recommender_artifact(_interactions())
+    registry.save_model_locally(artifact, "recommender")
+    save_recommender_arrays(artifact, registry.array_artifact_path("recommender"))
+
+    model, version = registry.load_production_model_version("recommender", flavor="arrays")
+
+    assert "user_ids" in model
+    assert version == registry.local_model_version("recommender")
+
+
+def test_registry_converts_a_recommender_loaded_from_mlflow(tmp_path, monkeypatch):
+    from unittest.mock import MagicMock
+
+    artifact = build_recommender_artifact(_interactions())
+    legacy = _legacy_dict_artifact(artifact)
+    mlflow = MagicMock()
+    mlflow.sklearn.load_model.return_value = legacy
+    client = MagicMock()
+    client.get_latest_versions.return_value = [MagicMock(version="3")]
+    monkeypatch.setattr(registry, "MODELS_PATH", tmp_path)
+    monkeypatch.setattr(registry, "mlflow", mlflow)
+    monkeypatch.setattr(registry, "get_mlflow_client", lambda: client)
+
+    loaded, version = registry.load_production_model_version("recommender", flavor="arrays")
+
+    assert version == "mlflow:3"
+    assert "user_map" not in loaded
+    assert loaded["user_ids"].dtype.kind == "S"
+    assert recommend_from_artifact(loaded, "u2", top_k=4) == recommend_from_artifact(artifact, "u2", top_k=4)
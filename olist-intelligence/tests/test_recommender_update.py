@@ -0,0 +1,132 @@
+"""Incremental recommender update tests."""
+
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ml import recommender_update
+from src.ml.recommender import _product_indices, _user_index, build_recommender_artifact, fold_in_user
+from src.ml.recommender_store import decode_ids, load_recommender_arrays, save_recommender_arrays
+from src.ml.recommender_update import (
+    full_refit_reason,
+    recommender_build_info,
+    update_recommender_artifact,
+)
+from tests.conftest import clustered_interactions
+
+
+_interactions = partial(
+    clustered_interactions, users=60, products=25, items_per_user=(2, 9), max_count=2, seed=0
+)
+
+
+def _new_interactions():
+    return pd.DataFrame({
+        "customer_id": ["u001", "u001", "u002", "new-user", "new-user"],
+        "product_id": ["p003", "p-new", "p-new", "p003", "p007"],
+        "purchase_count": [2, 1, 1, 1, 3],
+    })
+
+
+def test_update_merges_vocabularies_and_seen_items():
+    artifact = build_recommender_artifact(_interactions())
+
+    updated, stats = update_recommender_artifact(artifact, _new_interactions())
+
+    assert stats == {"interactions": 5, "new_users": 1, "new_products": 1}
+    assert list(updated["user_ids"]) == sorted(updated["user_ids"])
+    assert list(updated["product_ids"]) == sorted(updated["product_ids"])
+    new_user = _user_index(updated, "new-user")
+    seen = decode_ids(updated["product_ids"][updated["seen_indices"][
+        updated["seen_indptr"][new_user]:updated["seen_indptr"][new_user + 1]
+    ]])
+    assert sorted(seen) == ["p003", "p007"]
+    old_row, new_row = _user_index(artifact, "u010"), _user_index(updated, "u010")
+    np.testing.assert_array_equal(updated["matrix_reduced"][new_row], artifact["matrix_reduced"][old_row])
+
+
+def test_user_vectors_match_a_transform_of_the_full_history():
+    initial = _interactions()
+    artifact = build_recommender_artifact(initial)
+    new = _new_interactions()
+
+    updated, _ = update_recommender_artifact(artifact, new)
+
+    combined = pd.concat([initial, new]).groupby(["customer_id", "product_id"], as_index=False).sum()
+    for customer_id in ["u001", "u002", "new-user"]:
+        history = combined[combined["customer_id"] == customer_id]
+        expected, _ = fold_in_user(updated, history["product_id"].tolist(), history["purchase_count"].tolist())
+        np.testing.assert_allclose(updated["matrix_reduced"][_user_index(updated, customer_id)], expected, atol=1e-5)
+
+
+def test_new_product_is_folded_in_from_existing_buyers():
+    artifact = build_recommender_artifact(_interactions())
+
+    updated, _ = update_recommender_artifact(artifact, _new_interactions())
+
+    column = _product_indices(updated, ["p-new"])[0]
+    buyers = [_user_index(artifact, "u001"), _user_index(artifact, "u002")]
+    factors = artifact["matrix_reduced"].astype(np.float64)
+    expected = factors[buyers].sum(axis=0) / (factors ** 2).sum(axis=0)
+    np.testing.assert_allclose(updated["product_components"][:, column], expected, rtol=1e-4)
+
+
+def test_update_refiles_new_products_in_the_ivf_index():
+    artifact = build_recommender_artifact(_interactions(), ann_index=True)
+
+    updated, _ = update_recommender_artifact(artifact, _new_interactions())
+
+    np.testing.assert_array_equal(np.sort(updated["ann_list_items"]), np.arange(len(updated["product_ids"])))
+    np.testing.assert_array_equal(updated["ann_centroids"], artifact["ann_centroids"])
+
+
+def test_full_refit_reason_checks_age_and_drift():
+    now = datetime(2026, 1, 31, tzinfo=timezone.utc)
+    info = recommender_build_info(_interactions(), "2018-08-01 00:00:00", now=now - timedelta(days=5))
+
+    assert full_refit_reason(info, now=now, max_age_days=30, max_drift=0.2) is None
+    assert "days old" in full_refit_reason(info, now=now, max_age_days=3, max_drift=0.2)
+    drifted = {**info, "interactions_since_refit": info["interactions_at_refit"]}
+    assert "interactions drift" in full_refit_reason(drifted, now=now, max_age_days=30, max_drift=0.2)
+    assert full_refit_reason(None, now=now) == "no build info"
+    assert "als" in full_refit_reason({**info, "backend": "als"}, now=now, max_age_days=30, max_drift=0.2)
+    assert full_refit_reason({**info, "interactions_through": None}, now=now) == "no build info"
+
+
+def test_run_update_reads_only_new_interactions(tmp_path, monkeypatch):
+    from src.ml import data, registry
+
+    path = tmp_path / "recommender_arrays"
+    initial = _interactions()
+    save_recommender_arrays(
+        build_recommender_artifact(initial), path, build_info=recommender_build_info(initial, "2018-08-01 00:00:00")
+    )
+    requested = {}
+
+    def fake_recommender_data(limit=None, since=None, until=None):
+        requested.update(since=since, until=until)
+        return _new_interactions()
+
+    monkeypatch.setattr(registry, "MODELS_PATH", tmp_path)
+    monkeypatch.setattr(data, "get_recommender_data", fake_recommender_data)
+    monkeypatch.setattr(data, "get_recommender_watermark", lambda: "2018-08-15 00:00:00")
+
+    result = recommender_update.run_recommender_update()
+
+    assert requested == {"since": "2018-08-01 00:00:00", "until": "2018-08-15 00:00:00"}
+    assert result["mode"] == "incremental"
+    build = load_recommender_arrays(path)["manifest"]["build"]
+    assert build["interactions_through"] == "2018-08-15 00:00:00"
+    assert build["interactions_since_refit"] == 5
+    assert build["products_since_refit"] == 1
+    assert (tmp_path / "recommender_model.pkl").exists()
+
+
+def test_update_rejects_missing_columns():
+    artifact = build_recommender_artifact(_interactions())
+
+    with pytest.raises(ValueError, match="purchase_count"):
+        update_recommender_artifact(artifact, _new_interactions().drop(columns="purchase_count"))
@@ -83,3 +83,16 @@ def test_missing_local_model_is_explicit(tmp_path, monkeypatch):
 
     with pytest.raises(FileNotFoundError, match="Model not found"):
         registry.load_production_model("missing")
+
+
+def test_local_load_reports_file_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "MODELS_PATH", tmp_path)
+    monkeypatch.setattr(registry, "mlflow", None)
+    registry.save_model_locally({"kind": "versioned"}, "example")
+
+    model, version = registry.load_production_model_version("example")
+
+    assert model == {"kind": "versioned"}
+    assert version.startswith("local:")
+    assert registry.production_model_version("example") == version
+    assert registry.production_model_version("missing") is None
@@ -38,11 +38,11 @@ class TestRepository:
     def test_generated_output_status_reports_optional_tables(self, mock_engine):
         from src.database.repository import get_generated_output_status
 
-        with patch("src.database.repository.inspect") as mock_inspect:
-            mock_inspect.return_value.get_table_names.return_value = [
+        with patch("src.database.repository.get_table_names") as mock_table_names:
+            mock_table_names.return_value = frozenset({
                 "orders",
                 "customer_segments",
-            ]
+            })
             result = get_generated_output_status()
 
         assert result == {
@@ -0,0 +1,56 @@
+"""Generation-keyed response cache and ETag tests."""
+
+from sqlalchemy import create_engine
+
+from src.database.data_generation import read_data_generation, write_data_generation
+from src.services.response_cache import GenerationCache, etag_matches, response_etag
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_holds_payload_until_generation_changes():
+    clock = FakeClock()
+    generations = iter(["g1", "g2"])
+    cache = GenerationCache(lambda: next(generations), check_interval_seconds=5, clock=clock)
+
+    generation = cache.generation()
+    cache.put("segments", generation, {"total": 1})
+    clock.now = 4
+    assert cache.get("segments", cache.generation()).payload == {"total": 1}
+
+    clock.now = 6
+    assert cache.generation() == "g2"
+    assert cache.get("segments", "g2") is None
+
+
+def test_cache_skips_storage_without_generation():
+    cache = GenerationCache(lambda: None)
+
+    cached = cache.put("segments", cache.generation(), {"total": 1})
+
+    assert cached.etag == response_etag({"total": 1})
+    assert cache.get("segments", None) is None
+
+
+def test_etag_matching_handles_lists_weak_tags_and_wildcard():
+    etag = response_etag({"a": 1})
+
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_data_generation_round_trip(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'generation.db'}")
+
+    assert read_data_generation(engine) is None
+    first = write_data_generation(engine, source="test")
+    assert read_data_generation(engine) == first
+    assert write_data_generation(engine, source="test") != first
@@ -0,0 +1,61 @@
+"""Cached schema catalog tests."""
+
+from sqlalchemy import create_engine, text
+
+from src.database.schema_catalog import SchemaCatalog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE orders (id INTEGER)"))
+    return engine
+
+
+def _create_segments(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE customer_segments (id INTEGER)"))
+        conn.execute(text("CREATE VIEW segment_view AS SELECT id FROM customer_segments"))
+
+
+def test_catalog_serves_cached_names_until_ttl_expires(tmp_path):
+    clock = FakeClock()
+    catalog = SchemaCatalog(ttl_seconds=30, clock=clock)
+    engine = _engine(tmp_path)
+
+    assert catalog.table_names(engine) == {"orders"}
+    _create_segments(engine)
+    assert catalog.table_names(engine) == {"orders"}
+
+    clock.now = 31
+    assert catalog.table_names(engine) == {"orders", "customer_segments"}
+
+
+def test_invalidation_hook_refreshes_one_database(tmp_path):
+    catalog = SchemaCatalog(ttl_seconds=3600, clock=FakeClock())
+    engine = _engine(tmp_path)
+    catalog.table_names(engine)
+    _create_segments(engine)
+
+    catalog.invalidate(str(engine.url))
+
+    assert catalog.relation_names(engine) == {"orders", "customer_segments", "segment_view"}
+
+
+def test_invalidate_without_url_clears_every_database(tmp_path):
+    catalog = SchemaCatalog(ttl_seconds=3600, clock=FakeClock())
+    engine = _engine(tmp_path)
+    catalog.view_names(engine)
+    _create_segments(engine)
+
+    catalog.invalidate()
+
+    assert catalog.view_names(engine) == {"segment_view"}
@@ -0,0 +1,110 @@
+"""Keyset-paginated table export tests."""
+
+import csv
+import io
+import json
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from src.services.table_export import (
+    EXPORT_TABLES,
+    create_export_indexes,
+    iter_csv,
+    iter_export_pages,
+    iter_ndjson,
+)
+
+
+def _segments_engine(tmp_path, rows=7):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    pd.DataFrame(
+        {
+            "customer_unique_id": [f"user-{index:02d}" for index in reversed(range(rows))],
+            "Recency": range(rows),
+            "Frequency": [1] * rows,
+            "Monetary": [10.5] * rows,
+            "Cluster": [index % 2 for index in range(rows)],
+            "Segment": ["Loyal"] * rows,
+        }
+    ).to_sql("customer_segments", engine, index=False)
+    return engine
+
+
+def test_keyset_pages_cover_every_row_once_in_key_order(tmp_path):
+    engine = _segments_engine(tmp_path)
+
+    pages = list(iter_export_pages(engine, EXPORT_TABLES["customer_segments"], page_size=3))
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    keys = [row["customer_unique_id"] for page in pages for row in page]
+    assert keys == [f"user-{index:02d}" for index in range(7)]
+    assert set(pages[0][0]) == {"customer_unique_id", "recency", "frequency", "monetary", "cluster", "segment"}
+
+
+def test_duplicate_keys_spanning_a_page_boundary_are_all_exported(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    pd.DataFrame({
+        "order_id": ["o1", "o2", "o2", "o2", "o2", "o3"],
+        "customer_id": [f"c{index}" for index in range(6)],
+        "predicted_delivery_days": [5.0] * 6,
+        "delivery_days": [6.0] * 6,
+    }).to_sql("logistics_predictions", engine, index=False)
+    create_export_indexes(engine, ["logistics_predictions"])
+
+    pages = list(iter_export_pages(engine, EXPORT_TABLES["logistics_predictions"], page_size=2))
+
+    assert [len(page) for page in pages] == [2, 2, 2]
+    assert [row["customer_id"] for page in pages for row in page] == [f"c{index}" for index in range(6)]
+    assert set(pages[0][0]) == {"order_id", "customer_id", "predicted_delivery_days", "actual_delivery_days"}
+
+
+def test_null_key_rows_are_exported_in_a_final_pass(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    pd.DataFrame({
+        "order_id": [None, "o2", None, "o1", None],
+        "customer_id": [f"c{index}" for index in range(5)],
+        "predicted_delivery_days": [5.0] * 5,
+        "delivery_days": [6.0] * 5,
+    }).to_sql("logistics_predictions", engine, index=False)
+
+    pages = list(iter_export_pages(engine, EXPORT_TABLES["logistics_predictions"], page_size=2))
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [row["customer_id"] for page in pages for row in page] == ["c3", "c1", "c0", "c2", "c4"]
+    assert pages[-1][0]["order_id"] is None
+
+
+def test_unknown_dialect_fails_instead_of_paging_without_a_tiebreaker():
+    with pytest.raises(ValueError, match="mssql"):
+        EXPORT_TABLES["customer_segments"].page_query("mssql", after_key=True)
+
+
+def test_exact_multiple_of_page_size_ends_with_empty_probe(tmp_path):
+    engine = _segments_engine(tmp_path, rows=4)
+
+    pages = list(iter_export_pages(engine, EXPORT_TABLES["customer_segments"], page_size=2))
+
+    assert [len(page) for page in pages] == [2, 2]
+
+
+def test_ndjson_and_csv_serialize_the_same_rows(tmp_path):
+    engine = _segments_engine(tmp_path)
+    table = EXPORT_TABLES["customer_segments"]
+
+    ndjson_rows = [json.loads(line) for line in b"".join(iter_ndjson(engine, table, 2)).decode().splitlines()]
+    csv_rows = list(csv.DictReader(io.StringIO(b"".join(iter_csv(engine, table, 2)).decode())))
+
+    assert len(ndjson_rows) == len(csv_rows) == 7
+    assert [row["customer_unique_id"] for row in ndjson_rows] == [row["customer_unique_id"] for row in csv_rows]
+    assert csv_rows[0]["monetary"] == "10.5"
+
+
+def test_create_export_indexes_indexes_the_keyset_column(tmp_path):
+    engine = _segments_engine(tmp_path)
+
+    create_export_indexes(engine, ["customer_segments"])
+
+    indexes = inspect(engine).get_indexes("customer_segments")
+    assert [index["column_names"] for index in indexes] == [["customer_unique_id"]]